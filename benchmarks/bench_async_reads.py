@@ -0,0 +1,204 @@
+"""
+Бенчмарк конкурентного чтения: синхронные обработчики в пуле потоков против асинхронной сессии
+
+Запуск: PYTHONPATH=src python benchmarks/bench_async_reads.py [--database-url postgresql+psycopg2://...]
+По умолчанию используется временный файл SQLite, для PostgreSQL указывается отдельная тестовая база
+(нужен asyncpg). На SQLite запросы не ждут сеть, поэтому показательные числа дает только PostgreSQL.
+Асинхронные маршруты замеряются с отключенным и включенным кэшем ответов уязвимостей.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+
+from dbconnector.servicedb import session as db_session
+from dbconnector.servicedb.functions import get_db_engine, get_async_db_engine, get_async_connection_string
+from dbconnector.servicedb.models import Base, VulnerORM, AffectedORM, RatingORM
+from dbconnector.servicedb.servicedb import ServiceDB
+from routers.v1.scanner_routers import scanner_router
+from services.response_cache import vulners_response_cache
+from services.scanner_service import ScannerService
+
+
+BENCHMARK_PATHS = ('/v1/scan/vulners?page_size=50', '/v1/scan/vulners/BENCH-1')
+
+
+def prepare_database(service_db: ServiceDB, vulners_count: int) -> None:
+    """
+    Функция заполнения базы уязвимостями
+
+    :param service_db: Сервисная база данных
+    :param vulners_count: Количество уязвимостей
+    """
+
+    for number in range(vulners_count):
+        global_identifier = f'BENCH-{number}'
+        service_db.session.add(
+            VulnerORM(
+                global_identifier=global_identifier,
+                identifier=f'CVE-2025-{number}',
+                description=f'Vulnerability {number}',
+                source_name='pyup',
+                source_url='https://pyup.io',
+            )
+        )
+        service_db.session.add_all(
+            [
+                AffectedORM(
+                    name=f'package-{number}',
+                    vendor='',
+                    type='pypi',
+                    start_condition='>=',
+                    start_value='1.0',
+                    end_value='2.0',
+                    end_condition='<',
+                    vulner_id=global_identifier,
+                ),
+                RatingORM(
+                    method='CVSSv31',
+                    score=number % 10,
+                    severity='high',
+                    source_name='nvd',
+                    source_url='https://nvd.nist.gov',
+                    vector='',
+                    version=3.1,
+                    vulner_id=global_identifier,
+                ),
+            ]
+        )
+    service_db.session.flush()
+    service_db.update_vulners_primary_ratings()
+    service_db.session.commit()
+
+
+def make_sync_app() -> FastAPI:
+    """
+    Функция создания приложения с прежними синхронными обработчиками тех же маршрутов
+
+    :return: Приложение
+    """
+
+    router = APIRouter(prefix='/v1/scan')
+
+    @router.get('/vulners')
+    def get_vulners(page: int = 1, page_size: int = 20, scanner_service: ScannerService = Depends()):
+        return scanner_service.get_vulners(page, page_size)
+
+    @router.get('/vulners/{item_id}')
+    def get_vulner_by_id(item_id: str, scanner_service: ScannerService = Depends()):
+        return scanner_service.get_vulner_data(item_id)
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+def make_async_app() -> FastAPI:
+    """
+    Функция создания приложения с асинхронными маршрутами сервиса
+
+    :return: Приложение
+    """
+
+    app = FastAPI()
+    app.include_router(scanner_router)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests_count: int, concurrency: int) -> tuple[float, float]:
+    """
+    Функция замера пропускной способности при конкурентных запросах
+
+    :param app: Приложение
+    :param path: Путь маршрута
+    :param requests_count: Количество запросов
+    :param concurrency: Количество одновременных запросов
+    :return: Запросы в секунду и 95-й перцентиль задержки в миллисекундах
+    """
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+
+        async def send_request():
+            async with semaphore:
+                started_at = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started_at)
+                response.raise_for_status()
+
+        await send_request()
+        latencies.clear()
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(send_request() for _ in range(requests_count)))
+        duration = time.perf_counter() - started_at
+
+    return requests_count / duration, statistics.quantiles(latencies, n=20)[-1] * 1000
+
+
+async def run_benchmark(requests_count: int, concurrency: int) -> None:
+    sync_app = make_sync_app()
+    async_app = make_async_app()
+
+    cache_size = vulners_response_cache.max_size
+
+    print(f'{requests_count} requests, concurrency {concurrency}')
+    for path in BENCHMARK_PATHS:
+        sync_rps, sync_p95 = await measure(sync_app, path, requests_count, concurrency)
+
+        # Кэш без места для ответов: каждый запрос читает базу.
+        vulners_response_cache.max_size = 0
+        async_rps, async_p95 = await measure(async_app, path, requests_count, concurrency)
+
+        vulners_response_cache.max_size = cache_size
+        cached_rps, cached_p95 = await measure(async_app, path, requests_count, concurrency)
+        print(
+            f'{path:<32} sync {sync_rps:8.1f} req/s p95 {sync_p95:7.1f} ms  '
+            f'async {async_rps:8.1f} req/s p95 {async_p95:7.1f} ms  '
+            f'cached {cached_rps:8.1f} req/s p95 {cached_p95:7.1f} ms'
+        )
+
+    await db_session.dispose_async_engine()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url')
+    parser.add_argument('--vulners', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    database_file = None
+    database_url = args.database_url
+    if database_url is None:
+        database_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        database_url = f'sqlite:///{database_file}'
+
+    engine = get_db_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db_session.set_engines(engine, get_async_db_engine(get_async_connection_string(database_url)))
+
+    try:
+        with ServiceDB(engine) as service_db:
+            prepare_database(service_db, args.vulners)
+
+        asyncio.run(run_benchmark(args.requests, args.concurrency))
+    finally:
+        Base.metadata.drop_all(engine)
+        db_session.dispose_engine()
+        if database_file:
+            os.remove(database_file)
+
+
+if __name__ == '__main__':
+    main()
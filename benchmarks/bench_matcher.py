@@ -0,0 +1,124 @@
+"""
+Бенчмарк поиска затронутого ПО: вложенный цикл против индекса интервалов
+
+Запуск: PYTHONPATH=src python benchmarks/bench_matcher.py
+"""
+
+import argparse
+import random
+import time
+
+from dpss.models import SoftComponentSchema, VulnerableIntervalSchema, VersionBorder
+from dpss.utils import check_is_vulnerable
+
+from dbconnector.servicedb.models import AffectedORM
+from matcher.index import AffectsIndex
+
+
+def make_version(rnd: random.Random) -> str:
+    """Функция генерации случайной версии"""
+
+    return f'{rnd.randint(0, 5)}.{rnd.randint(0, 20)}.{rnd.randint(0, 20)}'
+
+
+def make_dataset(components_count: int, affects_count: int, seed: int) -> tuple[list, list]:
+    """
+    Функция генерации синтетических компонентов и затронутого ПО
+
+    :param components_count: Количество компонентов SBOM
+    :param affects_count: Количество затронутых интервалов
+    :param seed: Зерно генератора
+    :return: Компоненты и записи затронутого ПО
+    """
+
+    rnd = random.Random(seed)
+    names = [f'package-{number}' for number in range(components_count)]
+    components = [
+        SoftComponentSchema.model_construct(name=name, version=make_version(rnd))
+        for name in names
+    ]
+
+    affects = []
+    for affect_id in range(1, affects_count + 1):
+        left_version, right_version = sorted((make_version(rnd), make_version(rnd)), key=lambda v: tuple(map(int, v.split('.'))))
+        affects.append(
+            AffectedORM(
+                id=affect_id,
+                name=rnd.choice(names),
+                vendor='',
+                type='pypi',
+                start_condition=rnd.choice(('>=', '>')),
+                start_value=left_version,
+                end_value=rnd.choice((right_version, right_version, 'inf')),
+                end_condition=rnd.choice(('<=', '<')),
+                vulner_id=f'PYUP-{affect_id}',
+            )
+        )
+
+    return components, affects
+
+
+def legacy_match(components: list, affects: list, check_names: bool = False) -> list[int]:
+    """
+    Функция поиска затронутого ПО вложенным циклом, как в исходном find_vulnerable_software
+
+    :param components: Компоненты ПО
+    :param affects: Записи затронутого ПО
+    :param check_names: Сопоставлять компонент только с интервалами своего пакета
+    :return: Отсортированные идентификаторы найденного затронутого ПО
+    """
+
+    result = set()
+    for component in components:
+        for affect in affects:
+            if check_names and affect.name != component.name:
+                continue
+            try:
+                is_vulnerable = check_is_vulnerable(
+                    pkg_version=component.version,
+                    vulnerable_interval=VulnerableIntervalSchema(
+                        left_border=VersionBorder(affect.start_condition),
+                        left_version=affect.start_value,
+                        right_version=affect.end_value if affect.end_value != 'inf' else '9999999',
+                        right_border=VersionBorder(affect.end_condition),
+                    )
+                )
+            except TypeError:
+                continue
+
+            if is_vulnerable:
+                result.add(affect.id)
+
+    return sorted(result)
+
+
+def measure(func, *args) -> tuple[float, list[int]]:
+    """Функция замера времени выполнения"""
+
+    started_at = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started_at, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--components', type=int, default=400)
+    parser.add_argument('--affects', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    components, affects = make_dataset(args.components, args.affects, args.seed)
+
+    legacy_time, _ = measure(legacy_match, components, affects)
+    reference_time, reference_ids = measure(legacy_match, components, affects, True)
+    index_time, index_ids = measure(lambda: AffectsIndex(affects).match(components))
+
+    print(f'components={args.components} affects={args.affects}')
+    print(f'nested loop:              {legacy_time:.3f} s')
+    print(f'nested loop (by name):    {reference_time:.3f} s')
+    print(f'interval index:           {index_time:.3f} s (x{legacy_time / index_time:.1f})')
+    print(f'same affected ids:        {reference_ids == index_ids} ({len(index_ids)} found)')
+
+
+if __name__ == '__main__':
+    main()
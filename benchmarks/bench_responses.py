@@ -0,0 +1,204 @@
+"""
+Бенчмарк пропускной способности маршрутов сканера: стандартная сериализация FastAPI против быстрой
+
+Запуск: PYTHONPATH=src python benchmarks/bench_responses.py
+Данные сервисов подменяются синтетическими, замеряется только обработка ответа.
+Маршрут /vulners сравнивается с прежним обработчиком, возвращавшим DTO: после - с отключенным
+и включенным кэшем ответов уязвимостей.
+"""
+
+import argparse
+import json
+import time
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from models.scanner_models import (
+    ReportGetDTO,
+    ScanConfigGetDTO,
+    ProjectConfigGetDTO,
+    VulnerBasicGetDTO,
+    VulnersBasicsGetDTO,
+)
+from dbconnector.servicedb.async_servicedb import AsyncServiceDB
+from dbconnector.servicedb.session import get_async_db_session
+from routers.v1.scanner_routers import scanner_router
+from services.async_scanner_service import AsyncScannerService
+from services.response_cache import vulners_response_cache
+
+
+VULNERS_PATH = '/v1/scan/vulners'
+BENCHMARK_PATHS = ('/v1/scan/reports', '/v1/scan/confs/all', VULNERS_PATH)
+
+
+def patch_scanner_service(items_count: int) -> None:
+    """
+    Функция подмены методов сервиса синтетическими данными
+
+    :param items_count: Количество элементов в каждом ответе
+    """
+
+    reports = [
+        ReportGetDTO(id=number, created_at='01_01_2025_00_00_00', scan_config_id=number % 10)
+        for number in range(items_count)
+    ]
+    scan_configs = [
+        ScanConfigGetDTO(
+            id=number,
+            name=f'config-{number}',
+            host='10.0.0.1',
+            user='scanner',
+            secret='secret',
+            description='Synthetic scan config',
+            date='01_01_2025_00_00_00',
+            port='22',
+            projects=[
+                ProjectConfigGetDTO(
+                    id=number * 10 + project_number,
+                    name=f'project-{project_number}',
+                    type='python',
+                    dir_path='/opt/project',
+                    scan_config_id=number,
+                )
+                for project_number in range(5)
+            ],
+        )
+        for number in range(items_count)
+    ]
+    vulners = VulnersBasicsGetDTO(
+        vulners=[
+            VulnerBasicGetDTO(
+                global_identifier=f'PYUP-{number}',
+                identifier=f'CVE-2024-{number}',
+                source_name='pyup',
+                source_url='https://pyup.io',
+                score=7.5,
+                severity='high',
+            )
+            for number in range(items_count)
+        ],
+        count=items_count,
+    )
+
+    async def get_reports(self):
+        return reports
+
+    async def get_all_configs(self):
+        return scan_configs
+
+    async def get_vulners(self, page=1, page_size=20, cursor=None, vulners_query=None):
+        return vulners
+
+    async def get_vulner_db_generation(self):
+        return 0
+
+    AsyncScannerService.get_reports = get_reports
+    AsyncScannerService.get_all_configs = get_all_configs
+    AsyncServiceDB.get_vulners = get_vulners
+    AsyncServiceDB.get_vulner_db_generation = get_vulner_db_generation
+
+
+async def get_no_session():
+    # Сессия не нужна: методы сервиса подменены синтетическими данными.
+    return None
+
+
+async def get_vulners_data(page: int = 1, page_size: int = 20, scanner_service: AsyncScannerService = Depends()):
+    # Прежний обработчик /vulners: страница возвращается DTO и сериализуется FastAPI.
+    return await scanner_service.get_vulners(page, page_size)
+
+
+# Прежние обработчики маршрутов, которые теперь сами возвращают готовый ответ.
+BASELINE_ENDPOINTS = {VULNERS_PATH: get_vulners_data}
+
+
+def make_baseline_app() -> FastAPI:
+    """
+    Функция создания приложения со стандартной сериализацией FastAPI для тех же обработчиков
+
+    :return: Приложение
+    """
+
+    router = APIRouter()
+    for route in scanner_router.routes:
+        if route.path in BENCHMARK_PATHS:
+            router.add_api_route(
+                route.path,
+                BASELINE_ENDPOINTS.get(route.path, getattr(route.endpoint, '__wrapped__', route.endpoint)),
+                response_model=route.response_model,
+                methods=list(route.methods),
+            )
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_async_db_session] = get_no_session
+    return app
+
+
+def make_fast_app() -> FastAPI:
+    """
+    Функция создания приложения с быстрой сериализацией
+
+    :return: Приложение
+    """
+
+    app = FastAPI()
+    app.include_router(scanner_router)
+    app.dependency_overrides[get_async_db_session] = get_no_session
+    return app
+
+
+def measure(client: TestClient, path: str, requests_count: int) -> tuple[float, bytes]:
+    """
+    Функция замера количества запросов в секунду
+
+    :param client: Клиент приложения
+    :param path: Путь маршрута
+    :param requests_count: Количество запросов
+    :return: Запросы в секунду и тело последнего ответа
+    """
+
+    client.get(path)
+    started_at = time.perf_counter()
+    for _ in range(requests_count):
+        response = client.get(path)
+    duration = time.perf_counter() - started_at
+
+    return requests_count / duration, response.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    patch_scanner_service(args.items)
+    baseline_client = TestClient(make_baseline_app())
+    fast_client = TestClient(make_fast_app())
+
+    cache_size = vulners_response_cache.max_size
+    baseline_rates = {}
+
+    print(f'{args.items} items per response, {args.requests} requests')
+    for path in BENCHMARK_PATHS:
+        baseline_rps, baseline_content = measure(baseline_client, path, args.requests)
+        baseline_rates[path] = baseline_rps
+
+        # Кэш без места для ответов: каждый запрос сериализует страницу.
+        vulners_response_cache.max_size = 0
+        fast_rps, fast_content = measure(fast_client, path, args.requests)
+        vulners_response_cache.max_size = cache_size
+
+        print(
+            f'{path:<20} before {baseline_rps:8.1f} req/s  after {fast_rps:8.1f} req/s '
+            f'(x{fast_rps / baseline_rps:.1f}), same body: {json.loads(baseline_content) == json.loads(fast_content)}'
+        )
+
+    cached_rps, _ = measure(fast_client, VULNERS_PATH, args.requests)
+    print(f'{VULNERS_PATH:<20} cached {cached_rps:8.1f} req/s (x{cached_rps / baseline_rates[VULNERS_PATH]:.1f})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Бенчмарк сохранения отчета: построчное добавление ORM-объектов против пакетной вставки
+
+Запуск: PYTHONPATH=src python benchmarks/bench_save_report.py [--database-url postgresql+psycopg2://...]
+По умолчанию используется SQLite в памяти, для PostgreSQL указывается отдельная тестовая база.
+"""
+
+import argparse
+import time
+
+from sqlalchemy import func, select
+
+from dbconnector.servicedb.functions import get_db_engine
+from dbconnector.servicedb.models import (
+    Base,
+    ScanConfigORM,
+    ProjectConfigORM,
+    ReportORM,
+    ReportProjectORM,
+    AffectedProjectsORM,
+    VulnerORM,
+    AffectedORM,
+)
+from dbconnector.servicedb.servicedb import ServiceDB
+from models.scanner_models import ReportAddDTO, AffectedProjectDTO, ScannedProjectDTO
+
+
+def legacy_save_report(service_db: ServiceDB, report_data: ReportAddDTO) -> int:
+    """Прежняя реализация сохранения отчета: два коммита и ORM-объект на каждую найденную запись"""
+
+    report_model = ReportORM(scan_config_id=report_data.scan_config_id)
+    service_db.session.add(report_model)
+    service_db.session.commit()
+
+    addition_rows = []
+    for affected_project in report_data.projects:
+        addition_rows.append(
+            ReportProjectORM(
+                project_config_id=affected_project.project_config_id,
+                report_id=report_model.id,
+            )
+        )
+
+    for affected_project in report_data.projects:
+        addition_rows.append(
+            AffectedProjectsORM(
+                project_config_id=affected_project.project_config_id,
+                affected_id=affected_project.affected_id,
+            )
+        )
+
+    service_db.session.add_all(addition_rows)
+    service_db.session.commit()
+    return report_model.id
+
+
+def prepare_database(service_db: ServiceDB, projects_count: int, affects_count: int) -> list[int]:
+    """
+    Функция создания конфигурации сканирования, проектов и затронутого ПО
+
+    :param service_db: Сервисная база данных
+    :param projects_count: Количество проектов
+    :param affects_count: Количество записей затронутого ПО
+    :return: Идентификаторы проектов
+    """
+
+    service_db.create_db_and_tables()
+    scan_config = ScanConfigORM(name='bench', host='localhost', user='bench', secret='bench', port='22')
+    service_db.session.add(scan_config)
+    service_db.session.flush()
+
+    projects = [
+        ProjectConfigORM(name=f'project-{number}', type='python', dir_path='/', scan_config_id=scan_config.id)
+        for number in range(projects_count)
+    ]
+    service_db.session.add_all(projects)
+    service_db.session.add(
+        VulnerORM(global_identifier='BENCH-1', identifier='BENCH-1', description='', source_name='', source_url='')
+    )
+    service_db.session.flush()
+    service_db.bulk_insert(
+        AffectedORM,
+        [
+            {
+                'id': affect_id,
+                'name': f'package-{affect_id}',
+                'vendor': '',
+                'type': 'pypi',
+                'start_condition': '>=',
+                'start_value': '0',
+                'end_value': 'inf',
+                'end_condition': '<',
+                'vulner_id': 'BENCH-1',
+            }
+            for affect_id in range(1, affects_count + 1)
+        ],
+    )
+    service_db.session.commit()
+
+    return [project.id for project in projects]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--projects', type=int, default=10)
+    parser.add_argument('--findings', type=int, default=2_000, help='findings per project')
+    args = parser.parse_args()
+
+    engine = get_db_engine(args.database_url)
+    Base.metadata.drop_all(engine)
+    with ServiceDB(engine) as service_db:
+        project_ids = prepare_database(service_db, args.projects, args.findings)
+        scan_config_id = service_db.session.scalars(select(ScanConfigORM.id)).first()
+
+    report_data = ReportAddDTO(
+        scan_config_id=scan_config_id,
+        projects=[
+            AffectedProjectDTO(affected_id=affected_id, project_config_id=project_id)
+            for project_id in project_ids
+            for affected_id in range(1, args.findings + 1)
+        ],
+        scanned_projects=[ScannedProjectDTO(project_config_id=project_id) for project_id in project_ids],
+    )
+
+    results = {}
+    for name, save in (('legacy', legacy_save_report), ('bulk', ServiceDB.save_report)):
+        with ServiceDB(engine) as service_db:
+            started_at = time.perf_counter()
+            report_id = save(service_db, report_data)
+            duration = time.perf_counter() - started_at
+            links_count = service_db.session.scalar(
+                select(func.count()).select_from(ReportProjectORM).where(ReportProjectORM.report_id == report_id)
+            )
+        results[name] = (duration, report_id, links_count)
+
+    print(f'{engine.dialect.name}: {args.projects} projects, {len(report_data.projects)} findings')
+    for name, (duration, report_id, links_count) in results.items():
+        print(f'{name:<7} {duration:7.3f} s  report {report_id}, {links_count} report-project links')
+    print(f'speedup: x{results["legacy"][0] / results["bulk"][0]:.1f}')
+
+    Base.metadata.drop_all(engine)
+
+
+if __name__ == '__main__':
+    main()
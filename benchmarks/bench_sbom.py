@@ -0,0 +1,110 @@
+"""
+Бенчмарк извлечения компонентов из большого SBOM: ParserSBOM против потокового извлечения
+
+Запуск: PYTHONPATH=src python benchmarks/bench_sbom.py
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from dpss.sbom import ParserSBOM
+
+from matcher.components import SBOMComponentsCache, iter_sbom_components
+
+
+def make_sbom(file_path: Path, components_count: int, seed: int) -> None:
+    """
+    Функция генерации документа CycloneDX с компонентами, похожими на реальные
+
+    :param file_path: Путь до создаваемого файла
+    :param components_count: Количество компонентов
+    :param seed: Зерно генератора
+    """
+
+    rnd = random.Random(seed)
+    components = []
+    for number in range(components_count):
+        name = f'package-{number}'
+        version = f'{rnd.randint(0, 9)}.{rnd.randint(0, 30)}.{rnd.randint(0, 30)}'
+        components.append({
+            'type': 'library',
+            'bom-ref': f'pkg:pypi/{name}@{version}',
+            'name': name,
+            'version': version,
+            'purl': f'pkg:pypi/{name}@{version}',
+            'description': 'Synthetic package ' * rnd.randint(1, 10),
+            'licenses': [{'license': {'id': rnd.choice(('MIT', 'BSD-3-Clause', 'Apache-2.0'))}}],
+            'hashes': [{'alg': 'SHA-256', 'content': f'{rnd.getrandbits(256):064x}'}],
+            'properties': [{'name': 'cdx:pypi:package_source', 'value': 'requirements.txt'}],
+        })
+
+    document = {
+        'bomFormat': 'CycloneDX',
+        'specVersion': '1.5',
+        'serialNumber': 'urn:uuid:00000000-0000-0000-0000-000000000000',
+        'version': 1,
+        'metadata': {'component': {'type': 'application', 'name': 'monorepo'}},
+        'components': components,
+    }
+    with file_path.open('w') as file:
+        json.dump(document, file)
+
+
+def measure(function: Callable[[], list]) -> tuple[float, float, int]:
+    """
+    Функция замера времени и пикового потребления памяти.
+    Время замеряется отдельно от памяти, так как tracemalloc замедляет выделения.
+
+    :param function: Замеряемая функция
+    :return: Время в секундах, пик памяти в МБ и количество компонентов
+    """
+
+    started_at = time.perf_counter()
+    components = function()
+    duration = time.perf_counter() - started_at
+    del components
+
+    tracemalloc.start()
+    components = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return duration, peak / 1024 / 1024, len(components)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--components', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = Path(temp_dir) / 'sbom.json'
+        make_sbom(file_path, args.components, args.seed)
+        print(f'sbom.json: {args.components} components, {file_path.stat().st_size / 1024 / 1024:.1f} MB')
+
+        cache = SBOMComponentsCache()
+
+        def parse_after_clear() -> list:
+            cache.clear()
+            return cache.get_components(file_path)
+
+        results = {
+            'ParserSBOM': measure(lambda: ParserSBOM(file_path).get_components()),
+            'streaming': measure(lambda: list(iter_sbom_components(file_path))),
+            'cache, first parse': measure(parse_after_clear),
+            'cache, unchanged file': measure(lambda: cache.get_components(file_path)),
+        }
+
+    for name, (duration, peak, count) in results.items():
+        print(f'{name:<22} {duration:8.3f} s  peak {peak:8.1f} MB  {count} components')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Бенчмарк поиска уязвимостей с фасетами: задержка первого запроса и повторного в том же поколении базы
+
+Запуск: PYTHONPATH=src python benchmarks/bench_search.py [--database-url postgresql+psycopg2://...]
+По умолчанию используется временный файл SQLite, для PostgreSQL указывается отдельная тестовая база.
+Первый запрос выполняется после смены поколения базы уязвимостей, когда кэш фасетов пуст.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from dbconnector.servicedb.migrations import apply_migrations
+from dbconnector.servicedb.models import Base, VulnerORM, AffectedORM, RatingORM
+from dbconnector.servicedb.servicedb import ServiceDB
+from models.scanner_models import VulnersSearchQueryDTO
+
+
+PACKAGE_TYPES = ('pypi', 'npm', 'maven', 'golang')
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+SOURCES = ('pyup', 'nvd', 'osv')
+# Размер пакета строк при заполнении базы.
+INSERT_BATCH_SIZE = 10_000
+
+SEARCH_QUERIES = {
+    'no query': VulnersSearchQueryDTO(),
+    'package': VulnersSearchQueryDTO(query='package-1234'),
+    'word': VulnersSearchQueryDTO(query='overflow'),
+    'word + filters': VulnersSearchQueryDTO(query='overflow', severity=['high'], package_type=['maven']),
+    'filters only': VulnersSearchQueryDTO(severity=['critical'], source=['nvd']),
+}
+
+
+def prepare_database(service_db: ServiceDB, vulners_count: int, affects_per_vulner: int) -> None:
+    """
+    Функция заполнения базы уязвимостями
+
+    :param service_db: Сервисная база данных
+    :param vulners_count: Количество уязвимостей
+    :param affects_per_vulner: Количество записей затронутого ПО одной уязвимости
+    """
+
+    for batch_start in range(0, vulners_count, INSERT_BATCH_SIZE):
+        numbers = range(batch_start, min(batch_start + INSERT_BATCH_SIZE, vulners_count))
+        service_db.bulk_insert(
+            VulnerORM,
+            [
+                {
+                    'global_identifier': f'BENCH-{number}',
+                    'identifier': f'CVE-2025-{number}',
+                    'description': f'Buffer {"overflow" if number % 50 == 0 else "issue"} in package-{number}',
+                    'source_name': SOURCES[number % len(SOURCES)],
+                    'source_url': 'https://example.org',
+                }
+                for number in numbers
+            ],
+        )
+        service_db.bulk_insert(
+            AffectedORM,
+            [
+                {
+                    'name': f'package-{number + affect_number}',
+                    'vendor': '',
+                    'type': PACKAGE_TYPES[(number + affect_number) % len(PACKAGE_TYPES)],
+                    'start_condition': '>=',
+                    'start_value': f'{affect_number}.0',
+                    'end_value': f'{affect_number}.5',
+                    'end_condition': '<',
+                    'vulner_id': f'BENCH-{number}',
+                }
+                for number in numbers
+                for affect_number in range(affects_per_vulner)
+            ],
+        )
+        service_db.bulk_insert(
+            RatingORM,
+            [
+                {
+                    'method': 'CVSSv31',
+                    'score': number % 10,
+                    'severity': SEVERITIES[number % len(SEVERITIES)],
+                    'source_name': 'nvd',
+                    'source_url': 'https://nvd.nist.gov',
+                    'vector': '',
+                    'version': 3.1,
+                    'vulner_id': f'BENCH-{number}',
+                }
+                for number in numbers
+            ],
+        )
+
+    service_db.update_vulners_primary_ratings()
+    service_db.refresh_vulners_search_index()
+    service_db.analyze_vulners_tables()
+    service_db.session.commit()
+
+
+def measure(engine, search_query: VulnersSearchQueryDTO, requests_count: int) -> tuple[float, float, int]:
+    """
+    Функция замера задержки поиска
+
+    :param engine: Движок базы данных
+    :param search_query: Строка поиска и фильтры
+    :param requests_count: Количество повторных запросов
+    :return: Задержка первого запроса и медиана повторных в миллисекундах, количество найденных уязвимостей
+    """
+
+    with ServiceDB(engine) as service_db:
+        service_db.bump_vulner_db_generation()
+        service_db.session.commit()
+
+    latencies = []
+    for _ in range(requests_count + 1):
+        with ServiceDB(engine) as service_db:
+            started_at = time.perf_counter()
+            result = service_db.search_vulners(search_query)
+            latencies.append((time.perf_counter() - started_at) * 1000)
+
+    return latencies[0], statistics.median(latencies[1:]), result.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url')
+    parser.add_argument('--vulners', type=int, default=200_000)
+    parser.add_argument('--affects', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    database_file = None
+    database_url = args.database_url
+    if database_url is None:
+        database_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        database_url = f'sqlite:///{database_file}'
+
+    engine = create_engine(database_url)
+    try:
+        Base.metadata.drop_all(engine)
+        apply_migrations(engine)
+        with ServiceDB(engine) as service_db:
+            prepare_database(service_db, args.vulners, args.affects)
+
+        print(f'{engine.dialect.name}: {args.vulners} vulners, {args.vulners * args.affects} affects')
+        for name, search_query in SEARCH_QUERIES.items():
+            first_latency, repeated_latency, count = measure(engine, search_query, args.requests)
+            print(f'{name:<16} first {first_latency:8.1f} ms  repeated {repeated_latency:8.1f} ms  found {count}')
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+        if database_file:
+            os.remove(database_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Бенчмарк векторизованного движка сопоставления версий против скалярного
+
+Запуск: PYTHONPATH=src python benchmarks/bench_vectorized.py
+"""
+
+import argparse
+import random
+import time
+
+from dpss.models import SoftComponentSchema
+
+from dbconnector.servicedb.models import AffectedORM
+from matcher.index import AffectsIndex
+from matcher.vectorized import VectorizedAffectsIndex
+from matcher.versions import parse_version
+
+
+# Версии, которые нельзя закодировать в целые числа и которые проверяются скалярно.
+UNENCODABLE_VERSIONS = ('1.0rc1', '2.0.0.dev3', '0.9b2', '1.2.3.4.5.6.7')
+
+
+def make_version(rnd: random.Random) -> str:
+    """Функция генерации случайной версии"""
+
+    if rnd.random() < 0.02:
+        return rnd.choice(UNENCODABLE_VERSIONS)
+
+    return '.'.join(str(rnd.randint(0, 20)) for _ in range(rnd.randint(1, 4)))
+
+
+def make_dataset(packages_count: int, affects_count: int, components_count: int, seed: int) -> tuple[list, list]:
+    """
+    Функция генерации синтетической базы затронутого ПО и компонентов парка хостов
+
+    :param packages_count: Количество пакетов
+    :param affects_count: Количество записей затронутого ПО
+    :param components_count: Количество компонентов
+    :param seed: Зерно генератора
+    :return: Компоненты и записи затронутого ПО
+    """
+
+    rnd = random.Random(seed)
+    names = [f'package-{number}' for number in range(packages_count)]
+
+    affects = [
+        AffectedORM(
+            id=affect_id,
+            name=rnd.choice(names),
+            vendor='',
+            type='pypi',
+            start_condition=rnd.choice(('>=', '>')),
+            start_value=make_version(rnd),
+            end_value=rnd.choice((make_version(rnd), make_version(rnd), 'inf')),
+            end_condition=rnd.choice(('<=', '<')),
+            vulner_id=f'PYUP-{affect_id}',
+        )
+        for affect_id in range(1, affects_count + 1)
+    ]
+    components = [
+        SoftComponentSchema.model_construct(name=rnd.choice(names), version=make_version(rnd))
+        for _ in range(components_count)
+    ]
+
+    return components, affects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=2_000)
+    parser.add_argument('--affects', type=int, default=100_000)
+    parser.add_argument('--components', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    components, affects = make_dataset(args.packages, args.affects, args.components, args.seed)
+
+    started_at = time.perf_counter()
+    index = AffectsIndex(affects)
+    scalar_build_time = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    vectorized_index = VectorizedAffectsIndex(index)
+    vectorized_build_time = time.perf_counter() - started_at
+
+    # Разбор версий кэшируется, прогрев исключает его из сравнения движков.
+    for component in components:
+        parse_version(component.version)
+
+    started_at = time.perf_counter()
+    scalar_ids = index.match(components)
+    scalar_time = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    vectorized_ids = vectorized_index.match(components)
+    vectorized_time = time.perf_counter() - started_at
+
+    print(f'packages={args.packages} affects={args.affects} components={args.components}')
+    print(f'index build:   scalar {scalar_build_time:.3f} s, vectorized +{vectorized_build_time:.3f} s')
+    print(f'scalar match:      {scalar_time:.3f} s')
+    print(f'vectorized match:  {vectorized_time:.3f} s (x{scalar_time / vectorized_time:.1f})')
+    print(f'same affected ids: {scalar_ids == vectorized_ids} ({len(scalar_ids)} found)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Бенчмарк импорта уязвимостей: прежняя загрузка с фиксацией каждого документа против потокового импорта пакетами
+
+Запуск: PYTHONPATH=src python benchmarks/bench_vulner_import.py [--database-url postgresql+psycopg2://...]
+По умолчанию используется SQLite в памяти, для PostgreSQL указывается отдельная тестовая база.
+Файлы уязвимостей генерируются во временном каталоге, прежняя загрузка замеряется на части файлов.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine.base import Engine
+from sqlalchemy.pool import StaticPool
+
+from configs.settings import VULNER_IMPORT_PROCESSES
+from dbconnector.servicedb.migrations import apply_migrations
+from dbconnector.servicedb.models import Base, VulnerORM, AffectedORM, RatingORM, ReferenceORM
+from dbconnector.servicedb.servicedb import ServiceDB
+from dbconnector.servicedb.vulner_import import import_vulners
+
+
+def make_document(number: int) -> dict:
+    """
+    Функция создания документа уязвимости в формате пакета pyup
+
+    :param number: Номер уязвимости
+    :return: Документ уязвимости
+    """
+
+    return {
+        'global_identifier': f'PYUP-BENCH-{number}',
+        'identifier': f'CVE-2025-{number}',
+        'description': {'en': f'Vulnerability {number} in package-{number}'},
+        'source': [{'source_name': 'pyup', 'source_url': 'https://pyup.io'}],
+        'affects': [
+            {
+                'name': f'package-{number}',
+                'vendor': '',
+                'pkg_type': 'pypi',
+                'version': {
+                    'start_condition': '>=',
+                    'start_value': f'{affect_number}.0',
+                    'end_value': f'{affect_number}.5',
+                    'end_condition': '<',
+                },
+            }
+            for affect_number in range(4)
+        ],
+        'ratings': [
+            {
+                'method': 'CVSSv31',
+                'score': number % 10,
+                'severity': 'high',
+                'source_name': 'nvd',
+                'source_url': 'https://nvd.nist.gov',
+                'vector': 'CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H',
+                'version': 3.1,
+            }
+        ],
+        'references': [{'source': 'nvd', 'url': f'https://nvd.nist.gov/vuln/detail/CVE-2025-{number}'}],
+    }
+
+
+def legacy_import(engine: Engine, file_paths: list[Path]) -> None:
+    """Прежняя загрузка: ORM-объекты и фиксация транзакции на каждый документ"""
+
+    with ServiceDB(engine) as service_db:
+        session = service_db.session
+        for file_path in file_paths:
+            doc = orjson.loads(file_path.read_bytes())
+            vulner = VulnerORM(
+                global_identifier=doc['global_identifier'],
+                identifier=doc['identifier'],
+                description=doc['description']['en'],
+                source_name=doc['source'][0]['source_name'],
+                source_url=doc['source'][0]['source_url'],
+            )
+            session.add(vulner)
+            session.commit()
+
+            all_related_rows = []
+            for affected in doc['affects']:
+                all_related_rows.append(
+                    AffectedORM(
+                        name=affected['name'],
+                        vendor=affected['vendor'],
+                        type=affected['pkg_type'],
+                        start_condition=affected['version']['start_condition'],
+                        start_value=affected['version']['start_value'],
+                        end_value=affected['version']['end_value'],
+                        end_condition=affected['version']['end_condition'],
+                        vulner=vulner,
+                    )
+                )
+            for reference in doc['references']:
+                all_related_rows.append(ReferenceORM(source=reference['source'], url=reference['url'], vulner=vulner))
+            for rating in doc['ratings']:
+                all_related_rows.append(
+                    RatingORM(
+                        method=rating['method'],
+                        score=rating['score'],
+                        severity=rating['severity'],
+                        source_name=rating['source_name'],
+                        source_url=rating['source_url'],
+                        vector=rating['vector'],
+                        version=rating['version'],
+                        vulner=vulner,
+                    )
+                )
+            session.add_all(all_related_rows)
+            session.commit()
+
+
+def count_rows(engine: Engine) -> int:
+    with ServiceDB(engine) as service_db:
+        return sum(
+            service_db.session.scalar(select(func.count()).select_from(model))
+            for model in (VulnerORM, AffectedORM, RatingORM, ReferenceORM)
+        )
+
+
+def reset_database(engine: Engine) -> None:
+    Base.metadata.drop_all(engine)
+    apply_migrations(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--vulners', type=int, default=20_000)
+    parser.add_argument('--legacy-vulners', type=int, default=2_000)
+    parser.add_argument('--processes', type=int, default=VULNER_IMPORT_PROCESSES)
+    args = parser.parse_args()
+
+    if args.database_url.startswith('sqlite'):
+        engine = create_engine(args.database_url, poolclass=StaticPool)
+    else:
+        engine = create_engine(args.database_url)
+
+    with tempfile.TemporaryDirectory() as packages_dir:
+        packages_dir = Path(packages_dir)
+        file_paths = []
+        for number in range(args.vulners):
+            file_path = packages_dir / f'{number % 100:02d}' / f'PYUP-BENCH-{number}.json'
+            file_path.parent.mkdir(exist_ok=True)
+            file_path.write_bytes(orjson.dumps(make_document(number)))
+            file_paths.append(file_path)
+
+        reset_database(engine)
+        started_at = time.perf_counter()
+        legacy_import(engine, file_paths[:args.legacy_vulners])
+        legacy_duration = time.perf_counter() - started_at
+        legacy_rows_per_second = count_rows(engine) / legacy_duration
+
+        reset_database(engine)
+        stats = import_vulners(engine, packages_dir, processes=args.processes)
+        resumed_stats = import_vulners(engine, packages_dir, processes=args.processes)
+
+    Base.metadata.drop_all(engine)
+
+    print(f'{engine.dialect.name}: {args.vulners} files, {stats.rows_count} rows')
+    print(f'legacy  {legacy_rows_per_second:10.0f} rows/s ({args.legacy_vulners} files in {legacy_duration:.2f} s)')
+    print(f'bulk    {stats.rows_per_second:10.0f} rows/s ({stats.files_count} files in {stats.duration:.2f} s)')
+    print(f'speedup: x{stats.rows_per_second / legacy_rows_per_second:.1f}')
+    print(f'repeated import: {resumed_stats.skipped_files_count} files skipped, {resumed_stats.rows_count} rows written')
+
+
+if __name__ == '__main__':
+    main()
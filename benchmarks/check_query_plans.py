@@ -0,0 +1,251 @@
+"""
+Проверка планов горячих запросов ServiceDB: каждый запрос должен читать таблицы по индексам
+
+Запуск: PYTHONPATH=src python benchmarks/check_query_plans.py [--database-url postgresql+psycopg2://...]
+По умолчанию используется SQLite в памяти, для PostgreSQL указывается отдельная тестовая база.
+Схема создается миграциями. В PostgreSQL последовательное чтение отключается (enable_seqscan = off),
+поэтому Seq Scan в плане остается, только если подходящего индекса нет.
+Код завершения 1, если хотя бы один запрос читает таблицу сервиса целиком.
+"""
+
+import argparse
+import json
+import sys
+from typing import Callable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine.base import Engine
+from sqlalchemy.pool import StaticPool
+
+from dpss.models import SoftComponentSchema
+
+from dbconnector.servicedb.migrations import apply_migrations
+from dbconnector.servicedb.models import (
+    Base,
+    ScanConfigORM,
+    ProjectConfigORM,
+    VulnerORM,
+    AffectedORM,
+    RatingORM,
+    ReferenceORM,
+)
+from dbconnector.servicedb.servicedb import ServiceDB
+from models.scanner_models import (
+    ReportAddDTO,
+    AffectedProjectDTO,
+    ScannedProjectDTO,
+    VulnersQueryDTO,
+    VulnersSortField,
+    VulnersSearchQueryDTO,
+    PackageQueryDTO,
+)
+
+
+SERVICE_TABLES = set(Base.metadata.tables)
+
+
+def prepare_database(service_db: ServiceDB, vulners_count: int) -> int:
+    """
+    Функция заполнения базы уязвимостями, конфигурацией сканирования и отчетом
+
+    :param service_db: Сервисная база данных
+    :param vulners_count: Количество уязвимостей
+    :return: Идентификатор отчета
+    """
+
+    scan_config = ScanConfigORM(name='plans', host='localhost', user='plans', secret='plans', port='22')
+    service_db.session.add(scan_config)
+    service_db.session.flush()
+
+    projects = [
+        ProjectConfigORM(name=f'project-{number}', type='python', dir_path='/', scan_config_id=scan_config.id)
+        for number in range(5)
+    ]
+    service_db.session.add_all(projects)
+    service_db.session.flush()
+
+    for number in range(vulners_count):
+        global_identifier = f'PLANS-{number}'
+        service_db.session.add(
+            VulnerORM(
+                global_identifier=global_identifier,
+                identifier=f'CVE-2025-{number}',
+                description=f'Vulnerability {number}',
+                source_name='pyup',
+                source_url='https://pyup.io',
+            )
+        )
+        service_db.session.add_all(
+            [
+                AffectedORM(
+                    name=f'package-{number}',
+                    vendor='',
+                    type='pypi',
+                    start_condition='>=',
+                    start_value='1.0',
+                    end_value='2.0',
+                    end_condition='<',
+                    vulner_id=global_identifier,
+                ),
+                RatingORM(
+                    method='CVSSv31',
+                    score=number % 10,
+                    severity='high',
+                    source_name='nvd',
+                    source_url='https://nvd.nist.gov',
+                    vector='',
+                    version=3.1,
+                    vulner_id=global_identifier,
+                ),
+                ReferenceORM(source='nvd', url='https://nvd.nist.gov', vulner_id=global_identifier),
+            ]
+        )
+    service_db.session.flush()
+    service_db.update_vulners_primary_ratings()
+    service_db.refresh_vulners_search_index()
+    service_db.session.commit()
+
+    return service_db.save_report(
+        ReportAddDTO(
+            scan_config_id=scan_config.id,
+            projects=[
+                AffectedProjectDTO(affected_id=affected_id, project_config_id=project.id)
+                for project in projects
+                for affected_id in range(1, 11)
+            ],
+            scanned_projects=[ScannedProjectDTO(project_config_id=project.id) for project in projects],
+        )
+    )
+
+
+def get_hot_queries(report_id: int) -> dict[str, Callable[[ServiceDB], object]]:
+    """
+    Функция получения горячих запросов сервиса
+
+    :param report_id: Идентификатор отчета
+    :return: Вызовы методов ServiceDB по названию
+    """
+
+    return {
+        'get_all_project_configs': lambda service_db: service_db.get_all_project_configs(1),
+        'get_scan_config': lambda service_db: service_db.get_scan_config(1),
+        'get_report': lambda service_db: service_db.get_report(report_id),
+        'iter_report_findings': lambda service_db: list(service_db.iter_report_findings(report_id)),
+        'get_vulner_data': lambda service_db: service_db.get_vulner_data('PLANS-1'),
+        'get_vulners by score': lambda service_db: service_db.get_vulners(
+            page_size=20,
+            vulners_query=VulnersQueryDTO(sort_by=VulnersSortField.score),
+        ),
+        'get_vulners next page': lambda service_db: service_db.get_vulners(
+            page_size=20,
+            cursor=service_db.get_vulners(
+                page_size=20,
+                vulners_query=VulnersQueryDTO(sort_by=VulnersSortField.score),
+            ).next_cursor,
+            vulners_query=VulnersQueryDTO(sort_by=VulnersSortField.score),
+        ),
+        'search_vulners': lambda service_db: service_db.search_vulners(
+            VulnersSearchQueryDTO(query='package-1', severity=['high'], package_type=['pypi'])
+        ),
+        'get_affects_vulners': lambda service_db: service_db.get_affects_vulners({1, 2, 3}),
+        'get_project_scan_states': lambda service_db: service_db.get_project_scan_states([1, 2]),
+        'find_vulnerable_software': lambda service_db: service_db.find_vulnerable_software(
+            [SoftComponentSchema.model_construct(name='package-1', version='1.5')]
+        ),
+        'find_package_vulners': lambda service_db: service_db.find_package_vulners(
+            [PackageQueryDTO(name='package-1', type='pypi', version='1.5')]
+        ),
+    }
+
+
+def get_full_scans(engine: Engine, statement: str, parameters) -> list[str]:
+    """
+    Функция получения таблиц сервиса, которые запрос читает целиком
+
+    :param engine: Движок базы данных
+    :param statement: Текст запроса
+    :param parameters: Параметры запроса
+    :return: Строки плана с полным чтением таблиц
+    """
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if engine.dialect.name == 'postgresql':
+            cursor.execute('SET enable_seqscan = off')
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+            (plan,) = cursor.fetchone()
+            plan = plan if isinstance(plan, list) else json.loads(plan)
+
+            full_scans = []
+            nodes = [plan[0]['Plan']]
+            while nodes:
+                node = nodes.pop()
+                nodes.extend(node.get('Plans', []))
+                if node['Node Type'] == 'Seq Scan' and node['Relation Name'] in SERVICE_TABLES:
+                    full_scans.append(f'Seq Scan on {node["Relation Name"]}')
+            return full_scans
+
+        cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+        full_scans = []
+        for row in cursor.fetchall():
+            detail = row[-1]
+            words = detail.split()
+            if words[0] == 'SCAN' and words[1] in SERVICE_TABLES and 'USING' not in words:
+                full_scans.append(detail)
+        return full_scans
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--vulners', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.database_url.startswith('sqlite'):
+        engine = create_engine(args.database_url, poolclass=StaticPool)
+    else:
+        engine = create_engine(args.database_url)
+    Base.metadata.drop_all(engine)
+    apply_migrations(engine)
+
+    with ServiceDB(engine) as service_db:
+        report_id = prepare_database(service_db, args.vulners)
+
+    executed_statements = []
+
+    def capture_statement(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            executed_statements.append((statement, parameters))
+
+    failed_queries = []
+    for name, query in get_hot_queries(report_id).items():
+        executed_statements.clear()
+        event.listen(engine, 'before_cursor_execute', capture_statement)
+        try:
+            with ServiceDB(engine) as service_db:
+                query(service_db)
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture_statement)
+
+        full_scans = [
+            full_scan
+            for statement, parameters in executed_statements
+            for full_scan in get_full_scans(engine, statement, parameters)
+        ]
+        print(f'{name:<26} {len(executed_statements)} queries  {"FULL SCAN: " + "; ".join(full_scans) if full_scans else "index"}')
+        if full_scans:
+            failed_queries.append(name)
+
+    Base.metadata.drop_all(engine)
+
+    if failed_queries:
+        print(f'queries without index: {", ".join(failed_queries)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
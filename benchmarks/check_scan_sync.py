@@ -0,0 +1,209 @@
+"""
+Проверка сканирования, во время которого синхронизация уязвимостей удаляет затронутое ПО
+
+Запуск: PYTHONPATH=src python benchmarks/check_scan_sync.py [--database-url postgresql+psycopg2://...]
+По умолчанию используется временный файл SQLite, для PostgreSQL указывается отдельная тестовая база.
+Сканирование сопоставляет компоненты со снимком затронутого ПО до синхронизации, а отчет и его снимок
+сохраняет после нее, как сканирование, начатое до фиксации синхронизации.
+Код завершения 1, если отчет не сохранился, ссылается на удаленное затронутое ПО
+или отчет, его снимок и выгрузка найденного ПО расходятся.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import orjson
+from sqlalchemy import create_engine, select
+
+from dpss.models import SoftComponentSchema
+
+from dbconnector.servicedb.migrations import apply_migrations
+from dbconnector.servicedb.models import Base, ScanConfigORM, ProjectConfigORM, AffectedORM, AffectedProjectsORM
+from dbconnector.servicedb.servicedb import ServiceDB
+from dbconnector.servicedb.vulner_import import import_vulners
+from dbconnector.servicedb.vulner_sync import sync_vulners
+from matcher.index import AffectsIndex
+from models.scanner_models import ReportAddDTO, AffectedProjectDTO, ScannedProjectDTO
+from services.report_snapshots import make_report_snapshot, decode_content
+
+
+PACKAGES_COUNT = 10
+# Пакеты, уязвимости которых синхронизация изменяет и отзывает.
+CHANGED_PACKAGE = 1
+WITHDRAWN_PACKAGE = 2
+
+
+def make_document(number: int, end_value: str = '1.5') -> dict:
+    """
+    Функция создания документа уязвимости в формате пакета pyup
+
+    :param number: Номер уязвимости и пакета
+    :param end_value: Верхняя граница уязвимых версий
+    :return: Документ уязвимости
+    """
+
+    return {
+        'global_identifier': f'PYUP-CHECK-{number}',
+        'identifier': f'CVE-2025-{number}',
+        'description': {'en': f'Vulnerability {number} in package-{number}'},
+        'source': [{'source_name': 'pyup', 'source_url': 'https://pyup.io'}],
+        'affects': [
+            {
+                'name': f'package-{number}',
+                'vendor': '',
+                'pkg_type': 'pypi',
+                'version': {'start_condition': '>=', 'start_value': '1.0', 'end_value': end_value, 'end_condition': '<'},
+            }
+        ],
+        'ratings': [{'method': 'CVSSv31', 'score': 7.5, 'severity': 'high', 'version': 3.1}],
+        'references': [],
+    }
+
+
+def write_documents(packages_dir: Path, documents: dict[int, dict]) -> None:
+    """
+    Функция записи файлов уязвимостей пакета
+
+    :param packages_dir: Каталог пакетов уязвимостей
+    :param documents: Документы по номеру уязвимости
+    """
+
+    for file_path in packages_dir.glob('*.json'):
+        file_path.unlink()
+    for number, document in documents.items():
+        (packages_dir / f'{number}.json').write_bytes(orjson.dumps(document))
+
+
+def get_report_affected_ids(service_db: ServiceDB, report_id: int) -> dict[str, set[int]]:
+    """
+    Функция получения найденного затронутого ПО из отчета, его снимка и выгрузки
+
+    :param service_db: Сервисная база данных
+    :param report_id: Идентификатор отчета
+    :return: Идентификаторы затронутого ПО по источнику
+    """
+
+    report = service_db.get_report(report_id)
+    report_snapshot = service_db.get_report_snapshot(report_id)
+    snapshot_report = orjson.loads(decode_content(report_snapshot.content, report_snapshot.encoding))
+
+    return {
+        'report': {affect.affected.id for project in report.affects_projects for affect in project.affects},
+        'snapshot': {
+            affect['affected']['id'] for project in snapshot_report['affects_projects'] for affect in project['affects']
+        },
+        'findings': {
+            finding.affected_id for findings in service_db.iter_report_findings(report_id) for finding in findings
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    database_file = None
+    database_url = args.database_url
+    if database_url is None:
+        database_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        database_url = f'sqlite:///{database_file}'
+
+    engine = create_engine(database_url)
+    packages_dir = Path(tempfile.mkdtemp())
+    errors = []
+    try:
+        Base.metadata.drop_all(engine)
+        apply_migrations(engine)
+
+        documents = {number: make_document(number) for number in range(PACKAGES_COUNT)}
+        write_documents(packages_dir, documents)
+        import_vulners(engine, packages_dir, processes=1)
+
+        with ServiceDB(engine) as service_db:
+            scan_config = ScanConfigORM(name='check', host='localhost', user='check', secret='check', port='22')
+            service_db.session.add(scan_config)
+            service_db.session.flush()
+            project = ProjectConfigORM(
+                name='project', type='python', dir_path='/opt/project', scan_config_id=scan_config.id,
+            )
+            service_db.session.add(project)
+            service_db.session.commit()
+            scan_config_id, project_id = scan_config.id, project.id
+
+            # Снимок затронутого ПО и поколение, с которыми начинается сканирование.
+            generation = service_db.get_vulner_db_generation()
+            index = AffectsIndex(service_db.get_all_affects())
+
+        components = [
+            SoftComponentSchema.model_construct(name=f'package-{number}', version='1.2')
+            for number in range(PACKAGES_COUNT)
+        ]
+        affected_ids = index.match(components)
+
+        documents[CHANGED_PACKAGE] = make_document(CHANGED_PACKAGE, end_value='1.8')
+        del documents[WITHDRAWN_PACKAGE]
+        write_documents(packages_dir, documents)
+        stats = sync_vulners(engine, packages_dir, processes=1)
+        print(
+            f'scan matched {len(affected_ids)} affects at generation {generation}, sync: {stats.updated_count} updated, '
+            f'{stats.withdrawn_count} withdrawn, generation {stats.generation}'
+        )
+
+        with ServiceDB(engine) as service_db:
+            try:
+                report_id = service_db.save_report(
+                    ReportAddDTO(
+                        scan_config_id=scan_config_id,
+                        projects=[
+                            AffectedProjectDTO(affected_id=affected_id, project_config_id=project_id)
+                            for affected_id in affected_ids
+                        ],
+                        scanned_projects=[ScannedProjectDTO(project_config_id=project_id, is_reused=False)],
+                    )
+                )
+            except Exception as err:
+                service_db.session.rollback()
+                print(f'report is not saved: {err!r}')
+                sys.exit(1)
+
+            # Снимок с поколением, прочитанным до фиксации синхронизации, не должен отдаваться.
+            stale_report = service_db.get_report(report_id)
+            service_db.save_report_snapshot(make_report_snapshot(stale_report, generation))
+            if service_db.get_report_snapshot(report_id) is not None:
+                errors.append('snapshot of the previous vulner DB generation is served')
+            service_db.save_report_snapshot(
+                make_report_snapshot(service_db.get_report(report_id), service_db.get_vulner_db_generation())
+            )
+
+            existing_ids = set(service_db.session.scalars(select(AffectedORM.id)))
+            saved_ids = get_report_affected_ids(service_db, report_id)
+            # SQLite не проверяет внешние ключи, поэтому записи удаленного затронутого ПО ищутся явно.
+            statement = select(AffectedProjectsORM.affected_id).where(AffectedProjectsORM.report_id == report_id)
+            dangling_ids = set(service_db.session.scalars(statement)) - existing_ids
+
+        expected_ids = set(affected_ids) & existing_ids
+        if dangling_ids:
+            errors.append(f'report refers to deleted affects {sorted(dangling_ids)}')
+        for source, ids in saved_ids.items():
+            print(f'{source:<9} {len(ids)} affects')
+            if ids != expected_ids:
+                errors.append(f'{source} affects {sorted(ids)} differ from existing scan affects {sorted(expected_ids)}')
+        if len(expected_ids) != PACKAGES_COUNT - 2:
+            errors.append(f'{len(expected_ids)} of {PACKAGES_COUNT - 2} unchanged affects are found')
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+        if database_file:
+            os.remove(database_file)
+
+    if errors:
+        print('\n'.join(errors))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
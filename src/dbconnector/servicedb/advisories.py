@@ -0,0 +1,147 @@
+"""
+Модуль разбора файлов уязвимостей пакета pyup в строки таблиц сервисной базы данных.
+Модуль не зависит от базы данных, поэтому процессы разбора импортируют только его.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import orjson
+
+
+@dataclass
+class AdvisoryRows:
+    """Строки таблиц уязвимостей, полученные из одного файла"""
+
+    path: str
+    size: int
+    modified_at_ns: int
+    vulners: list[dict] = field(default_factory=list)
+    affects: list[dict] = field(default_factory=list)
+    ratings: list[dict] = field(default_factory=list)
+    references: list[dict] = field(default_factory=list)
+
+
+def get_text(value) -> str:
+    """
+    Функция получения текста поля документа: строки или словаря переводов
+
+    :param value: Значение поля
+    :return: Текст, английский вариант для словаря переводов
+    """
+
+    if isinstance(value, dict):
+        return value.get('en') or next(iter(value.values()), '')
+    return value or ''
+
+
+def get_content_hash(vulner: dict, affects: list[dict], ratings: list[dict], references: list[dict]) -> str:
+    """
+    Функция получения хэша содержимого уязвимости вместе с дочерними строками.
+    Порядок дочерних строк учитывается: основной рейтинг - первый рейтинг уязвимости.
+
+    :param vulner: Строка уязвимости без хэша
+    :param affects: Строки затронутого ПО
+    :param ratings: Строки рейтингов
+    :param references: Строки ссылок
+    :return: Хэш SHA-256
+    """
+
+    content = orjson.dumps([vulner, affects, ratings, references], option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(content).hexdigest()
+
+
+def add_advisory_rows(advisory_rows: AdvisoryRows, document: dict) -> None:
+    """
+    Функция добавления строк таблиц по документу уязвимости
+
+    :param advisory_rows: Строки файла
+    :param document: Документ уязвимости
+    """
+
+    global_identifier = document['global_identifier']
+    sources = document.get('source') or [{}]
+    source = sources[0] if isinstance(sources, list) else sources
+
+    vulner = {
+        'global_identifier': global_identifier,
+        'identifier': document.get('identifier') or '',
+        'description': get_text(document.get('description')),
+        'source_name': source.get('source_name') or '',
+        'source_url': source.get('source_url') or '',
+    }
+
+    affects = []
+    for affected in document.get('affects') or []:
+        version = affected.get('version') or {}
+        affects.append(
+            {
+                'name': affected['name'],
+                'vendor': affected.get('vendor') or '',
+                'type': affected.get('pkg_type') or '',
+                'start_condition': version.get('start_condition') or '',
+                'start_value': version.get('start_value') or '',
+                'end_value': version.get('end_value') or '',
+                'end_condition': version.get('end_condition') or '',
+                'vulner_id': global_identifier,
+            }
+        )
+
+    ratings = []
+    for rating in document.get('ratings') or []:
+        # Рейтинг без оценки не сохраняется: оценка обязательна в таблице рейтингов.
+        if rating.get('score') is None:
+            continue
+
+        ratings.append(
+            {
+                'method': rating.get('method') or '',
+                'score': float(rating['score']),
+                'severity': rating.get('severity') or '',
+                'source_name': rating.get('source_name') or '',
+                'source_url': rating.get('source_url') or '',
+                'vector': rating.get('vector') or '',
+                'version': float(rating.get('version') or 0),
+                'vulner_id': global_identifier,
+            }
+        )
+
+    references = [
+        {
+            'source': reference.get('source') or '',
+            'url': reference.get('url') or '',
+            'vulner_id': global_identifier,
+        }
+        for reference in document.get('references') or []
+    ]
+
+    vulner['content_hash'] = get_content_hash(vulner, affects, ratings, references)
+    advisory_rows.vulners.append(vulner)
+    advisory_rows.affects.extend(affects)
+    advisory_rows.ratings.extend(ratings)
+    advisory_rows.references.extend(references)
+
+
+def parse_advisory_file(packages_dir: Path, file_path: Path) -> AdvisoryRows:
+    """
+    Функция разбора файла уязвимостей: один документ или список документов.
+    Выполняется в процессе разбора.
+
+    :param packages_dir: Каталог пакетов уязвимостей
+    :param file_path: Путь до файла
+    :return: Строки таблиц уязвимостей
+    """
+
+    file_stat = file_path.stat()
+    advisory_rows = AdvisoryRows(
+        path=file_path.relative_to(packages_dir).as_posix(),
+        size=file_stat.st_size,
+        modified_at_ns=file_stat.st_mtime_ns,
+    )
+
+    content = orjson.loads(file_path.read_bytes())
+    for document in content if isinstance(content, list) else [content]:
+        add_advisory_rows(advisory_rows, document)
+
+    return advisory_rows
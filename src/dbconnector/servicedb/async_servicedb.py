@@ -0,0 +1,118 @@
+"""
+Модуль асинхронного чтения из сервисной базы данных
+"""
+
+from typing import Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dbconnector.servicedb.servicedb import ServiceDB
+from dbconnector.servicedb.session import get_async_session_factory
+from models.scanner_models import (
+    ScanConfigGetDTO,
+    ProjectConfigGetDTO,
+    ReportGetDTO,
+    ReportFullDTO,
+    ReportSnapshotDTO,
+    VulnerGetDTO,
+    VulnersBasicsGetDTO,
+    VulnersQueryDTO,
+    VulnersSearchQueryDTO,
+    VulnersSearchDTO,
+    PackageQueryDTO,
+    PackageVulnersDTO,
+)
+
+
+Result = TypeVar('Result')
+
+
+class AsyncServiceDB:
+    """
+    Класс асинхронной работы с базой данных сервера.
+    Запросы ServiceDB выполняются через run_sync на соединении асинхронного драйвера:
+    поток не блокируется на ожидании базы, а логика запросов общая с синхронным вариантом.
+    """
+
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        """
+        Инициализация класса.
+        Переданная сессия принадлежит вызывающему коду и не закрывается в контексте.
+
+        :param session: Открытая асинхронная сессия
+        """
+
+        self.session = session
+        self.is_session_owner = session is None
+
+    async def __aenter__(self):
+        """Инициализация контекста"""
+
+        if self.is_session_owner:
+            self.session = get_async_session_factory()()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Финализация контекста"""
+
+        if self.session and self.is_session_owner:
+            if exc_type is not None:
+                await self.session.rollback()
+            await self.session.close()
+
+    async def run(self, method: Callable[[ServiceDB], Result]) -> Result:
+        """
+        Метод выполнения запроса ServiceDB на асинхронной сессии
+
+        :param method: Функция, принимающая ServiceDB на синхронном представлении сессии
+        :return: Результат функции
+        """
+
+        return await self.session.run_sync(lambda session: method(ServiceDB(session=session)))
+
+    async def get_scan_config(self, config_id: int) -> ScanConfigGetDTO | None:
+        return await self.run(lambda service_db: service_db.get_scan_config(config_id))
+
+    async def get_all_scan_configs(self) -> list[ScanConfigGetDTO]:
+        return await self.run(lambda service_db: service_db.get_all_scan_configs())
+
+    async def get_project_config(self, config_id: int) -> ProjectConfigGetDTO | None:
+        return await self.run(lambda service_db: service_db.get_project_config(config_id))
+
+    async def get_all_reports(self) -> list[ReportGetDTO]:
+        return await self.run(lambda service_db: service_db.get_all_reports())
+
+    async def get_report(self, report_id: int) -> ReportFullDTO | None:
+        return await self.run(lambda service_db: service_db.get_report(report_id))
+
+    async def get_report_snapshot(self, report_id: int) -> ReportSnapshotDTO | None:
+        return await self.run(lambda service_db: service_db.get_report_snapshot(report_id))
+
+    async def save_report_snapshot(self, report_snapshot: ReportSnapshotDTO) -> None:
+        await self.run(lambda service_db: service_db.save_report_snapshot(report_snapshot))
+
+    async def get_vulner_data(self, vulner_id: str) -> VulnerGetDTO:
+        return await self.run(lambda service_db: service_db.get_vulner_data(vulner_id))
+
+    async def get_vulners(
+            self,
+            page: int = 1,
+            page_size: int = 20,
+            cursor: str | None = None,
+            vulners_query: VulnersQueryDTO | None = None,
+    ) -> VulnersBasicsGetDTO:
+        return await self.run(lambda service_db: service_db.get_vulners(page, page_size, cursor, vulners_query))
+
+    async def search_vulners(
+            self,
+            search_query: VulnersSearchQueryDTO,
+            page: int = 1,
+            page_size: int = 20,
+    ) -> VulnersSearchDTO:
+        return await self.run(lambda service_db: service_db.search_vulners(search_query, page, page_size))
+
+    async def get_vulner_db_generation(self) -> int:
+        return await self.run(lambda service_db: service_db.get_vulner_db_generation())
+
+    async def find_package_vulners(self, packages: list[PackageQueryDTO]) -> list[PackageVulnersDTO]:
+        return await self.run(lambda service_db: service_db.find_package_vulners(packages))
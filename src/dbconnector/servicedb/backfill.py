@@ -0,0 +1,22 @@
+"""
+Модуль заполнения производных данных уязвимостей: основного рейтинга и поискового индекса
+"""
+
+import logging
+
+from dbconnector.servicedb.servicedb import ServiceDB
+
+
+def main():
+    with ServiceDB() as service_db:
+        service_db.update_vulners_primary_ratings()
+        service_db.refresh_vulners_search_index()
+        generation = service_db.bump_vulner_db_generation()
+        service_db.analyze_vulners_tables()
+        service_db.session.commit()
+
+    logging.info(f'Vulners derived data is updated, vulner DB generation {generation}')
+
+
+if __name__ == '__main__':
+    main()
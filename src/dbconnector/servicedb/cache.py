@@ -0,0 +1,58 @@
+"""
+Модуль кэша значений, действительных в пределах поколения базы уязвимостей
+"""
+
+from threading import Lock
+from typing import Any, Hashable
+
+
+class GenerationCache:
+    """Класс кэша, который очищается при смене поколения базы уязвимостей"""
+
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        Инициализация класса
+
+        :param max_size: Максимальное количество значений одного поколения
+        """
+
+        self.max_size = max_size
+        self._generation: int | None = None
+        self._values: dict[Hashable, Any] = {}
+        self._lock = Lock()
+
+    def get(self, generation: int, key: Hashable) -> Any | None:
+        """
+        Метод получения значения
+
+        :param generation: Текущее поколение базы уязвимостей
+        :param key: Ключ значения
+        :return: Значение или None, если значение не вычислялось для этого поколения
+        """
+
+        with self._lock:
+            if generation != self._generation:
+                return None
+            return self._values.get(key)
+
+    def set(self, generation: int, key: Hashable, value: Any) -> None:
+        """
+        Метод сохранения значения
+
+        :param generation: Поколение базы уязвимостей, для которого вычислено значение
+        :param key: Ключ значения
+        :param value: Значение
+        """
+
+        with self._lock:
+            if generation != self._generation:
+                self._generation = generation
+                self._values = {}
+            if len(self._values) >= self.max_size:
+                self._values.pop(next(iter(self._values)))
+            self._values[key] = value
+
+
+vulners_count_cache = GenerationCache()
+# Количество найденных уязвимостей и фасеты поиска по строке поиска и фильтрам.
+vulners_search_cache = GenerationCache()
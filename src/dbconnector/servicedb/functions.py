@@ -1,14 +1,127 @@
+import io
+import json
+
 import sqlalchemy as db
-from sqlalchemy.engine.base import Engine
-from configs.settings import SERVICE_DB_CONNECTION_STRING
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.base import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.sql.schema import Table
+from configs.settings import (
+    SERVICE_DB_CONNECTION_STRING,
+    ASYNC_SERVICE_DB_CONNECTION_STRING,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
+
+
+# Асинхронные драйверы баз данных по имени СУБД.
+ASYNC_DRIVERS = {
+    'postgresql': 'asyncpg',
+    'sqlite': 'aiosqlite',
+}
+
+
+def get_pool_options(connection_string: str) -> dict:
+    """
+    Функция получения настроек пула соединений.
+    Для SQLite используется пул по умолчанию: его размер не настраивается.
+
+    :param connection_string: Строка подключения к БД
+    :return: Параметры пула для создания движка
+    """
+
+    if make_url(connection_string).get_backend_name() == 'sqlite':
+        return {}
+
+    return dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
 
 
 def get_db_engine(connection_string: str = SERVICE_DB_CONNECTION_STRING) -> Engine:
     """
-    Функция получения движка для базы данных
+    Функция получения движка для базы данных с пулом соединений из настроек
 
     :param connection_string: Строка подключения к БД
     :return: Движок базы данных
     """
 
-    return db.create_engine(connection_string, echo=False)
+    return db.create_engine(connection_string, echo=False, **get_pool_options(connection_string))
+
+
+def get_async_connection_string(connection_string: str = SERVICE_DB_CONNECTION_STRING) -> str:
+    """
+    Функция получения строки подключения с асинхронным драйвером
+
+    :param connection_string: Строка подключения к БД
+    :return: Строка подключения для асинхронного движка
+    """
+
+    url = make_url(connection_string)
+    backend_name = url.get_backend_name()
+    return url.set(drivername=f'{backend_name}+{ASYNC_DRIVERS[backend_name]}').render_as_string(hide_password=False)
+
+
+def get_async_db_engine(connection_string: str | None = None) -> AsyncEngine:
+    """
+    Функция получения асинхронного движка для базы данных с пулом соединений из настроек
+
+    :param connection_string: Строка подключения к БД с асинхронным драйвером, по умолчанию из настроек
+    :return: Асинхронный движок базы данных
+    """
+
+    connection_string = connection_string or ASYNC_SERVICE_DB_CONNECTION_STRING or get_async_connection_string()
+    return create_async_engine(connection_string, echo=False, **get_pool_options(connection_string))
+
+
+def format_copy_value(value) -> str:
+    """
+    Функция форматирования значения для COPY в формате csv.
+    Строки всегда заключаются в кавычки, чтобы отличать пустую строку от NULL.
+
+    :param value: Значение столбца
+    :return: Значение в формате csv
+    """
+
+    if value is None:
+        return ''
+
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+
+    return str(value)
+
+
+def copy_rows(connection: Connection, table: Table, rows: list[dict]) -> None:
+    """
+    Функция вставки строк в таблицу PostgreSQL командой COPY в рамках текущей транзакции
+
+    :param connection: Соединение сессии
+    :param table: Таблица
+    :param rows: Строки, у всех строк одинаковый набор столбцов
+    """
+
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(format_copy_value(row[column]) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    quote = connection.dialect.identifier_preparer.quote
+    statement = (
+        f'COPY {quote(table.name)} ({", ".join(quote(column) for column in columns)}) '
+        f'FROM STDIN WITH (FORMAT csv)'
+    )
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(statement, buffer)
@@ -0,0 +1,317 @@
+"""
+Модуль версионных миграций схемы сервисной базы данных.
+
+Каждая миграция применяется один раз и отмечается в таблице schema_migrations.
+Операции миграций идемпотентны, поэтому схема, созданная create_all, и существующая
+база данных прежних версий приводятся к одному состоянию.
+Индексы в PostgreSQL строятся с CONCURRENTLY, без блокировки записи в таблицы.
+
+Запуск: cd src && python -m dbconnector.servicedb.migrations
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import DDL, inspect, insert, select, text, false, true, update
+from sqlalchemy.engine.base import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+from dbconnector.servicedb.functions import get_db_engine
+from dbconnector.servicedb.models import Base, ReportORM, SchemaMigrationORM, VULNERS_SEARCH_TABLE
+from dbconnector.servicedb.servicedb import ServiceDB
+
+
+# Ключ блокировки PostgreSQL, не дающей нескольким экземплярам сервиса применять миграции одновременно.
+MIGRATIONS_LOCK_KEY = 4_021_815
+
+Operation = Callable[[Connection], None]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    Класс миграции схемы.
+    Нетранзакционные миграции выполняются в режиме autocommit: так строятся индексы с CONCURRENTLY.
+    """
+
+    version: int
+    name: str
+    operations: tuple[Operation, ...]
+    is_transactional: bool = True
+
+
+def create_tables(connection: Connection) -> None:
+    """
+    Операция создания отсутствующих таблиц вместе с их индексами
+
+    :param connection: Соединение с базой данных
+    """
+
+    Base.metadata.create_all(connection, checkfirst=True)
+
+
+def add_column(table_name: str, column_name: str, server_default=None) -> Operation:
+    """
+    Функция получения операции добавления столбца модели в существующую таблицу
+
+    :param table_name: Имя таблицы
+    :param column_name: Имя столбца
+    :param server_default: Значение по умолчанию для существующих строк, столбец будет NOT NULL
+    :return: Операция миграции
+    """
+
+    def operation(connection: Connection) -> None:
+        existing_columns = {column['name'] for column in inspect(connection).get_columns(table_name)}
+        if column_name in existing_columns:
+            return
+
+        dialect = connection.dialect
+        preparer = dialect.identifier_preparer
+        column = Base.metadata.tables[table_name].c[column_name]
+
+        definition = f'{preparer.format_column(column)} {column.type.compile(dialect=dialect)}'
+        for foreign_key in column.foreign_keys:
+            definition += (
+                f' REFERENCES {preparer.format_table(foreign_key.column.table)} '
+                f'({preparer.format_column(foreign_key.column)})'
+            )
+            if foreign_key.ondelete:
+                definition += f' ON DELETE {foreign_key.ondelete}'
+        if server_default is not None:
+            definition += f' NOT NULL DEFAULT {server_default.compile(dialect=dialect)}'
+
+        connection.execute(text(f'ALTER TABLE {preparer.format_table(column.table)} ADD COLUMN {definition}'))
+
+    return operation
+
+
+def create_index(table_name: str, index_name: str, dialect_name: str | None = None) -> Operation:
+    """
+    Функция получения операции создания индекса модели
+
+    :param table_name: Имя таблицы
+    :param index_name: Имя индекса, объявленного в моделях
+    :param dialect_name: Диалект, для которого создается индекс, по умолчанию - для всех
+    :return: Операция миграции
+    """
+
+    def operation(connection: Connection) -> None:
+        dialect = connection.dialect
+        if dialect_name is not None and dialect.name != dialect_name:
+            return
+
+        (index,) = [index for index in Base.metadata.tables[table_name].indexes if index.name == index_name]
+        statement = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+
+        if dialect.name == 'postgresql':
+            # Прерванное построение с CONCURRENTLY оставляет невалидный индекс, IF NOT EXISTS его бы пропустил.
+            is_invalid = connection.scalar(
+                text(
+                    'SELECT NOT pg_index.indisvalid FROM pg_index '
+                    'JOIN pg_class ON pg_class.oid = pg_index.indexrelid WHERE pg_class.relname = :index_name'
+                ),
+                {'index_name': index_name},
+            )
+            if is_invalid:
+                logging.warning(f'Index {index_name} is invalid and will be rebuilt')
+                connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}'))
+
+            statement = statement.replace('INDEX', 'INDEX CONCURRENTLY', 1)
+
+        connection.execute(text(statement))
+
+    return operation
+
+
+def execute_ddl(statement: str, dialect_name: str) -> Operation:
+    """
+    Функция получения операции выполнения DDL для одного диалекта
+
+    :param statement: Выражение DDL
+    :param dialect_name: Диалект базы данных
+    :return: Операция миграции
+    """
+
+    def operation(connection: Connection) -> None:
+        if connection.dialect.name == dialect_name:
+            connection.execute(DDL(statement))
+
+    return operation
+
+
+def mark_legacy_reports(connection: Connection) -> None:
+    """
+    Операция отметки отчетов, сохраненных до привязки затронутого ПО к отчету.
+    Выполняется в одной транзакции с добавлением идентификатора отчета в записи затронутого ПО,
+    поэтому отмечаются ровно все отчеты прежних версий.
+
+    :param connection: Соединение с базой данных
+    """
+
+    connection.execute(update(ReportORM).values(is_legacy=true()))
+
+
+def update_vulners_derived_data(connection: Connection) -> None:
+    """
+    Операция заполнения основного рейтинга и поискового индекса уже загруженных уязвимостей
+
+    :param connection: Соединение с базой данных
+    """
+
+    with ServiceDB(connection.engine) as service_db:
+        service_db.update_vulners_primary_ratings()
+        service_db.refresh_vulners_search_index()
+        service_db.bump_vulner_db_generation()
+        service_db.analyze_vulners_tables()
+        service_db.session.commit()
+
+
+def backfill_vulners_content_hashes(connection: Connection) -> None:
+    """
+    Операция заполнения хэшей содержимого уже загруженных уязвимостей.
+    Хэши фиксируются по пакетам, поэтому первая синхронизация после обновления не перезаписывает
+    всю базу одной транзакцией.
+
+    :param connection: Соединение с базой данных
+    """
+
+    with ServiceDB(connection.engine) as service_db:
+        service_db.backfill_vulners_content_hashes()
+
+
+MIGRATIONS = (
+    Migration(1, 'create_tables', (create_tables,)),
+    Migration(
+        2,
+        'report_scoped_findings',
+        (
+            add_column('affected_projects', 'report_id'),
+            add_column('reports_projects', 'is_reused', server_default=false()),
+            add_column('reports', 'is_legacy', server_default=false()),
+            mark_legacy_reports,
+        ),
+    ),
+    Migration(
+        3,
+        'vulners_primary_rating',
+        (
+            add_column('vulners', 'score'),
+            add_column('vulners', 'severity'),
+        ),
+    ),
+    Migration(
+        4,
+        'hot_path_indexes',
+        (
+            create_index('affects', 'ix_affects_name'),
+            create_index('affects', 'ix_affects_vulner_id'),
+            create_index('affects', 'ix_affects_type_name'),
+            create_index('ratings', 'ix_ratings_vulner_id'),
+            create_index('references', 'ix_references_vulner_id'),
+            create_index('project_configs', 'ix_project_configs_scan_config_id'),
+            create_index('affected_projects', 'ix_affected_projects_report_project'),
+            create_index('affected_projects', 'ix_affected_projects_project_report'),
+            create_index('reports_projects', 'ix_reports_projects_report_project'),
+            create_index('vulners', 'ix_vulners_score'),
+            create_index('vulners', 'ix_vulners_severity'),
+            create_index('vulners', 'ix_vulners_score_order'),
+        ),
+        is_transactional=False,
+    ),
+    Migration(
+        5,
+        'vulners_search',
+        (
+            execute_ddl('CREATE EXTENSION IF NOT EXISTS pg_trgm', 'postgresql'),
+            create_index('vulners', 'ix_vulners_search_document', 'postgresql'),
+            create_index('affects', 'ix_affects_name_trgm', 'postgresql'),
+            execute_ddl(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {VULNERS_SEARCH_TABLE} '
+                f'USING fts5(global_identifier UNINDEXED, identifier, description, packages)',
+                'sqlite',
+            ),
+        ),
+        is_transactional=False,
+    ),
+    Migration(6, 'vulners_derived_data', (update_vulners_derived_data,), is_transactional=False),
+    Migration(7, 'vulner_import_files', (create_tables,)),
+    Migration(8, 'vulners_content_hash', (add_column('vulners', 'content_hash'),)),
+    Migration(9, 'vulners_content_hash_backfill', (backfill_vulners_content_hashes,), is_transactional=False),
+    Migration(10, 'report_snapshots_generation', (add_column('report_snapshots', 'vulner_db_generation'),)),
+)
+
+
+def get_applied_versions(connection: Connection) -> set[int]:
+    """
+    Функция получения версий примененных миграций
+
+    :param connection: Соединение с базой данных
+    :return: Версии миграций
+    """
+
+    return set(connection.scalars(select(SchemaMigrationORM.version)))
+
+
+def apply_migration(engine: Engine, migration: Migration) -> None:
+    """
+    Функция применения одной миграции и отметки о ней
+
+    :param engine: Движок базы данных
+    :param migration: Миграция
+    """
+
+    with engine.connect() as connection:
+        if not migration.is_transactional:
+            connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+
+        with connection.begin():
+            for operation in migration.operations:
+                operation(connection)
+
+            connection.execute(insert(SchemaMigrationORM).values(version=migration.version, name=migration.name))
+
+
+def apply_migrations(engine: Engine, migrations: tuple[Migration, ...] = MIGRATIONS) -> list[int]:
+    """
+    Функция применения всех еще не примененных миграций по порядку версий
+
+    :param engine: Движок базы данных
+    :param migrations: Миграции
+    :return: Версии примененных миграций
+    """
+
+    SchemaMigrationORM.__table__.create(engine, checkfirst=True)
+
+    with engine.connect() as lock_connection:
+        if engine.dialect.name == 'postgresql':
+            lock_connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATIONS_LOCK_KEY})
+
+        try:
+            applied_versions = get_applied_versions(lock_connection)
+            lock_connection.rollback()
+
+            result = []
+            for migration in sorted(migrations, key=lambda migration: migration.version):
+                if migration.version in applied_versions:
+                    continue
+
+                logging.info(f'Applying migration {migration.version} {migration.name}')
+                apply_migration(engine, migration)
+                result.append(migration.version)
+        finally:
+            if engine.dialect.name == 'postgresql':
+                lock_connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATIONS_LOCK_KEY})
+                lock_connection.commit()
+
+    return result
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    applied_versions = apply_migrations(get_db_engine())
+    logging.info(f'Applied migrations: {applied_versions or "none, schema is up to date"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,20 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import BigInteger, ForeignKey, String, JSON, Index, LargeBinary, DDL, event, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
 TIMESTAMP_FORMAT = '%d_%m_%Y_%H_%M_%S'
+# Идентификатор единственной строки состояния базы уязвимостей.
+VULNER_DB_STATE_ID = 1
+# Значение сортировки уязвимостей без рейтинга: такие уязвимости идут после любых оцененных.
+NULL_SCORE_ORDER_VALUE = -1.0
+# Конфигурация полнотекстового поиска PostgreSQL, без стемминга: идентификаторы и имена пакетов не изменяются.
+SEARCH_TEXT_CONFIG = "'simple'::regconfig"
+# Таблица полнотекстового поиска SQLite (FTS5).
+VULNERS_SEARCH_TABLE = 'vulners_fts'
 
 class Base(DeclarativeBase):
     pass
@@ -17,11 +26,13 @@ class ReportORM(Base):
     created_at: Mapped[str] = mapped_column(String(), default=datetime.now().strftime(TIMESTAMP_FORMAT))
 
     scan_config_id: Mapped[int] = mapped_column(ForeignKey('scan_configs.id', ondelete='SET NULL'))
+    # Отчет сохранен до привязки затронутого ПО к отчету: его записи затронутого ПО без идентификатора отчета.
+    is_legacy: Mapped[bool] = mapped_column(default=False)
     # scan_config: Mapped['ScanConfigORM'] = relationship()
 
     # vulners: Mapped[list['VulnerORM']] = relationship()
     def __repr__(self):
-        return f'ReportORM: {self.id=}, {self.created_at=}, {self.scan_config_id=}'
+        return f'ReportORM: {self.id=}, {self.created_at=}, {self.scan_config_id=}, {self.is_legacy=}'
 
 
 class ProjectConfigORM(Base):
@@ -33,7 +44,7 @@ class ProjectConfigORM(Base):
     type: Mapped[str] = mapped_column(String())
     dir_path: Mapped[str] = mapped_column(String())
     description: Mapped[str | None] = mapped_column(String())
-    scan_config_id: Mapped[int] = mapped_column(ForeignKey('scan_configs.id', ondelete='CASCADE'))
+    scan_config_id: Mapped[int] = mapped_column(ForeignKey('scan_configs.id', ondelete='CASCADE'), index=True)
 
     scan_config: Mapped['ScanConfigORM'] = relationship()
 
@@ -68,9 +79,16 @@ class AffectedProjectsORM(Base):
 
     project_config_id: Mapped[str | None] = mapped_column(ForeignKey('project_configs.id'))
     affected_id: Mapped[str | None] = mapped_column(ForeignKey('affects.id'))
+    # Пустое значение у записей, сохраненных до привязки затронутого ПО к отчету.
+    report_id: Mapped[int | None] = mapped_column(ForeignKey('reports.id', ondelete='CASCADE'))
+
+    __table_args__ = (
+        Index('ix_affected_projects_report_project', 'report_id', 'project_config_id', 'affected_id'),
+        Index('ix_affected_projects_project_report', 'project_config_id', 'report_id'),
+    )
 
     def __repr__(self):
-        return f'AffectedProjectsORM: {self.id=}, {self.project_config_id=}, {self.affected_id=}'
+        return f'AffectedProjectsORM: {self.id=}, {self.project_config_id=}, {self.affected_id=}, {self.report_id=}'
 
 
 # class ReportVulnerORM(Base):
@@ -86,9 +104,14 @@ class ReportProjectORM(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     project_config_id: Mapped[str | None] = mapped_column(ForeignKey('project_configs.id'))
     report_id: Mapped[int | None] = mapped_column(ForeignKey('reports.id'))
+    is_reused: Mapped[bool] = mapped_column(default=False)
+
+    __table_args__ = (
+        Index('ix_reports_projects_report_project', 'report_id', 'project_config_id'),
+    )
 
     def __repr__(self):
-        return f'ReportProjectORM: {self.id=}, {self.project_config_id=}, {self.report_id=}'
+        return f'ReportProjectORM: {self.id=}, {self.project_config_id=}, {self.report_id=}, {self.is_reused=}'
 
 
 class VulnerORM(Base):
@@ -100,6 +123,11 @@ class VulnerORM(Base):
     description: Mapped[str]
     source_name: Mapped[str]
     source_url: Mapped[str]
+    # Оценка и критичность первого рейтинга уязвимости, заполняются при импорте.
+    score: Mapped[float | None] = mapped_column(index=True)
+    severity: Mapped[str | None] = mapped_column(String(), index=True)
+    # Хэш содержимого уязвимости и ее дочерних строк из файлов уязвимостей, по нему синхронизация находит изменения.
+    content_hash: Mapped[str | None] = mapped_column(String())
 
     affected: Mapped[list['AffectedORM']] = relationship()
     ratings: Mapped[list['RatingORM']] = relationship()
@@ -110,6 +138,16 @@ class VulnerORM(Base):
         return f'VulnerORM: {self.global_identifier=}, {self.identifier=}, {self.source_name=}'
 
 
+def get_vulner_score_order():
+    """Функция получения выражения сортировки уязвимостей по оценке, совпадающего с индексом"""
+
+    # Значение подставляется литералом, а не параметром, иначе выражение запроса не совпадет с индексом.
+    return func.coalesce(VulnerORM.score, text(repr(NULL_SCORE_ORDER_VALUE)))
+
+
+Index('ix_vulners_score_order', get_vulner_score_order(), VulnerORM.global_identifier)
+
+
 class RatingORM(Base):
     __tablename__ = 'ratings'
 
@@ -122,7 +160,7 @@ class RatingORM(Base):
     vector: Mapped[str]
     version: Mapped[float]
 
-    vulner_id: Mapped[str] = mapped_column(ForeignKey('vulners.global_identifier', ondelete='CASCADE'))
+    vulner_id: Mapped[str] = mapped_column(ForeignKey('vulners.global_identifier', ondelete='CASCADE'), index=True)
 
     vulner: Mapped['VulnerORM'] = relationship()
 
@@ -137,7 +175,7 @@ class ReferenceORM(Base):
     source: Mapped[str]
     url: Mapped[str]
 
-    vulner_id: Mapped[str] = mapped_column(ForeignKey('vulners.global_identifier', ondelete='CASCADE'))
+    vulner_id: Mapped[str] = mapped_column(ForeignKey('vulners.global_identifier', ondelete='CASCADE'), index=True)
 
     vulner: Mapped['VulnerORM'] = relationship()
 
@@ -149,7 +187,7 @@ class AffectedORM(Base):
     __tablename__ = 'affects'
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str]
+    name: Mapped[str] = mapped_column(index=True)
     vendor: Mapped[str]
     type: Mapped[str]
 
@@ -158,7 +196,7 @@ class AffectedORM(Base):
     end_value: Mapped[str]
     end_condition: Mapped[str]
 
-    vulner_id: Mapped[str] = mapped_column(ForeignKey('vulners.global_identifier', ondelete='CASCADE'))
+    vulner_id: Mapped[str] = mapped_column(ForeignKey('vulners.global_identifier', ondelete='CASCADE'), index=True)
 
     vulner: Mapped['VulnerORM'] = relationship()
 
@@ -177,3 +215,132 @@ class AffectedORM(Base):
         '''
 
 
+# Поиск затронутого ПО по экосистеме и имени пакета.
+Index('ix_affects_type_name', AffectedORM.type, AffectedORM.name)
+
+
+def get_vulner_search_document():
+    """Функция получения выражения поискового документа уязвимости PostgreSQL, совпадающего с индексом"""
+
+    # Значения подставляются литералами, а не параметрами, иначе выражение запроса не совпадет с индексом.
+    return func.to_tsvector(
+        text(SEARCH_TEXT_CONFIG),
+        func.coalesce(VulnerORM.identifier, text("''"))
+        .concat(text("' '"))
+        .concat(func.coalesce(VulnerORM.description, text("''"))),
+        type_=TSVECTOR,
+    )
+
+
+Index('ix_vulners_search_document', get_vulner_search_document(), postgresql_using='gin').ddl_if(dialect='postgresql')
+Index(
+    'ix_affects_name_trgm',
+    AffectedORM.name,
+    postgresql_using='gin',
+    postgresql_ops={'name': 'gin_trgm_ops'},
+).ddl_if(dialect='postgresql')
+
+event.listen(
+    Base.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'),
+)
+event.listen(
+    Base.metadata,
+    'after_create',
+    DDL(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {VULNERS_SEARCH_TABLE} '
+        f'USING fts5(global_identifier UNINDEXED, identifier, description, packages)'
+    ).execute_if(dialect='sqlite'),
+)
+
+
+class VulnerDBStateORM(Base):
+    __tablename__ = 'vulner_db_state'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    generation: Mapped[int] = mapped_column(default=0)
+    updated_at: Mapped[str] = mapped_column(String(), default=lambda: datetime.now().strftime(TIMESTAMP_FORMAT))
+
+    def __repr__(self):
+        return f'VulnerDBStateORM: {self.id=}, {self.generation=}, {self.updated_at=}'
+
+
+class ScanJobORM(Base):
+    __tablename__ = 'scan_jobs'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    scan_config_id: Mapped[int] = mapped_column(ForeignKey('scan_configs.id', ondelete='CASCADE'))
+    status: Mapped[str] = mapped_column(String())
+    stage: Mapped[str | None] = mapped_column(String())
+    projects_count: Mapped[int] = mapped_column(default=0)
+    projects_done: Mapped[int] = mapped_column(default=0)
+    stages_durations: Mapped[dict | None] = mapped_column(JSON())
+    created_at: Mapped[str] = mapped_column(String(), default=lambda: datetime.now().strftime(TIMESTAMP_FORMAT))
+    started_at: Mapped[str | None] = mapped_column(String())
+    finished_at: Mapped[str | None] = mapped_column(String())
+    error: Mapped[str | None] = mapped_column(String())
+
+    report_id: Mapped[int | None] = mapped_column(ForeignKey('reports.id', ondelete='SET NULL'))
+
+    def __repr__(self):
+        return f'ScanJobORM: {self.id=}, {self.scan_config_id=}, {self.status=}, {self.stage=}, {self.report_id=}'
+
+
+class ProjectScanStateORM(Base):
+    __tablename__ = 'project_scan_states'
+
+    project_config_id: Mapped[int] = mapped_column(
+        ForeignKey('project_configs.id', ondelete='CASCADE'),
+        primary_key=True,
+    )
+    requirements_hash: Mapped[str] = mapped_column(String())
+    sbom_hash: Mapped[str | None] = mapped_column(String())
+    vulner_db_generation: Mapped[int]
+    affected_ids: Mapped[list] = mapped_column(JSON())
+    updated_at: Mapped[str] = mapped_column(String(), default=lambda: datetime.now().strftime(TIMESTAMP_FORMAT))
+
+    def __repr__(self):
+        return (
+            f'ProjectScanStateORM: {self.project_config_id=}, {self.requirements_hash=}, '
+            f'{self.sbom_hash=}, {self.vulner_db_generation=}'
+        )
+
+
+class ReportSnapshotORM(Base):
+    __tablename__ = 'report_snapshots'
+
+    report_id: Mapped[int] = mapped_column(ForeignKey('reports.id', ondelete='CASCADE'), primary_key=True)
+    encoding: Mapped[str] = mapped_column(String())
+    content: Mapped[bytes] = mapped_column(LargeBinary())
+    # Поколение базы уязвимостей, на котором построен снимок: снимок прежнего поколения перестраивается.
+    vulner_db_generation: Mapped[int | None]
+    created_at: Mapped[str] = mapped_column(String(), default=lambda: datetime.now().strftime(TIMESTAMP_FORMAT))
+
+    def __repr__(self):
+        return f'ReportSnapshotORM: {self.report_id=}, {self.encoding=}, {self.vulner_db_generation=}, {len(self.content)=}'
+
+
+class SchemaMigrationORM(Base):
+    __tablename__ = 'schema_migrations'
+
+    version: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String())
+    applied_at: Mapped[str] = mapped_column(String(), default=lambda: datetime.now().strftime(TIMESTAMP_FORMAT))
+
+    def __repr__(self):
+        return f'SchemaMigrationORM: {self.version=}, {self.name=}, {self.applied_at=}'
+
+
+# Файл уязвимостей, импортированный в базу: по этим записям продолжается прерванный импорт.
+class VulnerImportFileORM(Base):
+    __tablename__ = 'vulner_import_files'
+
+    # Путь относительно каталога пакетов уязвимостей.
+    path: Mapped[str] = mapped_column(String(), primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger)
+    modified_at_ns: Mapped[int] = mapped_column(BigInteger)
+    imported_at: Mapped[str] = mapped_column(String(), default=lambda: datetime.now().strftime(TIMESTAMP_FORMAT))
+
+    def __repr__(self):
+        return f'VulnerImportFileORM: {self.path=}, {self.size=}, {self.modified_at_ns=}, {self.imported_at=}'
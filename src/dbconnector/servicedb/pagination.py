@@ -0,0 +1,64 @@
+"""
+Модуль курсоров постраничной выборки по ключу
+"""
+
+import base64
+import binascii
+import json
+import math
+
+
+class InvalidCursorError(ValueError):
+    """Исключение некорректного курсора страницы"""
+
+
+def encode_cursor(values: dict) -> str:
+    """
+    Функция кодирования значений ключа последней строки страницы в непрозрачный курсор
+
+    :param values: Значения ключа сортировки последней строки
+    :return: Курсор следующей страницы
+    """
+
+    content = json.dumps(values, separators=(',', ':'), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(content).decode().rstrip('=')
+
+
+def is_cursor_value_valid(value, value_type: type | tuple[type, ...]) -> bool:
+    """
+    Функция проверки типа значения курсора по типу столбца сортировки
+
+    :param value: Значение из курсора
+    :param value_type: Допустимые типы значения
+    :return: Признак допустимого значения
+    """
+
+    # bool - подкласс int, но не значение столбца сортировки.
+    if isinstance(value, bool) or not isinstance(value, value_type):
+        return False
+
+    return not isinstance(value, float) or math.isfinite(value)
+
+
+def decode_cursor(cursor: str, key_types: dict[str, type | tuple[type, ...]]) -> dict:
+    """
+    Функция декодирования курсора страницы
+
+    :param cursor: Курсор, полученный с предыдущей страницей
+    :param key_types: Ожидаемые ключи курсора и допустимые типы их значений
+    :return: Значения ключа сортировки последней строки предыдущей страницы
+    """
+
+    try:
+        content = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(content)
+    except (binascii.Error, ValueError) as err:
+        raise InvalidCursorError(f'Некорректный курсор страницы: {cursor}') from err
+
+    if not isinstance(values, dict) or set(values) != set(key_types):
+        raise InvalidCursorError(f'Некорректный курсор страницы: {cursor}')
+
+    if not all(is_cursor_value_valid(values[key], value_type) for key, value_type in key_types.items()):
+        raise InvalidCursorError(f'Некорректный курсор страницы: {cursor}')
+
+    return values
@@ -0,0 +1,93 @@
+"""
+Модуль условий полнотекстового поиска по базе уязвимостей
+"""
+
+from sqlalchemy import column, exists, func, literal_column, or_, select, table, text, union
+from sqlalchemy.sql.elements import ColumnElement
+
+from dbconnector.servicedb.models import (
+    VulnerORM,
+    AffectedORM,
+    SEARCH_TEXT_CONFIG,
+    VULNERS_SEARCH_TABLE,
+    get_vulner_search_document,
+)
+
+
+vulners_search_table = table(VULNERS_SEARCH_TABLE, column('global_identifier'))
+
+
+def make_fts_query(query: str) -> str:
+    """
+    Функция построения запроса FTS5 из пользовательской строки.
+    Каждое слово экранируется и ищется по префиксу, слова объединяются через И.
+
+    :param query: Строка поиска
+    :return: Запрос FTS5
+    """
+
+    return ' '.join('"' + token.replace('"', '""') + '"*' for token in query.split())
+
+
+def escape_like(value: str) -> str:
+    """
+    Функция экранирования спецсимволов LIKE
+
+    :param value: Строка поиска
+    :return: Экранированная строка
+    """
+
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def get_search_condition(dialect_name: str, query: str) -> ColumnElement:
+    """
+    Функция получения условия поиска уязвимостей по идентификатору, описанию и именам пакетов
+
+    :param dialect_name: Диалект базы данных
+    :param query: Строка поиска
+    :return: Условие запроса к таблице уязвимостей
+    """
+
+    if dialect_name == 'sqlite':
+        matched_vulners = (
+            select(vulners_search_table.c.global_identifier)
+            .where(literal_column(VULNERS_SEARCH_TABLE).op('MATCH')(make_fts_query(query)))
+        )
+        return VulnerORM.global_identifier.in_(matched_vulners)
+
+    package_pattern = f'%{escape_like(query.strip())}%'
+
+    if dialect_name == 'postgresql':
+        # Условие OR по двум таблицам не читается по индексам, поэтому уязвимости выбираются объединением
+        # поиска по индексу документа уязвимости и по триграммному индексу имен пакетов.
+        text_query = func.plainto_tsquery(text(SEARCH_TEXT_CONFIG), query)
+        matched_vulners = union(
+            select(VulnerORM.global_identifier).where(get_vulner_search_document().op('@@')(text_query)),
+            select(AffectedORM.vulner_id).where(AffectedORM.name.ilike(package_pattern, escape='\\')),
+        )
+        return VulnerORM.global_identifier.in_(matched_vulners)
+
+    package_condition = exists().where(
+        AffectedORM.vulner_id == VulnerORM.global_identifier,
+        AffectedORM.name.ilike(package_pattern, escape='\\'),
+    )
+    return or_(
+        VulnerORM.identifier.ilike(package_pattern, escape='\\'),
+        VulnerORM.description.ilike(package_pattern, escape='\\'),
+        package_condition,
+    )
+
+
+def get_package_type_condition(package_types: list[str]) -> ColumnElement:
+    """
+    Функция получения условия наличия у уязвимости затронутого ПО указанных типов
+
+    :param package_types: Типы пакетов
+    :return: Условие запроса к таблице уязвимостей
+    """
+
+    return exists().where(
+        AffectedORM.vulner_id == VulnerORM.global_identifier,
+        AffectedORM.type.in_(package_types),
+    )
@@ -1,17 +1,27 @@
 """
 Модуль работы с сервисной базой данных
 """
+import json
 import logging
+from datetime import datetime
+from typing import Callable, Iterator
 
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import Session, sessionmaker, joinedload
+from sqlalchemy import select, update, delete, insert, tuple_, text, distinct
+from sqlalchemy.orm import Session, sessionmaker, joinedload, selectinload
 from sqlalchemy.engine.base import Engine
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.expression import func
+from sqlalchemy.exc import IntegrityError
 
-from dpss.models import SoftComponentSchema, VulnerableIntervalSchema, VersionBorder
-from dpss.utils import check_is_vulnerable
+from dpss.models import SoftComponentSchema
 
-from dbconnector.servicedb.functions import get_db_engine
+from configs.settings import BULK_COPY_THRESHOLD, EXPORT_YIELD_PER, VULNER_IMPORT_BATCH_FILES
+from dbconnector.servicedb.advisories import get_content_hash
+from dbconnector.servicedb.cache import vulners_count_cache, vulners_search_cache
+from dbconnector.servicedb.functions import get_db_engine, copy_rows
+from dbconnector.servicedb.session import get_engine, get_session_factory
+from dbconnector.servicedb.pagination import encode_cursor, decode_cursor
+from dbconnector.servicedb.search import get_search_condition, get_package_type_condition
 from dbconnector.servicedb.models import (
     Base,
     ScanConfigORM,
@@ -21,7 +31,20 @@ from dbconnector.servicedb.models import (
     ReportProjectORM,
     VulnerORM,
     AffectedORM,
+    RatingORM,
+    ReferenceORM,
+    VulnerDBStateORM,
+    ScanJobORM,
+    ProjectScanStateORM,
+    ReportSnapshotORM,
+    VulnerImportFileORM,
+    VULNER_DB_STATE_ID,
+    NULL_SCORE_ORDER_VALUE,
+    VULNERS_SEARCH_TABLE,
+    TIMESTAMP_FORMAT,
+    get_vulner_score_order,
 )
+from matcher.index import AffectsIndex
 from models.scanner_models import (
     ScanConfigAddDTO,
     ScanConfigGetDTO,
@@ -41,32 +64,70 @@ from models.scanner_models import (
     ReportAffectDTO,
     VulnerBasicGetDTO,
     VulnersBasicsGetDTO,
+    ScanJobGetDTO,
+    ScanJobStatus,
+    ProjectScanStateDTO,
+    ReportSnapshotDTO,
+    ReportFindingDTO,
+    VulnersQueryDTO,
+    VulnersSortField,
+    SortOrder,
+    VulnersSearchQueryDTO,
+    VulnersSearchDTO,
+    PackageQueryDTO,
+    PackageVulnersDTO,
+)
+
+
+# Столбцы, по которым запись затронутого ПО совпадает с новой версией уязвимости при синхронизации.
+AFFECT_KEY_COLUMNS = (
+    AffectedORM.vulner_id,
+    AffectedORM.name,
+    AffectedORM.vendor,
+    AffectedORM.type,
+    AffectedORM.start_condition,
+    AffectedORM.start_value,
+    AffectedORM.end_value,
+    AffectedORM.end_condition,
 )
 
 
 class ServiceDB:
     """Класс работы с базой данных сервера"""
 
-    def __init__(self, engine: Engine = get_db_engine()) -> None:
+    def __init__(self, engine: Engine | None = None, session: Session | None = None) -> None:
         """
-        Инициализация класса
+        Инициализация класса.
+        Переданная сессия принадлежит вызывающему коду (например, сессия запроса) и не закрывается в контексте.
 
-        :param engine: Движок базы данных
+        :param engine: Движок базы данных, по умолчанию - общий движок процесса
+        :param session: Открытая сессия
         """
 
-        self.engine = engine
-        self.SessionLocal = sessionmaker(engine)
+        if session is not None:
+            self.engine = session.get_bind()
+            self.SessionLocal = None
+        elif engine is None:
+            self.engine = get_engine()
+            self.SessionLocal = get_session_factory()
+        else:
+            self.engine = engine
+            self.SessionLocal = sessionmaker(engine)
+
+        self.session = session
+        self.is_session_owner = session is None
 
     def __enter__(self):
         """Инициализация контекста"""
 
-        self.session = self.SessionLocal()
+        if self.is_session_owner:
+            self.session = self.SessionLocal()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Финализация контекста"""
 
-        if self.session:
+        if self.session and self.is_session_owner:
             if exc_type is not None:
                 self.session.rollback()
             self.session.close()
@@ -162,142 +223,643 @@ class ServiceDB:
         return result_confs_dto
 
     def save_report(self, report_data: ReportAddDTO) -> int:
+        """
+        Метод сохранения отчета одной транзакцией.
+        Затронутое ПО, удаленное синхронизацией уязвимостей во время сканирования, не сохраняется.
+
+        :param report_data: Результаты сканирования
+        :return: Идентификатор отчета
+        """
+
         report_model = ReportORM(scan_config_id=report_data.scan_config_id)
         self.session.add(report_model)
-        self.session.commit()
-
-        addition_rows = []
-        for affected_project in report_data.projects:
-            addition_rows.append(
-                ReportProjectORM(
-                    project_config_id=affected_project.project_config_id,
-                    report_id=report_model.id,
-                )
+        self.session.flush()
+
+        # Проект связывается с отчетом один раз, в том числе проект без найденного затронутого ПО.
+        projects_reused = {
+            scanned_project.project_config_id: scanned_project.is_reused
+            for scanned_project in report_data.scanned_projects or []
+        }
+        affected_projects = {}
+        for affected_project in report_data.projects or []:
+            projects_reused.setdefault(affected_project.project_config_id, False)
+            affected_projects[(affected_project.project_config_id, affected_project.affected_id)] = None
+
+        # Сканирование сопоставляет компоненты со снимком затронутого ПО, построенным до его начала:
+        # синхронизация могла удалить часть записей. Оставшиеся записи блокируются от удаления до конца транзакции.
+        affected_ids = {affected_id for _, affected_id in affected_projects}
+        statement = (
+            select(AffectedORM.id)
+            .where(AffectedORM.id.in_(affected_ids))
+            .with_for_update(read=True, key_share=True)
+        )
+        existing_affected_ids = set(self.session.scalars(statement)) if affected_ids else set()
+        if len(existing_affected_ids) < len(affected_ids):
+            logging.warning(
+                f'Report {report_model.id}: {len(affected_ids) - len(existing_affected_ids)} affects '
+                f'were deleted by vulner sync during the scan and are not saved'
             )
 
-        for affected_project in report_data.projects:
-            addition_rows.append(
-                AffectedProjectsORM(
-                    project_config_id=affected_project.project_config_id,
-                    affected_id=affected_project.affected_id,
-                )
-            )
+        self.bulk_insert(
+            ReportProjectORM,
+            [
+                {'project_config_id': project_config_id, 'report_id': report_model.id, 'is_reused': is_reused}
+                for project_config_id, is_reused in projects_reused.items()
+            ],
+        )
+        self.bulk_insert(
+            AffectedProjectsORM,
+            [
+                {'project_config_id': project_config_id, 'affected_id': affected_id, 'report_id': report_model.id}
+                for project_config_id, affected_id in affected_projects
+                if affected_id in existing_affected_ids
+            ],
+        )
 
-        self.session.add_all(addition_rows)
         self.session.commit()
         return report_model.id
 
+    def bulk_insert(self, model: type[Base], rows: list[dict]) -> None:
+        """
+        Метод пакетной вставки строк без создания ORM-объектов.
+        В PostgreSQL большие пакеты вставляются командой COPY, иначе выполняется executemany.
+        Транзакция не фиксируется.
+
+        :param model: ORM-модель таблицы
+        :param rows: Строки, у всех строк одинаковый набор столбцов
+        """
+
+        if not rows:
+            return
+
+        connection = self.session.connection()
+        if connection.dialect.name == 'postgresql' and len(rows) >= BULK_COPY_THRESHOLD:
+            copy_rows(connection, model.__table__, rows)
+            return
+
+        self.session.execute(insert(model), rows)
+
     def get_report(self, report_id: int) -> ReportFullDTO | None:
-        statement = select(ReportORM).where(ReportORM.id == report_id)
-        report_data = self.session.scalars(statement).one()
-        result_base_report_dto = ReportGetDTO.model_validate(report_data, from_attributes=True)
+        """
+        Метод получения полного отчета.
+        Количество запросов не зависит от количества проектов и найденного затронутого ПО.
 
-        statement = select(ScanConfigORM).where(ScanConfigORM.id == result_base_report_dto.scan_config_id)
-        scan_config_data = self.session.scalars(statement).one()
-        # print(f'{scan_config_data=}')
+        :param report_id: Идентификатор отчета
+        :return: Отчет с конфигурацией сканирования и затронутым ПО проектов
+        """
 
+        statement = (
+            select(ReportORM, ScanConfigORM)
+            .join(ScanConfigORM, ScanConfigORM.id == ReportORM.scan_config_id)
+            .where(ReportORM.id == report_id)
+            .options(selectinload(ScanConfigORM.projects))
+        )
+        report_data, scan_config_data = self.session.execute(statement).one()
+        result_base_report_dto = ReportGetDTO.model_validate(report_data, from_attributes=True)
         scan_config_dto = ScanConfigGetDTO.model_validate(scan_config_data, from_attributes=True)
 
-        # print(f'{scan_config_dto=}')
-
         statement = (
-            select(ReportProjectORM)
-            .where(ReportProjectORM.report_id == result_base_report_dto.id)
+            select(ReportProjectORM, ProjectConfigORM)
+            .join(ProjectConfigORM, ProjectConfigORM.id == ReportProjectORM.project_config_id)
+            .where(ReportProjectORM.report_id == report_id)
+            .order_by(ReportProjectORM.id)
         )
-        reports_projects_data = self.session.scalars(statement).all()
+        projects_data = {}
+        projects_reused = {}
+        for report_project, project_config in self.session.execute(statement).all():
+            projects_data[project_config.id] = project_config
+            projects_reused[project_config.id] = report_project.is_reused
+
+        projects_affects = self.get_report_affects(report_id, list(projects_data), report_data.is_legacy)
+
+        affects_projects = [
+            ReportProjectAffectsDTO(
+                project=ProjectConfigGetDTO.model_validate(project_config, from_attributes=True),
+                is_reused=projects_reused[project_id],
+                affects=projects_affects.get(project_id, []),
+            )
+            for project_id, project_config in projects_data.items()
+        ]
 
-        projects_ids = [row.project_config_id for row in reports_projects_data]
-        projects_ids = set(projects_ids)
+        return ReportFullDTO(
+            id=result_base_report_dto.id,
+            created_at=result_base_report_dto.created_at,
+            scan_config_id=result_base_report_dto.scan_config_id,
+            scan_config=scan_config_dto,
+            affects_projects=affects_projects,
+        )
 
-        affects_projects = []
-        logging.error(f'{len(projects_ids)=}')
+    def get_report_affects(
+            self,
+            report_id: int,
+            project_ids: list[int],
+            is_legacy: bool = False,
+    ) -> dict[int, list[ReportAffectDTO]]:
+        """
+        Метод получения затронутого ПО отчета, сгруппированного по проектам.
+        Для отчетов, сохраненных до привязки затронутого ПО к отчету,
+        возвращаются записи проектов без идентификатора отчета.
+
+        :param report_id: Идентификатор отчета
+        :param project_ids: Идентификаторы проектов отчета
+        :param is_legacy: Признак отчета, сохраненного до привязки затронутого ПО к отчету
+        :return: Затронутое ПО с уязвимостями по идентификатору проекта
+        """
 
-        for project_id in projects_ids:
-            # project_id = project.project_config_id
-            statement = (
-                select(AffectedProjectsORM)
-                .where(AffectedProjectsORM.project_config_id == project_id)
+        if is_legacy:
+            statement = self._get_affects_projects_statement().where(
+                AffectedProjectsORM.report_id.is_(None),
+                AffectedProjectsORM.project_config_id.in_(project_ids),
+            )
+        else:
+            statement = self._get_affects_projects_statement().where(AffectedProjectsORM.report_id == report_id)
+        rows = self.session.execute(statement).unique().all()
+
+        vulners_dto = {}
+        projects_affects = {}
+        seen_affects = set()
+        for project_id, affect in rows:
+            if (project_id, affect.id) in seen_affects:
+                continue
+            seen_affects.add((project_id, affect.id))
+
+            if affect.vulner_id not in vulners_dto:
+                vulners_dto[affect.vulner_id] = VulnerGetDTO.model_validate(affect.vulner, from_attributes=True)
+
+            projects_affects.setdefault(project_id, []).append(
+                ReportAffectDTO(
+                    affected=AffectedGetDTO.model_validate(affect, from_attributes=True),
+                    vulner=vulners_dto[affect.vulner_id],
+                )
             )
 
-            project_data = self.get_project_config(project_id)
-
-            affected_projects_data = self.session.scalars(statement).all()
-            # print(f'{affected_projects_data=}')
-            affected_projects = [
-                AffectedProjectDTO.model_validate(row, from_attributes=True)
-                for row in affected_projects_data
-            ]
+        return projects_affects
 
-            statement = (
-                select(AffectedORM).filter(AffectedORM.id.in_([affect.affected_id for affect in affected_projects]))
-                .options(joinedload(AffectedORM.vulner))
+    @staticmethod
+    def _get_affects_projects_statement():
+        """Метод построения запроса затронутого ПО проектов с предзагрузкой данных уязвимостей"""
+
+        return (
+            select(AffectedProjectsORM.project_config_id, AffectedORM)
+            .join(AffectedORM, AffectedORM.id == AffectedProjectsORM.affected_id)
+            .order_by(AffectedProjectsORM.project_config_id, AffectedORM.id)
+            .options(
+                joinedload(AffectedORM.vulner).selectinload(VulnerORM.affected),
+                joinedload(AffectedORM.vulner).selectinload(VulnerORM.ratings),
+                joinedload(AffectedORM.vulner).selectinload(VulnerORM.references),
             )
-            query_res = self.session.execute(statement)
-            result_affects = query_res.unique().scalars().all()
-
-            affects_projects.append(
-                ReportProjectAffectsDTO(
-                    project=project_data,
-                    affects=[
-                        ReportAffectDTO(
-                            affected=AffectedGetDTO.model_validate(affect, from_attributes=True),
-                            vulner=VulnerGetDTO.model_validate(affect.vulner, from_attributes=True),
-                        )
-                        for affect in result_affects
-                    ]
-                )
+        )
+
+    def is_report_exists(self, report_id: int) -> bool:
+        """
+        Метод проверки существования отчета
+
+        :param report_id: Идентификатор отчета
+        :return: Признак существования отчета
+        """
+
+        return self.session.get(ReportORM, report_id) is not None
+
+    def iter_report_findings(
+            self,
+            report_id: int,
+            yield_per: int = EXPORT_YIELD_PER,
+    ) -> Iterator[list[ReportFindingDTO]]:
+        """
+        Метод потокового получения найденного затронутого ПО отчета плоскими строками.
+        Строки читаются серверным курсором частями по yield_per, отчет целиком в памяти не собирается.
+
+        :param report_id: Идентификатор отчета
+        :param yield_per: Количество строк в одной части
+        :return: Итератор частей найденного затронутого ПО
+        """
+
+        statement = (
+            select(
+                AffectedProjectsORM.project_config_id,
+                ProjectConfigORM.name.label('project_name'),
+                AffectedORM.id.label('affected_id'),
+                AffectedORM.name.label('package_name'),
+                AffectedORM.type.label('package_type'),
+                AffectedORM.start_condition,
+                AffectedORM.start_value,
+                AffectedORM.end_value,
+                AffectedORM.end_condition,
+                VulnerORM.global_identifier.label('vulner_id'),
+                VulnerORM.identifier.label('vulner_identifier'),
+                VulnerORM.severity,
+                VulnerORM.score,
             )
+            .join(AffectedORM, AffectedORM.id == AffectedProjectsORM.affected_id)
+            .join(VulnerORM, VulnerORM.global_identifier == AffectedORM.vulner_id)
+            .join(ProjectConfigORM, ProjectConfigORM.id == AffectedProjectsORM.project_config_id)
+            .order_by(AffectedProjectsORM.project_config_id, AffectedORM.id)
+        )
 
-        print(f'{len(affects_projects)=}')
-        logging.error(f'{len(affects_projects)=}')
-        report = ReportFullDTO(
-            id=result_base_report_dto.id,
-            created_at=result_base_report_dto.created_at,
-            scan_config_id=result_base_report_dto.scan_config_id,
-            scan_config=scan_config_dto,
-            affects_projects=affects_projects,
+        is_legacy = self.session.scalar(select(ReportORM.is_legacy).where(ReportORM.id == report_id))
+        if not is_legacy:
+            statement = statement.where(AffectedProjectsORM.report_id == report_id)
+        else:
+            # Отчет сохранен до привязки затронутого ПО к отчету.
+            report_projects = select(ReportProjectORM.project_config_id).where(ReportProjectORM.report_id == report_id)
+            statement = statement.where(
+                AffectedProjectsORM.report_id.is_(None),
+                AffectedProjectsORM.project_config_id.in_(report_projects),
+            ).distinct()
+
+        result = self.session.execute(statement.execution_options(yield_per=yield_per))
+        for partition in result.partitions():
+            yield [ReportFindingDTO.model_validate(row, from_attributes=True) for row in partition]
+
+    def get_report_snapshot(self, report_id: int) -> ReportSnapshotDTO | None:
+        """
+        Метод получения сериализованного снимка отчета.
+        Снимок прежнего поколения базы уязвимостей не возвращается: синхронизация могла изменить
+        уязвимости отчета или отвязать найденное в нем затронутое ПО.
 
+        :param report_id: Идентификатор отчета
+        :return: Снимок отчета или None, если снимок еще не построен или устарел
+        """
+
+        generation = select(VulnerDBStateORM.generation).where(VulnerDBStateORM.id == VULNER_DB_STATE_ID)
+        statement = select(ReportSnapshotORM).where(
+            ReportSnapshotORM.report_id == report_id,
+            ReportSnapshotORM.vulner_db_generation == func.coalesce(generation.scalar_subquery(), 0),
         )
+        report_snapshot = self.session.scalar(statement)
+        if report_snapshot is None:
+            return None
+
+        return ReportSnapshotDTO.model_validate(report_snapshot, from_attributes=True)
+
+    def save_report_snapshot(self, report_snapshot: ReportSnapshotDTO) -> None:
+        """
+        Метод сохранения снимка отчета.
+        Снимок прежнего поколения базы уязвимостей заменяется, снимок того же или более нового
+        поколения, уже сохраненный параллельным запросом, не перезаписывается.
+
+        :param report_snapshot: Сериализованный отчет
+        """
 
-        # print(f'{report=}')
-        return report
+        self.session.execute(
+            delete(ReportSnapshotORM)
+            .where(
+                ReportSnapshotORM.report_id == report_snapshot.report_id,
+                ReportSnapshotORM.vulner_db_generation.is_(None)
+                | (ReportSnapshotORM.vulner_db_generation < report_snapshot.vulner_db_generation),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.session.add(ReportSnapshotORM(**report_snapshot.model_dump()))
+        try:
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
 
     def get_vulner_data(self, vulner_id: str) -> VulnerGetDTO:
-        statement = select(VulnerORM).where(VulnerORM.global_identifier == vulner_id)
+        statement = (
+            select(VulnerORM)
+            .where(VulnerORM.global_identifier == vulner_id)
+            .options(
+                selectinload(VulnerORM.affected),
+                selectinload(VulnerORM.ratings),
+                selectinload(VulnerORM.references),
+            )
+        )
         vulner_data = self.session.scalars(statement).one()
         vulner_dto = VulnerGetDTO.model_validate(vulner_data, from_attributes=True)
         return vulner_dto
 
-    def get_vulners(self, page: int = 1, page_size: int = 20) -> VulnersBasicsGetDTO:
-        offset = (page - 1) * page_size
-        statement = select(VulnerORM).order_by(VulnerORM.global_identifier.desc()).limit(page_size).offset(offset)
-        query_count = self.session.query(VulnerORM.global_identifier).count()
-        vulners_data = self.session.scalars(statement).all()
-
-        vulners_dto = []
-        for row in vulners_data:
-            validated_vulner = VulnerGetDTO.model_validate(row, from_attributes=True)
-            score = None
-            severity = None
-            if ratings := validated_vulner.ratings:
-                score = ratings[0].score
-                severity = ratings[0].severity
-
-            prepared_model = VulnerBasicGetDTO(
-                global_identifier=validated_vulner.global_identifier,
-                identifier=validated_vulner.identifier,
-                source_name=validated_vulner.source_name,
-                source_url=validated_vulner.source_url,
-                score=score,
-                severity=severity,
+    def get_vulners(
+            self,
+            page: int = 1,
+            page_size: int = 20,
+            cursor: str | None = None,
+            vulners_query: VulnersQueryDTO | None = None,
+    ) -> VulnersBasicsGetDTO:
+        """
+        Метод получения страницы уязвимостей одним запросом по столбцам таблицы уязвимостей.
+        С курсором страница выбирается по ключу сортировки, без курсора - по номеру страницы.
+
+        :param page: Номер страницы, не используется при переданном курсоре
+        :param page_size: Размер страницы
+        :param cursor: Курсор следующей страницы из предыдущего ответа
+        :param vulners_query: Сортировка и фильтры
+        :return: Страница уязвимостей, общее количество и курсор следующей страницы, если она не пуста
+        """
+
+        vulners_query = vulners_query or VulnersQueryDTO()
+        filters = self._get_vulners_filters(vulners_query)
+
+        if vulners_query.sort_by == VulnersSortField.score:
+            sort_key = (get_vulner_score_order(), VulnerORM.global_identifier)
+            cursor_keys = {'score': (int, float), 'global_identifier': str}
+        else:
+            sort_key = (VulnerORM.global_identifier,)
+            cursor_keys = {'global_identifier': str}
+
+        is_descending = vulners_query.order == SortOrder.desc
+        statement = (
+            select(
+                VulnerORM.global_identifier,
+                VulnerORM.identifier,
+                VulnerORM.source_name,
+                VulnerORM.source_url,
+                VulnerORM.score,
+                VulnerORM.severity,
             )
-            vulners_dto.append(prepared_model)
+            .where(*filters)
+            .order_by(*(key.desc() if is_descending else key.asc() for key in sort_key))
+            # Лишняя строка показывает, что следующая страница не пуста.
+            .limit(page_size + 1)
+        )
+        if cursor is not None:
+            after = decode_cursor(cursor, cursor_keys)
+            after_values = tuple(after[key] for key in cursor_keys)
+            if is_descending:
+                statement = statement.where(tuple_(*sort_key) < tuple_(*after_values))
+            else:
+                statement = statement.where(tuple_(*sort_key) > tuple_(*after_values))
+        else:
+            statement = statement.offset((page - 1) * page_size)
+
+        rows = self.session.execute(statement).all()
+        vulners_dto = [VulnerBasicGetDTO.model_validate(row, from_attributes=True) for row in rows[:page_size]]
+
+        next_cursor = None
+        if len(rows) > page_size:
+            last_vulner = vulners_dto[-1]
+            cursor_values = {'global_identifier': last_vulner.global_identifier}
+            if vulners_query.sort_by == VulnersSortField.score:
+                cursor_values['score'] = last_vulner.score if last_vulner.score is not None else NULL_SCORE_ORDER_VALUE
+            next_cursor = encode_cursor(cursor_values)
 
         return VulnersBasicsGetDTO(
             vulners=vulners_dto,
-            count=query_count,
+            count=self.get_vulners_count(vulners_query),
+            next_cursor=next_cursor,
         )
 
+    @staticmethod
+    def _get_vulners_filters(vulners_query: VulnersQueryDTO) -> list:
+        """
+        Метод получения условий фильтрации уязвимостей
+
+        :param vulners_query: Сортировка и фильтры
+        :return: Условия запроса
+        """
+
+        filters = []
+        if vulners_query.severity:
+            filters.append(VulnerORM.severity.in_(vulners_query.severity))
+        if vulners_query.min_score is not None:
+            filters.append(VulnerORM.score >= vulners_query.min_score)
+        if vulners_query.max_score is not None:
+            filters.append(VulnerORM.score <= vulners_query.max_score)
+
+        return filters
+
+    def get_vulners_count(self, vulners_query: VulnersQueryDTO | None = None) -> int:
+        """
+        Метод получения количества уязвимостей, удовлетворяющих фильтрам.
+        Значение кэшируется до смены поколения базы уязвимостей.
+
+        :param vulners_query: Сортировка и фильтры
+        :return: Количество уязвимостей
+        """
+
+        vulners_query = vulners_query or VulnersQueryDTO()
+        cache_key = (
+            tuple(sorted(vulners_query.severity or ())),
+            vulners_query.min_score,
+            vulners_query.max_score,
+        )
+
+        generation = self.get_vulner_db_generation()
+        query_count = vulners_count_cache.get(generation, cache_key)
+        if query_count is None:
+            statement = select(func.count()).select_from(VulnerORM).where(*self._get_vulners_filters(vulners_query))
+            query_count = self.session.scalar(statement)
+            vulners_count_cache.set(generation, cache_key, query_count)
+
+        return query_count
+
+    def search_vulners(
+            self,
+            search_query: VulnersSearchQueryDTO,
+            page: int = 1,
+            page_size: int = 20,
+    ) -> VulnersSearchDTO:
+        """
+        Метод полнотекстового поиска уязвимостей с фасетами.
+        Значения фасета считаются с учетом всех фильтров, кроме фильтра самого фасета.
+        Количество и фасеты кэшируются до смены поколения базы уязвимостей.
+
+        :param search_query: Строка поиска и фильтры фасетов
+        :param page: Номер страницы
+        :param page_size: Размер страницы
+        :return: Страница найденных уязвимостей, их количество и фасеты
+        """
+
+        search_text = ' '.join((search_query.query or '').split())
+        conditions = {}
+        if search_text:
+            conditions['query'] = get_search_condition(self.session.bind.dialect.name, search_text)
+        if search_query.severity:
+            conditions['severity'] = VulnerORM.severity.in_(search_query.severity)
+        if search_query.source:
+            conditions['source'] = VulnerORM.source_name.in_(search_query.source)
+        if search_query.package_type:
+            conditions['package_type'] = get_package_type_condition(search_query.package_type)
+
+        def get_conditions(excluded: str | None = None) -> list:
+            return [condition for name, condition in conditions.items() if name != excluded]
+
+        statement = (
+            select(
+                VulnerORM.global_identifier,
+                VulnerORM.identifier,
+                VulnerORM.source_name,
+                VulnerORM.source_url,
+                VulnerORM.score,
+                VulnerORM.severity,
+            )
+            .where(*get_conditions())
+            .order_by(
+                get_vulner_score_order().desc(),
+                VulnerORM.global_identifier.desc(),
+            )
+            .limit(page_size)
+            .offset((page - 1) * page_size)
+        )
+        vulners_dto = [
+            VulnerBasicGetDTO.model_validate(row, from_attributes=True)
+            for row in self.session.execute(statement).all()
+        ]
+
+        # Строка поиска приводится к нижнему регистру: поиск во всех базах не учитывает регистр.
+        cache_key = (
+            search_text.lower(),
+            tuple(sorted(search_query.severity or ())),
+            tuple(sorted(search_query.source or ())),
+            tuple(sorted(search_query.package_type or ())),
+        )
+        generation = self.get_vulner_db_generation()
+        search_counts = vulners_search_cache.get(generation, cache_key)
+        if search_counts is None:
+            if 'query' in conditions:
+                search_counts = self._count_matched_vulners(conditions['query'], search_query)
+            else:
+                search_counts = self._count_vulners(get_conditions)
+            vulners_search_cache.set(generation, cache_key, search_counts)
+
+        query_count, facets = search_counts
+        return VulnersSearchDTO(vulners=vulners_dto, count=query_count, facets=facets)
+
+    def _count_vulners(self, get_conditions: Callable[[str | None], list]) -> tuple[int, dict[str, dict[str, int]]]:
+        """
+        Метод подсчета уязвимостей и фасетов запросами с группировкой, без строки поиска
+
+        :param get_conditions: Функция получения условий фильтров без фильтра указанного фасета
+        :return: Количество уязвимостей и фасеты
+        """
+
+        query_count = self.session.scalar(select(func.count()).select_from(VulnerORM).where(*get_conditions(None)))
+
+        facets = {}
+        for facet_name, facet_column in (('severity', VulnerORM.severity), ('source', VulnerORM.source_name)):
+            statement = (
+                select(facet_column, func.count())
+                .where(*get_conditions(facet_name))
+                .group_by(facet_column)
+            )
+            facets[facet_name] = {value: count for value, count in self.session.execute(statement) if value}
+
+        statement = select(AffectedORM.type, func.count(distinct(AffectedORM.vulner_id))).group_by(AffectedORM.type)
+        if package_type_conditions := get_conditions('package_type'):
+            statement = statement.where(
+                AffectedORM.vulner_id.in_(select(VulnerORM.global_identifier).where(*package_type_conditions))
+            )
+        facets['package_type'] = {value: count for value, count in self.session.execute(statement) if value}
+
+        return query_count, facets
+
+    def _count_matched_vulners(
+            self,
+            search_condition: ColumnElement,
+            search_query: VulnersSearchQueryDTO,
+    ) -> tuple[int, dict[str, dict[str, int]]]:
+        """
+        Метод подсчета уязвимостей и фасетов по множеству уязвимостей, найденных строкой поиска.
+        Найденные уязвимости и типы их пакетов читаются двумя запросами по индексам,
+        фильтры фасетов применяются в памяти.
+
+        :param search_condition: Условие строки поиска
+        :param search_query: Строка поиска и фильтры фасетов
+        :return: Количество уязвимостей и фасеты
+        """
+
+        matched_vulners = {}
+        statement = select(VulnerORM.global_identifier, VulnerORM.severity, VulnerORM.source_name).where(search_condition)
+        for vulner_id, severity, source in self.session.execute(statement):
+            matched_vulners[vulner_id] = {'severity': {severity}, 'source': {source}, 'package_type': set()}
+
+        statement = (
+            select(AffectedORM.vulner_id, AffectedORM.type)
+            .where(AffectedORM.vulner_id.in_(select(VulnerORM.global_identifier).where(search_condition)))
+        )
+        for vulner_id, package_type in self.session.execute(statement):
+            matched_vulners[vulner_id]['package_type'].add(package_type)
+
+        filters = {
+            facet_name: set(values)
+            for facet_name, values in (
+                ('severity', search_query.severity),
+                ('source', search_query.source),
+                ('package_type', search_query.package_type),
+            )
+            if values
+        }
+
+        query_count = 0
+        facets = {'severity': {}, 'source': {}, 'package_type': {}}
+        for facet_values in matched_vulners.values():
+            failed_filters = [name for name, values in filters.items() if not facet_values[name] & values]
+            if not failed_filters:
+                query_count += 1
+
+            # Значения фасета считаются, если уязвимость проходит все фильтры, кроме фильтра самого фасета.
+            for facet_name, facet_counts in facets.items():
+                if failed_filters and failed_filters != [facet_name]:
+                    continue
+                for value in facet_values[facet_name]:
+                    if value:
+                        facet_counts[value] = facet_counts.get(value, 0) + 1
+
+        return query_count, {facet_name: dict(sorted(facet_counts.items())) for facet_name, facet_counts in facets.items()}
+
+    def refresh_vulners_search_index(self, vulner_ids: list[str] | None = None) -> None:
+        """
+        Метод обновления таблицы полнотекстового поиска SQLite.
+        В PostgreSQL поиск выполняется по индексам выражений, которые обновляются самой базой.
+        Транзакция не фиксируется.
+
+        :param vulner_ids: Идентификаторы уязвимостей, по умолчанию - все уязвимости
+        """
+
+        if self.session.bind.dialect.name != 'sqlite':
+            return
+
+        vulners_filter = ''
+        params = {}
+        if vulner_ids is not None:
+            vulners_filter = 'WHERE vulners.global_identifier IN (SELECT value FROM json_each(:vulner_ids))'
+            params['vulner_ids'] = json.dumps(vulner_ids)
+            self.session.execute(
+                text(
+                    f'DELETE FROM {VULNERS_SEARCH_TABLE} '
+                    f'WHERE global_identifier IN (SELECT value FROM json_each(:vulner_ids))'
+                ),
+                params,
+            )
+        else:
+            self.session.execute(text(f'DELETE FROM {VULNERS_SEARCH_TABLE}'))
+
+        self.session.execute(
+            text(
+                f'INSERT INTO {VULNERS_SEARCH_TABLE} (global_identifier, identifier, description, packages) '
+                f'SELECT vulners.global_identifier, vulners.identifier, vulners.description, '
+                f'group_concat(affects.name, \' \') '
+                f'FROM vulners LEFT JOIN affects ON affects.vulner_id = vulners.global_identifier '
+                f'{vulners_filter} '
+                f'GROUP BY vulners.global_identifier'
+            ),
+            params,
+        )
+
+    def update_vulners_primary_ratings(self, vulner_ids: list[str] | None = None) -> None:
+        """
+        Метод заполнения оценки и критичности уязвимостей по их первому рейтингу.
+        Транзакция не фиксируется.
+
+        :param vulner_ids: Идентификаторы уязвимостей, по умолчанию - все уязвимости
+        """
+
+        first_rating = (
+            select(RatingORM.score, RatingORM.severity)
+            .where(RatingORM.vulner_id == VulnerORM.global_identifier)
+            .order_by(RatingORM.id)
+            .limit(1)
+        )
+        statement = update(VulnerORM).values(
+            score=first_rating.with_only_columns(RatingORM.score).scalar_subquery(),
+            severity=first_rating.with_only_columns(RatingORM.severity).scalar_subquery(),
+        )
+        if vulner_ids is not None:
+            statement = statement.where(VulnerORM.global_identifier.in_(vulner_ids))
+
+        self.session.execute(statement.execution_options(synchronize_session=False))
+
     @staticmethod
     def delete_scan_config(scan_config: int) -> int:
         delete(ScanConfigORM).where(ScanConfigORM.id == scan_config)
@@ -315,42 +877,461 @@ class ServiceDB:
     #     )
     #     self.session.commit()
 
+    def add_scan_job(self, scan_config_id: int) -> ScanJobGetDTO:
+        """
+        Метод добавления задания сканирования в статусе ожидания
+
+        :param scan_config_id: Идентификатор конфигурации сканирования
+        :return: Созданное задание
+        """
+
+        scan_job_model = ScanJobORM(scan_config_id=scan_config_id, status=ScanJobStatus.queued.value)
+        self.session.add(scan_job_model)
+        self.session.commit()
+
+        return ScanJobGetDTO.model_validate(scan_job_model, from_attributes=True)
+
+    def update_scan_job(self, job_id: int, **values) -> None:
+        """
+        Метод обновления полей задания сканирования
+
+        :param job_id: Идентификатор задания
+        :param values: Новые значения полей
+        """
+
+        self.session.execute(update(ScanJobORM).where(ScanJobORM.id == job_id).values(**values))
+        self.session.commit()
+
+    def fail_scan_jobs(self, error: str, job_ids: list[int] | None = None) -> int:
+        """
+        Метод отметки ошибкой заданий сканирования, которые ожидают или выполняются.
+        Завершенные задания не изменяются.
+
+        :param error: Причина ошибки
+        :param job_ids: Идентификаторы заданий, по умолчанию - все незавершенные задания
+        :return: Количество отмеченных заданий
+        """
+
+        statement = (
+            update(ScanJobORM)
+            .where(ScanJobORM.status.in_([ScanJobStatus.queued.value, ScanJobStatus.running.value]))
+            .values(
+                status=ScanJobStatus.failed.value,
+                error=error,
+                finished_at=datetime.now().strftime(TIMESTAMP_FORMAT),
+            )
+        )
+        if job_ids is not None:
+            statement = statement.where(ScanJobORM.id.in_(job_ids))
+
+        result = self.session.execute(statement.execution_options(synchronize_session=False))
+        self.session.commit()
+        return result.rowcount
+
+    def get_scan_job(self, job_id: int) -> ScanJobGetDTO | None:
+        """
+        Метод получения задания сканирования
+
+        :param job_id: Идентификатор задания
+        :return: Задание сканирования или None, если задания нет
+        """
+
+        statement = select(ScanJobORM).where(ScanJobORM.id == job_id)
+        scan_job_data = self.session.scalars(statement).one_or_none()
+        if scan_job_data is None:
+            return None
+        return ScanJobGetDTO.model_validate(scan_job_data, from_attributes=True)
+
+    def get_project_scan_states(self, project_config_ids: list[int]) -> dict[int, ProjectScanStateDTO]:
+        """
+        Метод получения сохраненных состояний сканирования проектов
+
+        :param project_config_ids: Идентификаторы конфигураций проектов
+        :return: Состояние сканирования по идентификатору конфигурации проекта
+        """
+
+        if not project_config_ids:
+            return {}
+
+        statement = select(ProjectScanStateORM).where(ProjectScanStateORM.project_config_id.in_(project_config_ids))
+        return {
+            state.project_config_id: ProjectScanStateDTO.model_validate(state, from_attributes=True)
+            for state in self.session.scalars(statement).all()
+        }
+
+    def save_project_scan_state(self, scan_state: ProjectScanStateDTO) -> None:
+        """
+        Метод сохранения состояния сканирования проекта
+
+        :param scan_state: Хэши содержимого проекта и найденное затронутое ПО
+        """
+
+        self.session.merge(
+            ProjectScanStateORM(
+                **scan_state.model_dump(),
+                updated_at=datetime.now().strftime(TIMESTAMP_FORMAT),
+            )
+        )
+        self.session.commit()
+
+    def get_affects_vulners(self, affect_ids: set[int]) -> dict[int, tuple[AffectedGetDTO, VulnerBasicGetDTO]]:
+        """
+        Метод получения затронутого ПО вместе с краткими данными уязвимостей
+
+        :param affect_ids: Идентификаторы затронутого ПО
+        :return: Затронутое ПО и уязвимость по идентификатору затронутого ПО
+        """
+
+        if not affect_ids:
+            return {}
+
+        statement = (
+            select(AffectedORM)
+            .where(AffectedORM.id.in_(affect_ids))
+            .options(joinedload(AffectedORM.vulner))
+        )
+        affects = self.session.scalars(statement).unique().all()
+
+        result = {}
+        for affect in affects:
+            result[affect.id] = (
+                AffectedGetDTO.model_validate(affect, from_attributes=True),
+                VulnerBasicGetDTO.model_validate(affect.vulner, from_attributes=True),
+            )
+
+        return result
+
+    def get_all_affects(self) -> list[AffectedORM]:
+        """Метод получения всех записей затронутого ПО"""
+
+        return self.session.scalars(select(AffectedORM)).all()
+
+    def get_vulner_db_generation(self) -> int:
+        """
+        Метод получения поколения базы уязвимостей
+
+        :return: Номер поколения, 0 - если данные еще не импортировались
+        """
+
+        statement = select(VulnerDBStateORM.generation).where(VulnerDBStateORM.id == VULNER_DB_STATE_ID)
+        return self.session.scalar(statement) or 0
+
+    def bump_vulner_db_generation(self) -> int:
+        """
+        Метод увеличения поколения базы уязвимостей после изменения данных.
+        Транзакция не фиксируется, чтобы поколение менялось вместе с данными.
+
+        :return: Новый номер поколения
+        """
+
+        state = self.session.get(VulnerDBStateORM, VULNER_DB_STATE_ID)
+        if state is None:
+            state = VulnerDBStateORM(id=VULNER_DB_STATE_ID, generation=0)
+            self.session.add(state)
+
+        state.generation += 1
+        state.updated_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.session.flush()
+        return state.generation
+
+    def analyze_vulners_tables(self) -> None:
+        """
+        Метод обновления статистики планировщика по таблицам уязвимостей после загрузки данных.
+        Без статистики SQLite выбирает индекс фильтра вместо поиска по найденным уязвимостям.
+        """
+
+        preparer = self.session.bind.dialect.identifier_preparer
+        for model in (VulnerORM, AffectedORM, RatingORM, ReferenceORM):
+            self.session.execute(text(f'ANALYZE {preparer.format_table(model.__table__)}'))
+
+    def get_existing_vulner_ids(self, vulner_ids: list[str]) -> set[str]:
+        """
+        Метод получения идентификаторов уже сохраненных уязвимостей
+
+        :param vulner_ids: Глобальные идентификаторы уязвимостей
+        :return: Идентификаторы, которые есть в базе
+        """
+
+        statement = select(VulnerORM.global_identifier).where(VulnerORM.global_identifier.in_(vulner_ids))
+        return set(self.session.scalars(statement))
+
+    def get_imported_files(self) -> dict[str, tuple[int, int]]:
+        """
+        Метод получения импортированных файлов уязвимостей
+
+        :return: Размер и время изменения (в наносекундах) по пути файла
+        """
+
+        statement = select(VulnerImportFileORM.path, VulnerImportFileORM.size, VulnerImportFileORM.modified_at_ns)
+        return {path: (size, modified_at_ns) for path, size, modified_at_ns in self.session.execute(statement)}
+
+    def save_imported_files(self, files: list[dict]) -> None:
+        """
+        Метод отметки импортированных файлов уязвимостей, прежние отметки тех же файлов заменяются.
+        Транзакция не фиксируется, чтобы отметка сохранялась вместе с данными файлов.
+
+        :param files: Строки с путем, размером и временем изменения файлов
+        """
+
+        if not files:
+            return
+
+        self.session.execute(delete(VulnerImportFileORM).where(VulnerImportFileORM.path.in_([file['path'] for file in files])))
+        imported_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+        self.bulk_insert(VulnerImportFileORM, [{**file, 'imported_at': imported_at} for file in files])
+
+    def get_vulners_content_hashes(self) -> dict[str, str | None]:
+        """
+        Метод получения хэшей содержимого всех уязвимостей
+
+        :return: Хэш по глобальному идентификатору уязвимости, пустой - для уязвимостей без хэша
+        """
+
+        statement = select(VulnerORM.global_identifier, VulnerORM.content_hash)
+        return {vulner_id: content_hash for vulner_id, content_hash in self.session.execute(statement)}
+
+    def backfill_vulners_content_hashes(self, batch_size: int = VULNER_IMPORT_BATCH_FILES) -> int:
+        """
+        Метод заполнения хэшей содержимого уязвимостей, загруженных до их появления.
+        Хэш считается по строкам базы так же, как по строкам файлов, поэтому синхронизация затем
+        перезаписывает только уязвимости, содержимое которых действительно отличается от файлов.
+        Каждый пакет фиксируется отдельной транзакцией и блокирует только свои строки.
+
+        :param batch_size: Количество уязвимостей в пакете
+        :return: Количество заполненных хэшей
+        """
+
+        vulner_columns = [
+            VulnerORM.global_identifier,
+            VulnerORM.identifier,
+            VulnerORM.description,
+            VulnerORM.source_name,
+            VulnerORM.source_url,
+        ]
+        children_columns = [
+            (AffectedORM, [column for column in AffectedORM.__table__.c if column.key != 'id']),
+            (RatingORM, [column for column in RatingORM.__table__.c if column.key != 'id']),
+            (ReferenceORM, [column for column in ReferenceORM.__table__.c if column.key != 'id']),
+        ]
+
+        filled_count = 0
+        last_vulner_id = ''
+        while True:
+            statement = (
+                select(*vulner_columns)
+                .where(VulnerORM.content_hash.is_(None), VulnerORM.global_identifier > last_vulner_id)
+                .order_by(VulnerORM.global_identifier)
+                .limit(batch_size)
+            )
+            vulners = [dict(row._mapping) for row in self.session.execute(statement)]
+            if not vulners:
+                return filled_count
+
+            vulner_ids = [vulner['global_identifier'] for vulner in vulners]
+            # Дочерние строки в порядке вставки совпадают с порядком строк файла.
+            children = []
+            for model, columns in children_columns:
+                rows = {vulner_id: [] for vulner_id in vulner_ids}
+                statement = select(*columns).where(model.vulner_id.in_(vulner_ids)).order_by(model.id)
+                for row in self.session.execute(statement):
+                    rows[row.vulner_id].append(dict(row._mapping))
+                children.append(rows)
+
+            self.update_vulners(
+                [
+                    {
+                        'global_identifier': vulner['global_identifier'],
+                        'content_hash': get_content_hash(
+                            vulner, *(rows[vulner['global_identifier']] for rows in children)
+                        ),
+                    }
+                    for vulner in vulners
+                ]
+            )
+            self.session.commit()
+
+            filled_count += len(vulners)
+            last_vulner_id = vulner_ids[-1]
+            logging.info(f'Filled content hashes of {filled_count} vulners')
+
+    def update_vulners(self, rows: list[dict]) -> None:
+        """
+        Метод пакетного обновления уязвимостей по глобальному идентификатору.
+        Транзакция не фиксируется.
+
+        :param rows: Строки уязвимостей, у всех строк одинаковый набор столбцов
+        """
+
+        if rows:
+            self.session.execute(update(VulnerORM), rows)
+
+    def replace_vulners_children(
+            self,
+            vulner_ids: list[str],
+            affects: list[dict],
+            ratings: list[dict],
+            references: list[dict],
+    ) -> int:
+        """
+        Метод замены дочерних строк уязвимостей.
+        Рейтинги и ссылки заменяются целиком. Совпадающие записи затронутого ПО остаются со своими
+        идентификаторами, на которые ссылаются отчеты, добавляются и удаляются только изменившиеся.
+        Транзакция не фиксируется.
+
+        :param vulner_ids: Глобальные идентификаторы уязвимостей
+        :param affects: Новые строки затронутого ПО уязвимостей
+        :param ratings: Новые строки рейтингов уязвимостей
+        :param references: Новые строки ссылок уязвимостей
+        :return: Количество удаленных и добавленных строк
+        """
+
+        existing_affects = {}
+        statement = select(AffectedORM.id, *AFFECT_KEY_COLUMNS).where(AffectedORM.vulner_id.in_(vulner_ids))
+        for affect_id, *affect_key in self.session.execute(statement):
+            existing_affects.setdefault(tuple(affect_key), []).append(affect_id)
+
+        added_affects = []
+        for affect in affects:
+            affect_ids = existing_affects.get(tuple(affect[column.key] for column in AFFECT_KEY_COLUMNS))
+            if affect_ids:
+                affect_ids.pop()
+            else:
+                added_affects.append(affect)
+
+        removed_affect_ids = [affect_id for affect_ids in existing_affects.values() for affect_id in affect_ids]
+        self.delete_affects(removed_affect_ids)
+        self.bulk_insert(AffectedORM, added_affects)
+
+        deleted_count = len(removed_affect_ids)
+        for model, rows in ((RatingORM, ratings), (ReferenceORM, references)):
+            result = self.session.execute(
+                delete(model).where(model.vulner_id.in_(vulner_ids)).execution_options(synchronize_session=False)
+            )
+            deleted_count += result.rowcount
+            self.bulk_insert(model, rows)
+
+        return deleted_count + len(added_affects) + len(ratings) + len(references)
+
+    def delete_affects(self, affect_ids: list[int]) -> None:
+        """
+        Метод удаления записей затронутого ПО.
+        Найденное в отчетах затронутое ПО отвязывается от удаляемых записей и не показывается в отчетах.
+        Транзакция не фиксируется.
+
+        :param affect_ids: Идентификаторы записей затронутого ПО
+        """
+
+        if not affect_ids:
+            return
+
+        self.session.execute(
+            update(AffectedProjectsORM)
+            .where(AffectedProjectsORM.affected_id.in_(affect_ids))
+            .values(affected_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        self.session.execute(
+            delete(AffectedORM).where(AffectedORM.id.in_(affect_ids)).execution_options(synchronize_session=False)
+        )
+
+    def delete_vulners(self, vulner_ids: list[str]) -> int:
+        """
+        Метод удаления уязвимостей вместе с дочерними строками.
+        Транзакция не фиксируется.
+
+        :param vulner_ids: Глобальные идентификаторы уязвимостей
+        :return: Количество удаленных строк
+        """
+
+        affect_ids = list(self.session.scalars(select(AffectedORM.id).where(AffectedORM.vulner_id.in_(vulner_ids))))
+        self.delete_affects(affect_ids)
+
+        deleted_count = len(affect_ids)
+        for model in (RatingORM, ReferenceORM):
+            result = self.session.execute(
+                delete(model).where(model.vulner_id.in_(vulner_ids)).execution_options(synchronize_session=False)
+            )
+            deleted_count += result.rowcount
+
+        result = self.session.execute(
+            delete(VulnerORM).where(VulnerORM.global_identifier.in_(vulner_ids)).execution_options(synchronize_session=False)
+        )
+        return deleted_count + result.rowcount
+
+    def find_package_vulners(self, packages: list[PackageQueryDTO]) -> list[PackageVulnersDTO]:
+        """
+        Метод поиска уязвимостей версий пакетов без сканирования проекта.
+        Попадание версии в интервалы проверяется так же, как в find_vulnerable_software.
+
+        :param packages: Пакеты с экосистемой и версией
+        :return: Уязвимости каждого пакета в порядке запроса
+        """
+
+        package_keys = {(package.type, package.name) for package in packages}
+        if not package_keys:
+            return []
+
+        statement = (
+            select(
+                AffectedORM.id,
+                AffectedORM.name,
+                AffectedORM.type,
+                AffectedORM.start_condition,
+                AffectedORM.start_value,
+                AffectedORM.end_value,
+                AffectedORM.end_condition,
+                AffectedORM.vulner_id,
+                VulnerORM.global_identifier,
+                VulnerORM.identifier,
+                VulnerORM.source_name,
+                VulnerORM.source_url,
+                VulnerORM.score,
+                VulnerORM.severity,
+            )
+            .join(VulnerORM, AffectedORM.vulner_id == VulnerORM.global_identifier)
+            .where(tuple_(AffectedORM.type, AffectedORM.name).in_(package_keys))
+        )
+
+        package_affects = {}
+        vulners = {}
+        for row in self.session.execute(statement):
+            package_affects.setdefault((row.type, row.name), []).append(row)
+            vulners[row.vulner_id] = row
+
+        indexes = {package_key: AffectsIndex(affects) for package_key, affects in package_affects.items()}
+
+        result = []
+        for package in packages:
+            index = indexes.get((package.type, package.name))
+            vulner_ids = set()
+            if index is not None:
+                vulner_ids = {interval.vulner_id for interval in index.match_component(package.name, package.version)}
+
+            result.append(
+                PackageVulnersDTO(
+                    package=package,
+                    vulners=[
+                        VulnerBasicGetDTO.model_validate(vulners[vulner_id], from_attributes=True)
+                        for vulner_id in sorted(vulner_ids)
+                    ],
+                )
+            )
+
+        return result
+
     def find_vulnerable_software(self, components: list[SoftComponentSchema]) -> list[int]:
+        """
+        Метод поиска затронутого ПО среди компонентов
 
-        result = set()
+        :param components: Компоненты ПО
+        :return: Отсортированные идентификаторы найденного затронутого ПО
+        """
 
-        components_names = [component.name for component in components]
+        components_names = {component.name for component in components}
         statement = select(AffectedORM).filter(AffectedORM.name.in_(components_names))
         affects = self.session.scalars(statement).all()
-        for component in components:
-            for affect in affects:
-                # print(f'{component.version=}')
-                # print(f'{affect.start_condition=}\t{affect.start_value=}\t{affect.end_value=}\t{affect.end_condition=}')
-                try:
-
-                    is_vulnerable = check_is_vulnerable(
-                        pkg_version=component.version,
-                        vulnerable_interval=VulnerableIntervalSchema(
-                            left_border=VersionBorder(affect.start_condition),
-                            left_version=affect.start_value,
-                            right_version=affect.end_value if affect.end_value != 'inf' else '9999999',
-                            right_border=VersionBorder(affect.end_condition),
-                        )
-                    )
-                except TypeError as err:
-                    print(f'Unprocessable version: {err}')
-                    continue
-
-                if not is_vulnerable:
-                    continue
-
-                result.add(affect.id)
-                # if not result.get(affect.id):
-                #     result[affect.id] = []
-                #
-                # result[affect.id].append(affect.vulner_id)
 
-        return sorted(result)
+        return AffectsIndex(affects).match(components)
 
 
 def main():
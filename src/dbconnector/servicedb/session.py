@@ -0,0 +1,176 @@
+"""
+Модуль общего движка и сессий сервисной базы данных
+"""
+
+from threading import Lock
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy.engine.base import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from dbconnector.servicedb.functions import get_db_engine, get_async_db_engine
+from models.scanner_models import DBPoolStatusDTO
+
+
+_engine: Engine | None = None
+_session_factory: sessionmaker | None = None
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker | None = None
+_engine_lock = Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Функция получения общего движка сервисной базы данных.
+    Движок создается при первом обращении, а не при импорте, и один на процесс сервиса.
+
+    :return: Движок базы данных
+    """
+
+    global _engine, _session_factory
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = get_db_engine()
+            _session_factory = sessionmaker(_engine)
+
+    return _engine
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    Функция получения фабрики сессий общего движка
+
+    :return: Фабрика сессий
+    """
+
+    get_engine()
+    return _session_factory
+
+
+def get_db_session() -> Iterator[Session]:
+    """
+    Зависимость FastAPI: одна сессия на запрос.
+    Соединение берется из пула при первом запросе к базе и возвращается после ответа.
+
+    :return: Сессия базы данных
+    """
+
+    session = get_session_factory()()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Функция получения общего асинхронного движка сервисной базы данных для маршрутов чтения.
+    Работает вместе с синхронным движком, который используют сканирование и запись.
+
+    :return: Асинхронный движок базы данных
+    """
+
+    global _async_engine, _async_session_factory
+
+    with _engine_lock:
+        if _async_engine is None:
+            _async_engine = get_async_db_engine()
+            # Объекты не сбрасываются после фиксации: DTO строятся из них уже после commit.
+            _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """
+    Функция получения фабрики асинхронных сессий
+
+    :return: Фабрика асинхронных сессий
+    """
+
+    get_async_engine()
+    return _async_session_factory
+
+
+async def get_async_db_session() -> AsyncIterator[AsyncSession]:
+    """
+    Зависимость FastAPI: одна асинхронная сессия на запрос
+
+    :return: Асинхронная сессия базы данных
+    """
+
+    async with get_async_session_factory()() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def set_engines(engine: Engine, async_engine: AsyncEngine | None = None) -> None:
+    """
+    Функция замены общих движков, например, на движки отдельной базы в бенчмарках
+
+    :param engine: Синхронный движок
+    :param async_engine: Асинхронный движок той же базы
+    """
+
+    global _engine, _session_factory, _async_engine, _async_session_factory
+
+    with _engine_lock:
+        _engine = engine
+        _session_factory = sessionmaker(engine)
+        _async_engine = async_engine
+        _async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False) if async_engine else None
+
+
+def get_pool_status() -> DBPoolStatusDTO:
+    """
+    Функция получения состояния пула соединений общего движка
+
+    :return: Состояние пула
+    """
+
+    pool = get_engine().pool
+    # Размер и переполнение есть только у пула с ограниченным количеством соединений.
+    if not isinstance(pool, QueuePool):
+        return DBPoolStatusDTO(pool_class=type(pool).__name__, status=pool.status())
+
+    return DBPoolStatusDTO(
+        pool_class=type(pool).__name__,
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+        status=pool.status(),
+    )
+
+
+def dispose_engine() -> None:
+    """Функция закрытия соединений пула при остановке сервиса"""
+
+    global _engine, _session_factory
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+            _session_factory = None
+
+
+async def dispose_async_engine() -> None:
+    """Функция закрытия соединений асинхронного пула при остановке сервиса"""
+
+    global _async_engine, _async_session_factory
+
+    with _engine_lock:
+        async_engine, _async_engine, _async_session_factory = _async_engine, None, None
+
+    if async_engine is not None:
+        await async_engine.dispose()
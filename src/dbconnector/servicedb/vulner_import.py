@@ -0,0 +1,253 @@
+"""
+Модуль потокового импорта уязвимостей из файлов пакета pyup в сервисную базу данных.
+
+Файлы разбираются параллельно в отдельных процессах, строки записываются пакетами без ORM-объектов:
+в PostgreSQL командой COPY, иначе executemany. Каждый пакет файлов записывается одной транзакцией
+вместе с отметками об импорте файлов и новым поколением базы уязвимостей, поэтому прерванный импорт
+продолжается с первого незаписанного пакета, а записанные данные не остаются в прежнем поколении.
+Уже сохраненные уязвимости не изменяются, обновление существующих данных выполняет синхронизация.
+
+Запуск: cd src && python -m dbconnector.servicedb.vulner_import [--packages-dir ...]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from sqlalchemy.engine.base import Engine
+
+from configs.settings import VULNER_PACKAGES_DIR_PATH, VULNER_IMPORT_PROCESSES, VULNER_IMPORT_BATCH_FILES
+from dbconnector.servicedb.advisories import AdvisoryRows, parse_advisory_file
+from dbconnector.servicedb.functions import get_db_engine
+from dbconnector.servicedb.models import VulnerORM, AffectedORM, RatingORM, ReferenceORM
+from dbconnector.servicedb.servicedb import ServiceDB
+
+
+ADVISORY_FILES_PATTERN = '*.json'
+# Количество файлов, передаваемых процессу разбора за одно обращение.
+PARSE_CHUNK_SIZE = 64
+
+
+@dataclass
+class ImportStats:
+    """Статистика импорта"""
+
+    files_count: int = 0
+    skipped_files_count: int = 0
+    vulners_count: int = 0
+    skipped_vulners_count: int = 0
+    rows_count: int = 0
+    duration: float = 0.0
+    generation: int | None = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_count / self.duration if self.duration else 0.0
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[tuple]:
+    """
+    Функция разбиения последовательности на пакеты
+
+    :param items: Элементы
+    :param batch_size: Размер пакета
+    :return: Пакеты элементов
+    """
+
+    items = iter(items)
+    while batch := tuple(islice(items, batch_size)):
+        yield batch
+
+
+def iter_advisory_files(packages_dir: Path) -> Iterator[Path]:
+    """
+    Функция обхода файлов уязвимостей каталога в постоянном порядке
+
+    :param packages_dir: Каталог пакетов уязвимостей
+    :return: Пути до файлов
+    """
+
+    return iter(sorted(packages_dir.rglob(ADVISORY_FILES_PATTERN)))
+
+
+def iter_pending_files(packages_dir: Path, imported_files: dict[str, tuple[int, int]], stats: ImportStats) -> Iterator[Path]:
+    """
+    Функция обхода файлов уязвимостей, которые еще не импортированы или изменились после импорта
+
+    :param packages_dir: Каталог пакетов уязвимостей
+    :param imported_files: Размер и время изменения импортированных файлов по пути
+    :param stats: Статистика импорта, в ней учитываются пропущенные файлы
+    :return: Пути до файлов
+    """
+
+    for file_path in iter_advisory_files(packages_dir):
+        file_stat = file_path.stat()
+        file_key = (file_stat.st_size, file_stat.st_mtime_ns)
+        if imported_files.get(file_path.relative_to(packages_dir).as_posix()) == file_key:
+            stats.skipped_files_count += 1
+            continue
+
+        yield file_path
+
+
+def iter_parsed_batches(
+        packages_dir: Path,
+        file_paths: Iterable[Path],
+        processes: int = VULNER_IMPORT_PROCESSES,
+        batch_files: int = VULNER_IMPORT_BATCH_FILES,
+) -> Iterator[list[AdvisoryRows]]:
+    """
+    Функция разбора файлов уязвимостей пакетами.
+    Следующий пакет файлов разбирается процессами, пока обрабатывается текущий.
+
+    :param packages_dir: Каталог пакетов уязвимостей
+    :param file_paths: Пути до файлов
+    :param processes: Количество процессов разбора
+    :param batch_files: Количество файлов в пакете
+    :return: Строки файлов пакета
+    """
+
+    batches = iter_batches(file_paths, batch_files)
+    if processes > 1:
+        executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+    else:
+        executor = nullcontext()
+
+    with executor:
+
+        def parse_batch(batch_file_paths: tuple[Path, ...]) -> Iterator[AdvisoryRows]:
+            packages_dirs = [packages_dir] * len(batch_file_paths)
+            if processes <= 1:
+                # Файлы разбираются в текущем процессе, без запуска процессов и передачи строк между ними.
+                return map(parse_advisory_file, packages_dirs, batch_file_paths)
+            return executor.map(parse_advisory_file, packages_dirs, batch_file_paths, chunksize=PARSE_CHUNK_SIZE)
+
+        parsed_batch = parse_batch(next(batches, ()))
+        while batch := list(parsed_batch):
+            parsed_batch = parse_batch(next(batches, ()))
+            yield batch
+
+
+def write_batch(engine: Engine, batch: list[AdvisoryRows], stats: ImportStats) -> None:
+    """
+    Функция записи пакета файлов одной транзакцией.
+    Уязвимости, которые уже есть в базе или встретились раньше в пакете, пропускаются.
+    Если добавлены уязвимости, в той же транзакции увеличивается поколение базы уязвимостей.
+
+    :param engine: Движок базы данных
+    :param batch: Строки файлов пакета
+    :param stats: Статистика импорта
+    """
+
+    vulners, affects, ratings, references = {}, [], [], []
+    with ServiceDB(engine) as service_db:
+        batch_vulner_ids = [vulner['global_identifier'] for advisory_rows in batch for vulner in advisory_rows.vulners]
+        skipped_vulner_ids = service_db.get_existing_vulner_ids(batch_vulner_ids)
+
+        for advisory_rows in batch:
+            # Строки дочерних таблиц файла относятся только к его уязвимостям.
+            file_vulner_ids = set()
+            for vulner in advisory_rows.vulners:
+                vulner_id = vulner['global_identifier']
+                if vulner_id in skipped_vulner_ids or vulner_id in vulners:
+                    stats.skipped_vulners_count += 1
+                    continue
+                vulners[vulner_id] = vulner
+                file_vulner_ids.add(vulner_id)
+
+            affects.extend(row for row in advisory_rows.affects if row['vulner_id'] in file_vulner_ids)
+            ratings.extend(row for row in advisory_rows.ratings if row['vulner_id'] in file_vulner_ids)
+            references.extend(row for row in advisory_rows.references if row['vulner_id'] in file_vulner_ids)
+
+        service_db.bulk_insert(VulnerORM, list(vulners.values()))
+        service_db.bulk_insert(AffectedORM, affects)
+        service_db.bulk_insert(RatingORM, ratings)
+        service_db.bulk_insert(ReferenceORM, references)
+
+        vulner_ids = list(vulners)
+        if vulner_ids:
+            service_db.update_vulners_primary_ratings(vulner_ids)
+            service_db.refresh_vulners_search_index(vulner_ids)
+            stats.generation = service_db.bump_vulner_db_generation()
+
+        service_db.save_imported_files(
+            [
+                {'path': advisory_rows.path, 'size': advisory_rows.size, 'modified_at_ns': advisory_rows.modified_at_ns}
+                for advisory_rows in batch
+            ]
+        )
+        service_db.session.commit()
+
+    stats.files_count += len(batch)
+    stats.vulners_count += len(vulners)
+    stats.rows_count += len(vulners) + len(affects) + len(ratings) + len(references)
+
+
+def import_vulners(
+        engine: Engine,
+        packages_dir: Path = VULNER_PACKAGES_DIR_PATH,
+        processes: int = VULNER_IMPORT_PROCESSES,
+        batch_files: int = VULNER_IMPORT_BATCH_FILES,
+) -> ImportStats:
+    """
+    Функция импорта уязвимостей из каталога пакета.
+    Поколение базы уязвимостей увеличивается с каждым пакетом, в котором добавлены уязвимости.
+
+    :param engine: Движок базы данных
+    :param packages_dir: Каталог пакетов уязвимостей
+    :param processes: Количество процессов разбора
+    :param batch_files: Количество файлов в одной транзакции
+    :return: Статистика импорта
+    """
+
+    stats = ImportStats()
+    started_at = time.perf_counter()
+
+    with ServiceDB(engine) as service_db:
+        imported_files = service_db.get_imported_files()
+
+    pending_files = iter_pending_files(packages_dir, imported_files, stats)
+    for batch in iter_parsed_batches(packages_dir, pending_files, processes, batch_files):
+        write_batch(engine, batch, stats)
+
+        stats.duration = time.perf_counter() - started_at
+        logging.info(
+            f'Imported {stats.files_count} files, {stats.vulners_count} vulners, {stats.rows_count} rows '
+            f'({stats.rows_per_second:.0f} rows/s), skipped {stats.skipped_files_count} imported files'
+        )
+
+    if stats.vulners_count:
+        with ServiceDB(engine) as service_db:
+            service_db.analyze_vulners_tables()
+            service_db.session.commit()
+        logging.info(f'Vulner DB generation {stats.generation}')
+
+    stats.duration = time.perf_counter() - started_at
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages-dir', type=Path, default=VULNER_PACKAGES_DIR_PATH)
+    parser.add_argument('--processes', type=int, default=VULNER_IMPORT_PROCESSES)
+    parser.add_argument('--batch-files', type=int, default=VULNER_IMPORT_BATCH_FILES)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = import_vulners(get_db_engine(), args.packages_dir, args.processes, args.batch_files)
+    logging.info(
+        f'Import finished: {stats.files_count} files ({stats.skipped_files_count} already imported), '
+        f'{stats.vulners_count} vulners ({stats.skipped_vulners_count} already imported), {stats.rows_count} rows '
+        f'in {stats.duration:.1f} s, {stats.rows_per_second:.0f} rows/s'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Модуль инкрементальной синхронизации уязвимостей с файлами пакета pyup.
+
+Для каждой уязвимости хранится хэш ее содержимого вместе с дочерними строками. Синхронизация
+добавляет новые уязвимости, обновляет только изменившиеся с заменой их дочерних строк и удаляет
+отозванные, которых больше нет в файлах. Все изменения и новое поколение базы уязвимостей
+фиксируются одной транзакцией: до ее завершения читатели видят прежние данные, кэши и снимки
+затронутого ПО перестраиваются один раз. Найденное в отчетах затронутое ПО удаленных записей
+отвязывается от них, а снимки отчетов прежнего поколения перестраиваются при чтении.
+
+Запуск: cd src && python -m dbconnector.servicedb.vulner_sync [--packages-dir ...]
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy.engine.base import Engine
+
+from configs.settings import VULNER_PACKAGES_DIR_PATH, VULNER_IMPORT_PROCESSES, VULNER_IMPORT_BATCH_FILES
+from dbconnector.servicedb.advisories import AdvisoryRows
+from dbconnector.servicedb.functions import get_db_engine
+from dbconnector.servicedb.models import VulnerORM
+from dbconnector.servicedb.servicedb import ServiceDB
+from dbconnector.servicedb.vulner_import import iter_advisory_files, iter_parsed_batches, iter_batches
+
+
+@dataclass
+class SyncStats:
+    """Статистика синхронизации"""
+
+    files_count: int = 0
+    added_count: int = 0
+    updated_count: int = 0
+    unchanged_count: int = 0
+    withdrawn_count: int = 0
+    rows_count: int = 0
+    duration: float = 0.0
+    generation: int | None = None
+
+    @property
+    def changed_count(self) -> int:
+        return self.added_count + self.updated_count + self.withdrawn_count
+
+
+def sync_batch(
+        service_db: ServiceDB,
+        batch: list[AdvisoryRows],
+        content_hashes: dict[str, str | None],
+        seen_vulner_ids: set[str],
+        stats: SyncStats,
+) -> None:
+    """
+    Функция записи новых и изменившихся уязвимостей пакета файлов.
+    Уязвимость, которая уже встречалась в предыдущих файлах, пропускается.
+    Транзакция не фиксируется.
+
+    :param service_db: Сервисная база данных
+    :param batch: Строки файлов пакета
+    :param content_hashes: Хэши содержимого уязвимостей в базе
+    :param seen_vulner_ids: Идентификаторы уязвимостей, уже найденных в файлах
+    :param stats: Статистика синхронизации
+    """
+
+    changed_vulners, affects, ratings, references = {}, [], [], []
+    for advisory_rows in batch:
+        file_vulner_ids = set()
+        for vulner in advisory_rows.vulners:
+            vulner_id = vulner['global_identifier']
+            if vulner_id in seen_vulner_ids:
+                continue
+            seen_vulner_ids.add(vulner_id)
+
+            if content_hashes.get(vulner_id) == vulner['content_hash']:
+                stats.unchanged_count += 1
+                continue
+
+            changed_vulners[vulner_id] = vulner
+            file_vulner_ids.add(vulner_id)
+
+        affects.extend(row for row in advisory_rows.affects if row['vulner_id'] in file_vulner_ids)
+        ratings.extend(row for row in advisory_rows.ratings if row['vulner_id'] in file_vulner_ids)
+        references.extend(row for row in advisory_rows.references if row['vulner_id'] in file_vulner_ids)
+
+    if not changed_vulners:
+        return
+
+    added_vulners = [vulner for vulner_id, vulner in changed_vulners.items() if vulner_id not in content_hashes]
+    updated_vulners = [vulner for vulner_id, vulner in changed_vulners.items() if vulner_id in content_hashes]
+    service_db.bulk_insert(VulnerORM, added_vulners)
+    service_db.update_vulners(updated_vulners)
+
+    vulner_ids = list(changed_vulners)
+    rows_count = service_db.replace_vulners_children(vulner_ids, affects, ratings, references)
+    service_db.update_vulners_primary_ratings(vulner_ids)
+    service_db.refresh_vulners_search_index(vulner_ids)
+
+    stats.added_count += len(added_vulners)
+    stats.updated_count += len(updated_vulners)
+    stats.rows_count += len(changed_vulners) + rows_count
+
+
+def sync_vulners(
+        engine: Engine,
+        packages_dir: Path = VULNER_PACKAGES_DIR_PATH,
+        processes: int = VULNER_IMPORT_PROCESSES,
+        batch_files: int = VULNER_IMPORT_BATCH_FILES,
+) -> SyncStats:
+    """
+    Функция синхронизации уязвимостей базы с каталогом пакета.
+    Если уязвимости изменились, поколение базы уязвимостей увеличивается.
+
+    :param engine: Движок базы данных
+    :param packages_dir: Каталог пакетов уязвимостей
+    :param processes: Количество процессов разбора
+    :param batch_files: Количество файлов, обрабатываемых за один проход
+    :return: Статистика синхронизации
+    """
+
+    stats = SyncStats()
+    started_at = time.perf_counter()
+    seen_vulner_ids = set()
+
+    with ServiceDB(engine) as service_db:
+        content_hashes = service_db.get_vulners_content_hashes()
+
+        for batch in iter_parsed_batches(packages_dir, iter_advisory_files(packages_dir), processes, batch_files):
+            sync_batch(service_db, batch, content_hashes, seen_vulner_ids, stats)
+            service_db.save_imported_files(
+                [
+                    {'path': advisory_rows.path, 'size': advisory_rows.size, 'modified_at_ns': advisory_rows.modified_at_ns}
+                    for advisory_rows in batch
+                ]
+            )
+            stats.files_count += len(batch)
+            logging.info(
+                f'Synced {stats.files_count} files: {stats.added_count} added, {stats.updated_count} updated, '
+                f'{stats.unchanged_count} unchanged vulners'
+            )
+
+        # Пустой или недоступный каталог не должен удалять все уязвимости базы.
+        if not seen_vulner_ids:
+            raise ValueError(f'No vulnerabilities found in {packages_dir}, sync is stopped')
+
+        withdrawn_vulner_ids = [vulner_id for vulner_id in content_hashes if vulner_id not in seen_vulner_ids]
+        for vulner_ids in iter_batches(withdrawn_vulner_ids, batch_files):
+            stats.rows_count += service_db.delete_vulners(list(vulner_ids))
+            service_db.refresh_vulners_search_index(list(vulner_ids))
+        stats.withdrawn_count = len(withdrawn_vulner_ids)
+
+        if stats.changed_count:
+            stats.generation = service_db.bump_vulner_db_generation()
+            service_db.analyze_vulners_tables()
+        service_db.session.commit()
+
+    stats.duration = time.perf_counter() - started_at
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages-dir', type=Path, default=VULNER_PACKAGES_DIR_PATH)
+    parser.add_argument('--processes', type=int, default=VULNER_IMPORT_PROCESSES)
+    parser.add_argument('--batch-files', type=int, default=VULNER_IMPORT_BATCH_FILES)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = sync_vulners(get_db_engine(), args.packages_dir, args.processes, args.batch_files)
+    logging.info(
+        f'Sync finished: {stats.files_count} files, {stats.added_count} added, {stats.updated_count} updated, '
+        f'{stats.withdrawn_count} withdrawn, {stats.unchanged_count} unchanged vulners, {stats.rows_count} rows '
+        f'in {stats.duration:.1f} s, vulner DB generation {stats.generation or "is not changed"}'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -2,19 +2,50 @@
 Главный модуль сервиса
 """
 
-import uvicorn
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from configs import settings
+from dbconnector.servicedb.session import dispose_engine, dispose_async_engine
+from matcher.snapshot import vulner_matcher
 from routers.v1.scanner_routers import scanner_router
+from server import run_server
+from services.executors import shutdown_executors
+from services.scan_jobs import scan_job_queue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Загрузка снимка затронутого ПО и запуск обработки заданий при старте, остановка пулов и соединений при завершении"""
+
+    # Снимок мог быть загружен до запуска рабочих процессов.
+    if not vulner_matcher.get_status().is_loaded:
+        try:
+            vulner_matcher.load()
+        except Exception as err:
+            # Снимок будет построен при первом сканировании.
+            logging.error(f'Affects snapshot was not loaded on startup: {err}')
+
+    scan_job_queue.start()
+
+    yield
+
+    scan_job_queue.stop(settings.SCAN_JOB_STOP_TIMEOUT)
+    shutdown_executors()
+    dispose_engine()
+    await dispose_async_engine()
 
 
 # Инициализация веб-сервиса.
 app = FastAPI(
     title=settings.app_title,
     version=settings.api_version,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     # openapi_tags=tags,
 )
 
@@ -30,6 +61,7 @@ def http_exception_handler(
 ):
     return JSONResponse(
         status_code=exc.status_code,
+        headers=exc.headers,
         content=(
             {"msg": exc.detail}
             if exc.detail
@@ -41,11 +73,4 @@ def http_exception_handler(
 
 
 if __name__ == '__main__':
-    uvicorn.run(
-        app='main:app',
-        host='0.0.0.0',
-        port=5000,
-        reload=True,
-        log_level='info',
-        workers=1,
-    )
+    run_server()
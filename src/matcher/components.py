@@ -0,0 +1,195 @@
+"""
+Модуль потокового чтения компонентов ПО из SBOM и списков компонентов
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import AsyncIterator, Iterator
+
+import ijson
+
+from configs.settings import SBOM_CACHE_SIZE
+from models.scanner_models import ComponentDTO
+
+
+# Префикс компонентов верхнего уровня в документе CycloneDX.
+CYCLONEDX_COMPONENTS_PREFIX = 'components.item'
+# Префикс элементов простого списка компонентов.
+COMPONENTS_LIST_PREFIX = 'item'
+
+JSON_WHITESPACES = b' \t\r\n'
+
+
+class StreamReader:
+    """Класс-адаптер асинхронного потока байтов к файловому объекту для ijson"""
+
+    def __init__(self, stream: AsyncIterator[bytes]) -> None:
+        """
+        Инициализация класса
+
+        :param stream: Асинхронный поток частей тела запроса
+        """
+
+        self._stream = stream.__aiter__()
+        self._pending = b''
+
+    async def _next_chunk(self) -> bytes:
+        """Метод получения следующей непустой части потока"""
+
+        async for chunk in self._stream:
+            if chunk:
+                return chunk
+        return b''
+
+    async def peek(self) -> bytes:
+        """
+        Метод получения первого значимого байта потока без его извлечения
+
+        :return: Первый непробельный байт или пустая строка для пустого потока
+        """
+
+        while not self._pending.lstrip(JSON_WHITESPACES):
+            chunk = await self._next_chunk()
+            if not chunk:
+                return b''
+            self._pending += chunk
+
+        return self._pending.lstrip(JSON_WHITESPACES)[:1]
+
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Метод чтения очередной части потока
+
+        :param size: Желаемый размер части, поток отдается частями как есть
+        :return: Часть потока или пустая строка в конце потока
+        """
+
+        # ijson читает 0 байт, чтобы определить тип потока.
+        if size == 0:
+            return b''
+
+        if self._pending:
+            chunk, self._pending = self._pending, b''
+            return chunk
+
+        return await self._next_chunk()
+
+
+def make_component(item: dict) -> ComponentDTO | None:
+    """
+    Функция получения компонента из элемента SBOM или списка компонентов
+
+    :param item: Разобранный элемент
+    :return: Компонент или None, если у элемента нет имени
+    """
+
+    if not isinstance(item, dict) or not item.get('name'):
+        return None
+
+    version = item.get('version')
+    return ComponentDTO(
+        name=item['name'],
+        version=str(version) if version is not None else None,
+        purl=item.get('purl'),
+    )
+
+
+async def iter_stream_components(reader: StreamReader) -> AsyncIterator[ComponentDTO]:
+    """
+    Функция потокового получения компонентов из документа CycloneDX или списка компонентов
+
+    :param reader: Поток тела запроса
+    :return: Асинхронный итератор компонентов
+    """
+
+    first_byte = await reader.peek()
+    if not first_byte:
+        return
+
+    prefix = COMPONENTS_LIST_PREFIX if first_byte == b'[' else CYCLONEDX_COMPONENTS_PREFIX
+    async for item in ijson.items_async(reader, prefix, use_float=True):
+        if component := make_component(item):
+            yield component
+
+
+def iter_sbom_components(file_path: Path) -> Iterator[ComponentDTO]:
+    """
+    Функция потокового получения компонентов верхнего уровня из файла CycloneDX.
+    Документ целиком в памяти не строится, одновременно разбирается только один компонент.
+
+    :param file_path: Путь до файла SBOM
+    :return: Итератор компонентов
+    """
+
+    with file_path.open('rb') as file:
+        for item in ijson.items(file, CYCLONEDX_COMPONENTS_PREFIX, use_float=True):
+            if component := make_component(item):
+                yield component
+
+
+class SBOMComponentsCache:
+    """Класс LRU-кэша компонентов, извлеченных из файлов SBOM"""
+
+    def __init__(self, max_size: int = SBOM_CACHE_SIZE) -> None:
+        """
+        Инициализация класса
+
+        :param max_size: Максимальное количество файлов в кэше
+        """
+
+        self.max_size = max_size
+        self._components: OrderedDict[tuple, tuple[ComponentDTO, ...]] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(file_path: Path) -> tuple:
+        """
+        Метод получения ключа файла: путь, размер и время изменения
+
+        :param file_path: Путь до файла SBOM
+        :return: Ключ кэша
+        """
+
+        file_stat = file_path.stat()
+        return str(file_path.resolve()), file_stat.st_size, file_stat.st_mtime_ns
+
+    def get_components(self, file_path: Path) -> list[ComponentDTO]:
+        """
+        Метод получения компонентов файла SBOM.
+        Неизмененный файл повторно не разбирается.
+
+        :param file_path: Путь до файла SBOM
+        :return: Компоненты ПО
+        """
+
+        key = self.get_key(file_path)
+        with self._lock:
+            components = self._components.get(key)
+            if components is not None:
+                self._components.move_to_end(key)
+                self.hits += 1
+                return list(components)
+
+        components = tuple(iter_sbom_components(file_path))
+        with self._lock:
+            self.misses += 1
+            # Устаревшие записи того же файла вытесняются сразу.
+            for cached_key in [cached_key for cached_key in self._components if cached_key[0] == key[0]]:
+                del self._components[cached_key]
+            self._components[key] = components
+            while len(self._components) > self.max_size:
+                self._components.popitem(last=False)
+
+        return list(components)
+
+    def clear(self) -> None:
+        """Метод очистки кэша"""
+
+        with self._lock:
+            self._components.clear()
+
+
+sbom_components_cache = SBOMComponentsCache()
@@ -0,0 +1,133 @@
+"""
+Модуль индекса уязвимых интервалов версий пакетов
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+from dpss.models import SoftComponentSchema
+
+from dbconnector.servicedb.models import AffectedORM
+from matcher.intervals import CompiledInterval, compile_affect
+from matcher.versions import parse_version, unprocessable_versions
+
+
+class AffectsIndex:
+    """Класс индекса затронутого ПО, сгруппированного по имени пакета"""
+
+    def __init__(self, affects: Iterable[AffectedORM]) -> None:
+        """
+        Инициализация индекса
+
+        :param affects: Записи затронутого ПО
+        """
+
+        self._build(interval for affect in affects if (interval := compile_affect(affect)))
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[CompiledInterval]) -> 'AffectsIndex':
+        """
+        Метод построения индекса из уже скомпилированных интервалов
+
+        :param intervals: Скомпилированные интервалы
+        :return: Индекс затронутого ПО
+        """
+
+        index = cls.__new__(cls)
+        index._build(intervals)
+        return index
+
+    def _build(self, intervals: Iterable[CompiledInterval]) -> None:
+        """
+        Метод группировки и сортировки интервалов по пакетам
+
+        :param intervals: Скомпилированные интервалы
+        """
+
+        grouped_intervals = defaultdict(list)
+        for interval in intervals:
+            grouped_intervals[interval.name].append(interval)
+
+        self._start_keys: dict[str, list[tuple]] = {}
+        self._intervals: dict[str, list[CompiledInterval]] = {}
+        for name, intervals in grouped_intervals.items():
+            intervals.sort()
+            self._start_keys[name] = [interval.start for interval in intervals]
+            self._intervals[name] = intervals
+
+    def __len__(self) -> int:
+        """Количество интервалов в индексе"""
+
+        return sum(len(intervals) for intervals in self._intervals.values())
+
+    def __iter__(self) -> Iterator[CompiledInterval]:
+        """Итерация по всем интервалам индекса"""
+
+        for intervals in self._intervals.values():
+            yield from intervals
+
+    @property
+    def packages_count(self) -> int:
+        """Количество пакетов в индексе"""
+
+        return len(self._intervals)
+
+    def get_candidates(self, name: str, version: tuple) -> list[CompiledInterval]:
+        """
+        Метод получения интервалов пакета, левая граница которых не больше версии
+
+        :param name: Имя пакета
+        :param version: Ключ версии пакета
+        :return: Кандидаты на проверку попадания версии в интервал
+        """
+
+        start_keys = self._start_keys.get(name)
+        if not start_keys:
+            return []
+
+        right_index = bisect_right(start_keys, version)
+        return self._intervals[name][:right_index]
+
+    def match_component(self, name: str, version: str | None) -> list[CompiledInterval]:
+        """
+        Метод поиска интервалов, в которые попадает версия пакета
+
+        :param name: Имя пакета
+        :param version: Версия пакета
+        :return: Интервалы, содержащие версию
+        """
+
+        if name not in self._intervals:
+            return []
+
+        version_key = parse_version(version)
+        if version_key is None:
+            return []
+
+        result = []
+        for interval in self.get_candidates(name, version_key):
+            is_vulnerable = interval.contains(version_key)
+            if is_vulnerable is None:
+                unprocessable_versions.add(version, f'not comparable with interval of affect {interval.affect_id}')
+                continue
+
+            if is_vulnerable:
+                result.append(interval)
+
+        return result
+
+    def match(self, components: Iterable[SoftComponentSchema]) -> list[int]:
+        """
+        Метод поиска затронутого ПО среди компонентов
+
+        :param components: Компоненты ПО
+        :return: Отсортированные идентификаторы найденного затронутого ПО
+        """
+
+        result = set()
+        for component in components:
+            for interval in self.match_component(component.name, component.version):
+                result.add(interval.affect_id)
+
+        return sorted(result)
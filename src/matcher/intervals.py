@@ -0,0 +1,111 @@
+"""
+Модуль скомпилированных интервалов уязвимых версий
+"""
+
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from dpss.models import VulnerableIntervalSchema, VersionBorder
+from dpss.utils import check_is_vulnerable
+
+from dbconnector.servicedb.models import AffectedORM
+from matcher.versions import VersionKey, parse_version, compare_versions
+
+
+INFINITE_VERSION = 'inf'
+
+
+@lru_cache(maxsize=None)
+def get_border_inclusions(start_condition: str, end_condition: str) -> tuple[bool, bool]:
+    """
+    Функция определения включения границ интервала
+
+    Семантика условий берется из dpss: проверяется попадание границ интервала [1; 2] в сам интервал.
+
+    :param start_condition: Условие левой границы
+    :param end_condition: Условие правой границы
+    :return: Включена ли левая граница, включена ли правая граница
+    """
+
+    interval = VulnerableIntervalSchema(
+        left_border=VersionBorder(start_condition),
+        left_version='1',
+        right_version='2',
+        right_border=VersionBorder(end_condition),
+    )
+    return (
+        check_is_vulnerable(pkg_version='1', vulnerable_interval=interval),
+        check_is_vulnerable(pkg_version='2', vulnerable_interval=interval),
+    )
+
+
+@dataclass(frozen=True, order=True, slots=True)
+class CompiledInterval:
+    """Класс интервала уязвимых версий, разобранного один раз при загрузке, упорядочен по левой границе"""
+
+    start: VersionKey
+    affect_id: int
+    start_inclusive: bool = field(compare=False)
+    end: VersionKey | None = field(compare=False)
+    end_inclusive: bool = field(compare=False)
+    vulner_id: str = field(compare=False)
+    name: str = field(compare=False)
+
+    def contains(self, version: VersionKey) -> bool | None:
+        """
+        Метод проверки попадания версии в интервал
+
+        :param version: Ключ версии
+        :return: Попадает ли версия в интервал, None - если версии несравнимы
+        """
+
+        start_comparison = compare_versions(version, self.start)
+        if start_comparison is None:
+            return None
+        if start_comparison < 0 or (start_comparison == 0 and not self.start_inclusive):
+            return False
+
+        if self.end is None:
+            return True
+
+        end_comparison = compare_versions(version, self.end)
+        if end_comparison is None:
+            return None
+        return end_comparison < 0 or (end_comparison == 0 and self.end_inclusive)
+
+
+def compile_affect(affect: AffectedORM) -> CompiledInterval | None:
+    """
+    Функция компиляции записи затронутого ПО в интервал
+
+    :param affect: Запись затронутого ПО
+    :return: Скомпилированный интервал или None, если запись не удалось разобрать
+    """
+
+    try:
+        start_inclusive, end_inclusive = get_border_inclusions(affect.start_condition, affect.end_condition)
+    except ValueError as err:
+        logging.warning(f'Unprocessable conditions of affect {affect.id}: {err}')
+        return None
+
+    start = parse_version(affect.start_value)
+    if start is None:
+        return None
+
+    end = None
+    if affect.end_value != INFINITE_VERSION:
+        end = parse_version(affect.end_value)
+        if end is None:
+            return None
+
+    return CompiledInterval(
+        start=start,
+        start_inclusive=start_inclusive,
+        end=end,
+        end_inclusive=end_inclusive,
+        affect_id=affect.id,
+        vulner_id=affect.vulner_id,
+        name=affect.name,
+    )
+
@@ -0,0 +1,159 @@
+"""
+Модуль резидентного снимка затронутого ПО для поиска уязвимостей
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Iterable
+
+from dpss.models import SoftComponentSchema
+
+from configs.settings import MATCHER_REFRESH_INTERVAL, MATCHER_ENGINE
+from dbconnector.servicedb.models import TIMESTAMP_FORMAT
+from dbconnector.servicedb.servicedb import ServiceDB
+from matcher.index import AffectsIndex
+from matcher.vectorized import VectorizedAffectsIndex, is_numpy_available
+from models.scanner_models import MatcherStatusDTO
+
+
+@dataclass(frozen=True)
+class AffectsSnapshot:
+    """Класс неизменяемого снимка таблицы затронутого ПО"""
+
+    index: AffectsIndex
+    generation: int
+    built_at: datetime
+    build_duration: float
+    vectorized: VectorizedAffectsIndex | None = None
+
+    @property
+    def engine(self) -> AffectsIndex | VectorizedAffectsIndex:
+        """Индекс, которым выполняется пакетный поиск"""
+
+        return self.vectorized if self.vectorized is not None else self.index
+
+
+class VulnerMatcher:
+    """Класс поиска затронутого ПО по снимку в памяти процесса"""
+
+    def __init__(self, refresh_interval: float = MATCHER_REFRESH_INTERVAL, engine: str = MATCHER_ENGINE) -> None:
+        """
+        Инициализация класса
+
+        :param refresh_interval: Интервал (в секундах) проверки поколения базы уязвимостей
+        :param engine: Движок пакетного поиска: scalar или numpy
+        """
+
+        self.refresh_interval = refresh_interval
+        self.engine = engine
+        if engine == 'numpy' and not is_numpy_available():
+            logging.warning('numpy is not installed, scalar matcher engine is used')
+            self.engine = 'scalar'
+        self._snapshot: AffectsSnapshot | None = None
+        self._checked_at = 0.0
+        self._rebuild_lock = Lock()
+
+    def build_snapshot(self) -> AffectsSnapshot:
+        """
+        Метод построения снимка из базы данных
+
+        :return: Снимок затронутого ПО
+        """
+
+        started_at = time.perf_counter()
+        with ServiceDB() as service_db:
+            generation = service_db.get_vulner_db_generation()
+            index = AffectsIndex(service_db.get_all_affects())
+
+        vectorized = VectorizedAffectsIndex(index) if self.engine == 'numpy' else None
+        snapshot = AffectsSnapshot(
+            index=index,
+            generation=generation,
+            built_at=datetime.now(),
+            build_duration=time.perf_counter() - started_at,
+            vectorized=vectorized,
+        )
+        logging.info(
+            f'Affects snapshot of generation {generation} built: '
+            f'{len(index)} intervals in {snapshot.build_duration:.2f} s'
+        )
+        return snapshot
+
+    def load(self) -> AffectsSnapshot:
+        """
+        Метод построения и атомарной подмены снимка
+
+        :return: Новый снимок
+        """
+
+        with self._rebuild_lock:
+            self._snapshot = self.build_snapshot()
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def get_snapshot(self) -> AffectsSnapshot:
+        """
+        Метод получения актуального снимка.
+        Поколение базы проверяется не чаще refresh_interval, снимок перестраивается только при его смене.
+
+        :return: Снимок затронутого ПО
+        """
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load()
+
+        if time.monotonic() - self._checked_at < self.refresh_interval:
+            return snapshot
+
+        if not self._rebuild_lock.acquire(blocking=False):
+            # Снимок уже перестраивается в другом потоке, пока используется текущий.
+            return snapshot
+
+        try:
+            self._checked_at = time.monotonic()
+            with ServiceDB() as service_db:
+                generation = service_db.get_vulner_db_generation()
+            if generation != snapshot.generation:
+                self._snapshot = self.build_snapshot()
+        finally:
+            self._rebuild_lock.release()
+
+        return self._snapshot
+
+    def match(self, components: Iterable[SoftComponentSchema]) -> list[int]:
+        """
+        Метод поиска затронутого ПО среди компонентов
+
+        :param components: Компоненты ПО
+        :return: Отсортированные идентификаторы найденного затронутого ПО
+        """
+
+        return self.get_snapshot().engine.match(components)
+
+    def get_status(self) -> MatcherStatusDTO:
+        """
+        Метод получения состояния снимка
+
+        :return: Размер снимка и время его построения
+        """
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            return MatcherStatusDTO(is_loaded=False)
+
+        return MatcherStatusDTO(
+            is_loaded=True,
+            engine=self.engine,
+            generation=snapshot.generation,
+            intervals_count=len(snapshot.index),
+            packages_count=snapshot.index.packages_count,
+            built_at=snapshot.built_at.strftime(TIMESTAMP_FORMAT),
+            build_duration=snapshot.build_duration,
+        )
+
+
+vulner_matcher = VulnerMatcher()
@@ -0,0 +1,206 @@
+"""
+Модуль векторизованного сопоставления версий на NumPy
+"""
+
+from functools import lru_cache
+from typing import Iterable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from dpss.models import SoftComponentSchema
+
+from configs.settings import VECTOR_VERSION_WIDTH, VECTOR_BATCH_PAIRS, VERSION_CACHE_SIZE
+from matcher.index import AffectsIndex
+from matcher.versions import VersionKey, parse_version
+
+
+# Значение незаполненных частей версии: меньше любой части, поэтому 1.2 < 1.2.0, как в LooseVersion.
+PADDING_PART = -1
+MAX_PART = 2 ** 62
+
+
+def is_numpy_available() -> bool:
+    """Функция проверки наличия numpy"""
+
+    return np is not None
+
+
+def encode_version(version: VersionKey | None, width: int = VECTOR_VERSION_WIDTH) -> list[int] | None:
+    """
+    Функция кодирования ключа версии в строку целых чисел фиксированной ширины
+
+    :param version: Ключ версии
+    :param width: Ширина кодировки
+    :return: Закодированная версия или None, если версия содержит строковые или слишком большие части
+    """
+
+    if version is None or len(version) > width:
+        return None
+
+    encoded = []
+    for part_type, part in version:
+        if part_type != 0 or part >= MAX_PART:
+            return None
+        encoded.append(part)
+
+    return encoded + [PADDING_PART] * (width - len(encoded))
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def encode_version_string(version: str | None, width: int = VECTOR_VERSION_WIDTH) -> tuple[int, ...] | None:
+    """
+    Функция кодирования строки версии с кэшированием результата
+
+    :param version: Строка версии
+    :param width: Ширина кодировки
+    :return: Закодированная версия или None, если версию нельзя закодировать
+    """
+
+    encoded = encode_version(parse_version(version), width)
+    return tuple(encoded) if encoded is not None else None
+
+
+def compare_rows(left: 'np.ndarray', right: 'np.ndarray') -> 'np.ndarray':
+    """
+    Функция лексикографического сравнения строк закодированных версий
+
+    :param left: Левые версии, матрица (N, width)
+    :param right: Правые версии, матрица (N, width)
+    :return: Массив -1, 0 или 1 для каждой пары строк
+    """
+
+    signs = np.sign(left - right)
+    first_difference = np.argmax(signs != 0, axis=1)
+    return signs[np.arange(len(signs)), first_difference]
+
+
+class VectorizedAffectsIndex:
+    """Класс индекса затронутого ПО с пакетной проверкой версий на NumPy"""
+
+    def __init__(self, index: AffectsIndex, width: int = VECTOR_VERSION_WIDTH) -> None:
+        """
+        Инициализация индекса.
+        Интервалы, границы которых нельзя закодировать, проверяются скалярно.
+
+        :param index: Скалярный индекс затронутого ПО
+        :param width: Ширина кодировки версий
+        """
+
+        if np is None:
+            raise RuntimeError('numpy is required for the vectorized matcher engine')
+
+        self.index = index
+        self.width = width
+
+        encoded_intervals = []
+        scalar_intervals = []
+        for interval in index:
+            start = encode_version(interval.start, width)
+            end = encode_version(interval.end, width) if interval.end is not None else [PADDING_PART] * width
+            if start is None or end is None:
+                scalar_intervals.append(interval)
+                continue
+            encoded_intervals.append((interval, start, end))
+
+        encoded_intervals.sort(key=lambda item: item[0].name)
+        self._scalar_index = AffectsIndex.from_intervals(scalar_intervals)
+        self._scalar_names = {interval.name for interval in scalar_intervals}
+
+        self._package_ranges: dict[str, tuple[int, int]] = {}
+        for position, (interval, _, _) in enumerate(encoded_intervals):
+            left, _ = self._package_ranges.get(interval.name, (position, position))
+            self._package_ranges[interval.name] = (left, position + 1)
+
+        self._starts = np.array([start for _, start, _ in encoded_intervals], dtype=np.int64).reshape(-1, width)
+        self._ends = np.array([end for _, _, end in encoded_intervals], dtype=np.int64).reshape(-1, width)
+        self._start_inclusive = np.array([item[0].start_inclusive for item in encoded_intervals], dtype=bool)
+        self._end_inclusive = np.array([item[0].end_inclusive for item in encoded_intervals], dtype=bool)
+        self._end_open = np.array([item[0].end is None for item in encoded_intervals], dtype=bool)
+        self._affect_ids = np.array([item[0].affect_id for item in encoded_intervals], dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Количество интервалов в индексе"""
+
+        return len(self.index)
+
+    @property
+    def packages_count(self) -> int:
+        """Количество пакетов в индексе"""
+
+        return self.index.packages_count
+
+    def _match_encoded(self, versions: list[tuple[int, ...]], ranges: list[tuple[int, int]]) -> set[int]:
+        """
+        Метод пакетной проверки закодированных версий по интервалам их пакетов
+
+        :param versions: Закодированные версии компонентов
+        :param ranges: Диапазоны интервалов пакета каждого компонента
+        :return: Идентификаторы найденного затронутого ПО
+        """
+
+        lefts = np.array([left for left, _ in ranges], dtype=np.int64)
+        counts = np.array([right - left for left, right in ranges], dtype=np.int64)
+        total = int(counts.sum())
+        if not total:
+            return set()
+
+        offsets = np.cumsum(counts) - counts
+        pair_components = np.repeat(np.arange(len(versions)), counts)
+        pair_intervals = np.arange(total) - np.repeat(offsets - lefts, counts)
+
+        pair_versions = np.array(versions, dtype=np.int64)[pair_components]
+        start_comparison = compare_rows(pair_versions, self._starts[pair_intervals])
+        end_comparison = compare_rows(pair_versions, self._ends[pair_intervals])
+
+        is_vulnerable = (
+            (start_comparison > 0) | ((start_comparison == 0) & self._start_inclusive[pair_intervals])
+        ) & (
+            self._end_open[pair_intervals]
+            | (end_comparison < 0)
+            | ((end_comparison == 0) & self._end_inclusive[pair_intervals])
+        )
+
+        return set(self._affect_ids[pair_intervals[is_vulnerable]].tolist())
+
+    def match(self, components: Iterable[SoftComponentSchema]) -> list[int]:
+        """
+        Метод поиска затронутого ПО среди компонентов
+
+        :param components: Компоненты ПО
+        :return: Отсортированные идентификаторы найденного затронутого ПО
+        """
+
+        result = set()
+        scalar_components = []
+        versions, ranges, pairs_count = [], [], 0
+        for component in components:
+            if component.name in self._scalar_names:
+                result.update(
+                    interval.affect_id
+                    for interval in self._scalar_index.match_component(component.name, component.version)
+                )
+
+            package_range = self._package_ranges.get(component.name)
+            if package_range is None:
+                continue
+
+            encoded_version = encode_version_string(component.version, self.width)
+            if encoded_version is None:
+                scalar_components.append(component)
+                continue
+
+            versions.append(encoded_version)
+            ranges.append(package_range)
+            pairs_count += package_range[1] - package_range[0]
+            if pairs_count >= VECTOR_BATCH_PAIRS:
+                result.update(self._match_encoded(versions, ranges))
+                versions, ranges, pairs_count = [], [], 0
+
+        if versions:
+            result.update(self._match_encoded(versions, ranges))
+
+        result.update(self.index.match(scalar_components))
+        return sorted(result)
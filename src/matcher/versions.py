@@ -0,0 +1,102 @@
+"""
+Модуль разбора и сравнения версий пакетов
+"""
+
+import logging
+from functools import lru_cache
+from threading import Lock
+
+from looseversion import LooseVersion
+
+from configs.settings import VERSION_CACHE_SIZE, UNPROCESSABLE_VERSIONS_LIMIT
+
+
+VersionKey = tuple[tuple[int, int | str], ...]
+
+
+class UnprocessableVersions:
+    """Класс учета версий, которые не удалось разобрать или сравнить"""
+
+    def __init__(self, limit: int = UNPROCESSABLE_VERSIONS_LIMIT) -> None:
+        """
+        Инициализация класса
+
+        :param limit: Максимальное количество запоминаемых версий
+        """
+
+        self.limit = limit
+        self._versions: dict[str, str] = {}
+        self._lock = Lock()
+
+    def __contains__(self, version: str) -> bool:
+        return version in self._versions
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def add(self, version: str, reason: str) -> None:
+        """
+        Метод регистрации неразбираемой версии, в лог версия пишется один раз
+
+        :param version: Строка версии
+        :param reason: Причина, по которой версию не удалось обработать
+        """
+
+        if version in self._versions:
+            return
+
+        with self._lock:
+            if version in self._versions or len(self._versions) >= self.limit:
+                return
+            self._versions[version] = reason
+
+        logging.warning(f'Unprocessable version {version!r}: {reason}')
+
+    def items(self) -> list[tuple[str, str]]:
+        """Метод получения зарегистрированных версий и причин"""
+
+        return list(self._versions.items())
+
+
+unprocessable_versions = UnprocessableVersions()
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def parse_version(version: str | None) -> VersionKey | None:
+    """
+    Функция разбора версии в ключ сравнения
+
+    Части версии разбираются как в LooseVersion, числовые и строковые части
+    помечаются типом, поэтому ключи упорядочены полностью.
+
+    :param version: Строка версии
+    :return: Ключ версии или None, если версию разобрать нельзя
+    """
+
+    if not version:
+        unprocessable_versions.add(str(version), 'empty version')
+        return None
+
+    return tuple(
+        (0, part) if isinstance(part, int) else (1, part)
+        for part in LooseVersion(version).version
+    )
+
+
+def compare_versions(left: VersionKey, right: VersionKey) -> int | None:
+    """
+    Функция сравнения ключей версий
+
+    :param left: Ключ левой версии
+    :param right: Ключ правой версии
+    :return: -1, 0 или 1, либо None, если версии несравнимы
+    """
+
+    for left_part, right_part in zip(left, right):
+        if left_part == right_part:
+            continue
+        if left_part[0] != right_part[0]:
+            return None
+        return -1 if left_part < right_part else 1
+
+    return (len(left) > len(right)) - (len(left) < len(right))
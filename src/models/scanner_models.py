@@ -1,3 +1,5 @@
+from enum import Enum
+
 from pydantic import BaseModel
 
 class ProjectConfigAddDTO(BaseModel):
@@ -80,9 +82,25 @@ class VulnerBasicGetDTO(BaseModel):
     score: float | None = None
     severity: str | None = None
 
+class VulnersSortField(str, Enum):
+    global_identifier = 'global_identifier'
+    score = 'score'
+
+class SortOrder(str, Enum):
+    asc = 'asc'
+    desc = 'desc'
+
+class VulnersQueryDTO(BaseModel):
+    sort_by: VulnersSortField = VulnersSortField.global_identifier
+    order: SortOrder = SortOrder.desc
+    severity: list[str] | None = None
+    min_score: float | None = None
+    max_score: float | None = None
+
 class VulnersBasicsGetDTO(BaseModel):
     vulners: list['VulnerBasicGetDTO']
     count: int
+    next_cursor: str | None = None
 
 class ReportProjectDTO(BaseModel):
     id: int
@@ -99,6 +117,7 @@ class ProjectVulnersGetDTO(BaseModel):
 class ReportAddDTO(BaseModel):
     scan_config_id: int
     projects: list['AffectedProjectDTO'] | None
+    scanned_projects: list['ScannedProjectDTO'] | None = None
 
 class ReportGetDTO(BaseModel):
     id: int
@@ -112,6 +131,7 @@ class ReportAffectDTO(BaseModel):
 
 class ReportProjectAffectsDTO(BaseModel):
     project: ProjectConfigGetDTO
+    is_reused: bool = False
     affects: list['ReportAffectDTO']
 
 class ReportFullDTO(ReportGetDTO):
@@ -120,3 +140,110 @@ class ReportFullDTO(ReportGetDTO):
 
 class AddItemResponseDTO(BaseModel):
     created_item_id: int
+
+class DBPoolStatusDTO(BaseModel):
+    pool_class: str
+    size: int | None = None
+    checked_in: int | None = None
+    checked_out: int | None = None
+    overflow: int | None = None
+    status: str
+
+class ResponseCacheStatusDTO(BaseModel):
+    generation: int | None = None
+    size: int
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+
+class MatcherStatusDTO(BaseModel):
+    is_loaded: bool
+    engine: str | None = None
+    generation: int | None = None
+    intervals_count: int = 0
+    packages_count: int = 0
+    built_at: str | None = None
+    build_duration: float | None = None
+
+class ComponentDTO(BaseModel):
+    name: str
+    version: str | None = None
+    purl: str | None = None
+
+class MatchedAffectDTO(BaseModel):
+    component: 'ComponentDTO'
+    affected: 'AffectedGetDTO'
+    vulner: 'VulnerBasicGetDTO'
+
+class ScanJobStatus(str, Enum):
+    queued = 'queued'
+    running = 'running'
+    done = 'done'
+    failed = 'failed'
+
+class ScanJobGetDTO(BaseModel):
+    id: int
+    scan_config_id: int
+    status: ScanJobStatus
+    stage: str | None = None
+    projects_count: int = 0
+    projects_done: int = 0
+    stages_durations: dict[str, float] | None = None
+    created_at: str | None = None
+    started_at: str | None = None
+    finished_at: str | None = None
+    error: str | None = None
+    report_id: int | None = None
+
+class ScannedProjectDTO(BaseModel):
+    project_config_id: int
+    is_reused: bool = False
+
+class ProjectScanStateDTO(BaseModel):
+    project_config_id: int
+    requirements_hash: str
+    sbom_hash: str | None = None
+    vulner_db_generation: int
+    affected_ids: list[int]
+
+class ReportSnapshotDTO(BaseModel):
+    report_id: int
+    encoding: str
+    content: bytes
+    vulner_db_generation: int
+
+class ReportFindingDTO(BaseModel):
+    project_config_id: int
+    project_name: str | None = None
+    affected_id: int
+    package_name: str
+    package_type: str
+    start_condition: str
+    start_value: str
+    end_value: str
+    end_condition: str
+    vulner_id: str
+    vulner_identifier: str | None = None
+    severity: str | None = None
+    score: float | None = None
+
+class VulnersSearchQueryDTO(BaseModel):
+    query: str | None = None
+    severity: list[str] | None = None
+    source: list[str] | None = None
+    package_type: list[str] | None = None
+
+class VulnersSearchDTO(BaseModel):
+    vulners: list['VulnerBasicGetDTO']
+    count: int
+    facets: dict[str, dict[str, int]]
+
+class PackageQueryDTO(BaseModel):
+    name: str
+    type: str
+    version: str
+
+class PackageVulnersDTO(BaseModel):
+    package: 'PackageQueryDTO'
+    vulners: list['VulnerBasicGetDTO']
@@ -0,0 +1,140 @@
+"""
+Модуль быстрой сериализации ответов маршрутов
+"""
+
+import functools
+import inspect
+import typing
+from typing import Any, Callable
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+from configs.settings import FAST_RESPONSE_ENABLED
+
+
+FAST_RESPONSE_ATTRIBUTE = '__fast_response__'
+# Признак уже обернутого обработчика: при подключении роутера маршруты создаются заново.
+FAST_RESPONSE_WRAPPED_ATTRIBUTE = '__fast_response_wrapped__'
+
+
+class SerializedJSONResponse(Response):
+    """Класс ответа с уже сериализованным JSON"""
+
+    media_type = 'application/json'
+
+
+def skip_fast_response(endpoint: Callable) -> Callable:
+    """
+    Декоратор отключения быстрой сериализации для маршрута.
+    Применяется под декоратором маршрута, который сам возвращает готовый Response:
+    модель ответа такого маршрута нужна только для схемы OpenAPI.
+
+    :param endpoint: Обработчик маршрута
+    :return: Тот же обработчик
+    """
+
+    setattr(endpoint, FAST_RESPONSE_ATTRIBUTE, False)
+    return endpoint
+
+
+def get_exact_type_checker(response_model: Any) -> Callable[[Any], bool] | None:
+    """
+    Функция получения проверки, что значение уже имеет точный тип модели ответа
+
+    :param response_model: Модель ответа маршрута
+    :return: Функция проверки или None, если для модели быстрый путь не поддерживается
+    """
+
+    if inspect.isclass(response_model) and issubclass(response_model, BaseModel):
+        return lambda value: type(value) is response_model
+
+    if typing.get_origin(response_model) is list:
+        (item_model,) = typing.get_args(response_model)
+        if inspect.isclass(item_model) and issubclass(item_model, BaseModel):
+            return lambda value: isinstance(value, list) and all(type(item) is item_model for item in value)
+
+    return None
+
+
+def wrap_endpoint(
+        endpoint: Callable,
+        response_model: Any,
+        is_exact_type: Callable[[Any], bool],
+        status_code: int | None,
+) -> Callable:
+    """
+    Функция оборачивания обработчика: ответ точного типа сериализуется сразу, без повторной валидации
+
+    :param endpoint: Обработчик маршрута
+    :param response_model: Модель ответа маршрута
+    :param is_exact_type: Проверка точного типа ответа
+    :param status_code: Код ответа маршрута
+    :return: Обернутый обработчик с той же сигнатурой
+    """
+
+    adapter = TypeAdapter(response_model)
+
+    def make_response(value: Any) -> Any:
+        if not is_exact_type(value):
+            return value
+
+        return SerializedJSONResponse(content=adapter.dump_json(value, by_alias=True), status_code=status_code or 200)
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_endpoint(*args, **kwargs):
+            return make_response(await endpoint(*args, **kwargs))
+
+        setattr(async_endpoint, FAST_RESPONSE_WRAPPED_ATTRIBUTE, True)
+        return async_endpoint
+
+    @functools.wraps(endpoint)
+    def sync_endpoint(*args, **kwargs):
+        return make_response(endpoint(*args, **kwargs))
+
+    setattr(sync_endpoint, FAST_RESPONSE_WRAPPED_ATTRIBUTE, True)
+    return sync_endpoint
+
+
+class FastResponseRoute(APIRoute):
+    """
+    Класс маршрута с быстрой сериализацией ответа.
+    Если обработчик вернул DTO точного типа response_model, ответ сериализуется pydantic-core
+    без повторной валидации, иначе ответ проверяется FastAPI и отдается через ORJSONResponse.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        """
+        Инициализация маршрута
+
+        :param path: Путь маршрута
+        :param endpoint: Обработчик маршрута
+        :param kwargs: Параметры маршрута APIRoute
+        """
+
+        response_model = kwargs.get('response_model')
+        is_default_serialization = not any(
+            kwargs.get(option)
+            for option in (
+                'response_model_include',
+                'response_model_exclude',
+                'response_model_exclude_unset',
+                'response_model_exclude_defaults',
+                'response_model_exclude_none',
+            )
+        ) and kwargs.get('response_model_by_alias', True)
+
+        if (
+                FAST_RESPONSE_ENABLED
+                and getattr(endpoint, FAST_RESPONSE_ATTRIBUTE, True)
+                and not getattr(endpoint, FAST_RESPONSE_WRAPPED_ATTRIBUTE, False)
+                and not isinstance(response_model, DefaultPlaceholder)
+                and is_default_serialization
+                and (is_exact_type := get_exact_type_checker(response_model))
+        ):
+            endpoint = wrap_endpoint(endpoint, response_model, is_exact_type, kwargs.get('status_code'))
+
+        super().__init__(path, endpoint, **kwargs)
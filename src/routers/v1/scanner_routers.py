@@ -3,13 +3,21 @@
 """
 import logging
 
+import ijson
 from fastapi import (
     APIRouter,
+    Body,
     Depends,
+    HTTPException,
+    Query,
+    Request,
 )
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 
 from dpss.models import ScanConfigSchema, ReportModelSchema
 
+from configs.settings import PACKAGE_LOOKUP_BATCH_LIMIT
 from models.scanner_models import (
     ScanConfigGetDTO,
     ReportFullDTO,
@@ -21,26 +29,44 @@ from models.scanner_models import (
     ProjectConfigGetDTO,
     ProjectConfigAddDTO,
     VulnerBasicGetDTO,
+    MatcherStatusDTO,
+    DBPoolStatusDTO,
+    ResponseCacheStatusDTO,
+    ScanJobGetDTO,
+    VulnersQueryDTO,
+    VulnersSortField,
+    SortOrder,
+    VulnersSearchQueryDTO,
+    VulnersSearchDTO,
+    PackageQueryDTO,
+    PackageVulnersDTO,
 )
+from dbconnector.servicedb.pagination import InvalidCursorError
+from matcher.components import StreamReader, iter_stream_components
+from routers.fast_response import FastResponseRoute, skip_fast_response
+from services.report_snapshots import get_snapshot_body
+from services.response_cache import make_cached_response
+from services.async_scanner_service import AsyncScannerService
 from services.scanner_service import ScannerService
+from services.scan_jobs import ScanJobService, ScanJobQueueFullError
 from schemas.pydantic.scanner_schemas import (
     CreateScanConfigSchema,
     UpdateScanConfigSchema,
 )
 
-scanner_router = APIRouter(prefix="/v1/scan", tags=["scan_configs"])
+scanner_router = APIRouter(prefix="/v1/scan", tags=["scan_configs"], route_class=FastResponseRoute)
 """
 Эндпоинты для управления задачами
 """
 
 
 @scanner_router.get(path='/confs/id/{item_id}', response_model=ScanConfigGetDTO)
-def get_scan_config_by_id(item_id: int, scanner_service: ScannerService = Depends()):
-    return scanner_service.get_config(item_id)
+async def get_scan_config_by_id(item_id: int, scanner_service: AsyncScannerService = Depends()):
+    return await scanner_service.get_config(item_id)
 
 @scanner_router.get(path='/projects/{item_id}', response_model=ProjectConfigGetDTO)
-def get_scan_config_by_id(item_id: int, scanner_service: ScannerService = Depends()):
-    return scanner_service.get_project_config(item_id)
+async def get_scan_config_by_id(item_id: int, scanner_service: AsyncScannerService = Depends()):
+    return await scanner_service.get_project_config(item_id)
 
 
 # @scanner_router.get(path='/confs/name/{name}', response_model=ScanConfigSchema)
@@ -69,8 +95,8 @@ def make_new_scan_config(
 
 
 @scanner_router.get(path='/confs/all', response_model=list[ScanConfigGetDTO])
-def get_all_scan_configs(scanner_service: ScannerService = Depends()):
-    return scanner_service.get_all_configs()
+async def get_all_scan_configs(scanner_service: AsyncScannerService = Depends()):
+    return await scanner_service.get_all_configs()
 
 
 @scanner_router.put(path='/confs/id/{item_id}', response_model=ScanConfigSchema)
@@ -90,20 +116,133 @@ def update_scan_config_by_id(
     return scanner_service.add_proj_config(scan_conf_schema)
 
 @scanner_router.get(path='/reports/id/{item_id}', response_model=ReportFullDTO)
-def get_report_by_id(item_id: int, scanner_service: ScannerService = Depends()):
-    return scanner_service.get_report_by_id(item_id)
+@skip_fast_response
+async def get_report_by_id(item_id: int, request: Request, scanner_service: AsyncScannerService = Depends()):
+    """Отчет отдается из сохраненного снимка без повторной сборки и валидации"""
+
+    report_snapshot = await scanner_service.get_report_snapshot(item_id)
+    content, content_encoding = get_snapshot_body(report_snapshot, request.headers.get('accept-encoding', ''))
+
+    headers = {'Vary': 'Accept-Encoding'}
+    if content_encoding:
+        headers['Content-Encoding'] = content_encoding
+    return Response(content=content, media_type='application/json', headers=headers)
+
+@scanner_router.get(path='/reports/id/{item_id}/findings', response_class=StreamingResponse)
+def export_report_findings(item_id: int, scanner_service: ScannerService = Depends()):
+    """Выгрузка найденного затронутого ПО отчета в формате NDJSON: строка на каждую пару проекта и уязвимости"""
+
+    if not scanner_service.is_report_exists(item_id):
+        raise HTTPException(status_code=404, detail=f'Отчет {item_id} не найден')
+
+    return StreamingResponse(scanner_service.iter_report_findings(item_id), media_type='application/x-ndjson')
 
 @scanner_router.get(path='/reports', response_model=list[ReportGetDTO])
-def get_reports(scanner_service: ScannerService = Depends()):
-    return scanner_service.get_reports()
+async def get_reports(scanner_service: AsyncScannerService = Depends()):
+    return await scanner_service.get_reports()
+
+@scanner_router.get(path='/vulners/search', response_model=VulnersSearchDTO)
+async def search_vulners(
+        q: str | None = Query(None, max_length=200),
+        severity: list[str] | None = Query(None),
+        source: list[str] | None = Query(None),
+        package_type: list[str] | None = Query(None),
+        page: int = Query(1, ge=1),
+        page_size: int = Query(20, ge=1, le=100),
+        scanner_service: AsyncScannerService = Depends(),
+):
+    """Поиск уязвимостей по идентификатору, описанию и именам пакетов с фасетами severity, source и package_type"""
+
+    search_query = VulnersSearchQueryDTO(query=q, severity=severity, source=source, package_type=package_type)
+    return await scanner_service.search_vulners(search_query, page, page_size)
 
 @scanner_router.get(path='/vulners/{item_id}', response_model=VulnerGetDTO)
-def get_vulner_by_id(item_id: str, scanner_service: ScannerService = Depends()):
-    return scanner_service.get_vulner_data(item_id)
+@skip_fast_response
+async def get_vulner_by_id(item_id: str, request: Request, scanner_service: AsyncScannerService = Depends()):
+    """Карточка уязвимости из кэша ответов с ETag, на If-None-Match с тем же ETag отдается 304"""
+
+    cached_response = await scanner_service.get_vulner_response(item_id)
+    return make_cached_response(cached_response, request.headers.get('if-none-match'))
 
 @scanner_router.get(path='/vulners', response_model=VulnersBasicsGetDTO)
-def get_vulners(page: int = 1, page_size: int = 20, scanner_service: ScannerService = Depends()):
-    return scanner_service.get_vulners(page, page_size)
+@skip_fast_response
+async def get_vulners(
+        request: Request,
+        page: int = Query(1, ge=1),
+        page_size: int = Query(20, ge=1, le=1000),
+        cursor: str | None = None,
+        sort_by: VulnersSortField = VulnersSortField.global_identifier,
+        order: SortOrder = SortOrder.desc,
+        severity: list[str] | None = Query(None),
+        min_score: float | None = None,
+        max_score: float | None = None,
+        scanner_service: AsyncScannerService = Depends(),
+):
+    """
+    Страница уязвимостей: по номеру страницы или по курсору next_cursor из предыдущего ответа.
+    Страница отдается из кэша ответов с ETag, на If-None-Match с тем же ETag отдается 304.
+    """
+
+    vulners_query = VulnersQueryDTO(
+        sort_by=sort_by,
+        order=order,
+        severity=severity,
+        min_score=min_score,
+        max_score=max_score,
+    )
+    try:
+        cached_response = await scanner_service.get_vulners_response(page, page_size, cursor, vulners_query)
+    except InvalidCursorError as err:
+        raise HTTPException(status_code=422, detail=str(err))
+
+    return make_cached_response(cached_response, request.headers.get('if-none-match'))
+
+@scanner_router.get(path='/packages/vulners', response_model=PackageVulnersDTO)
+async def get_package_vulners(name: str, type: str, version: str, scanner_service: AsyncScannerService = Depends()):
+    """Уязвимости версии пакета, например ?name=django&type=pypi&version=3.2.1"""
+
+    package = PackageQueryDTO(name=name, type=type, version=version)
+    (package_vulners,) = await scanner_service.find_package_vulners([package])
+    return package_vulners
+
+@scanner_router.post(path='/packages/vulners', response_model=list[PackageVulnersDTO])
+async def get_packages_vulners(
+        packages: list[PackageQueryDTO] = Body(..., max_length=PACKAGE_LOOKUP_BATCH_LIMIT),
+        scanner_service: AsyncScannerService = Depends(),
+):
+    """Пакетная проверка версий пакетов, результат в порядке запроса"""
+
+    return await scanner_service.find_package_vulners(packages)
+
+@scanner_router.get(path='/matcher', response_model=MatcherStatusDTO)
+def get_matcher_status(scanner_service: ScannerService = Depends()):
+    return scanner_service.get_matcher_status()
+
+@scanner_router.get(path='/cache/vulners', response_model=ResponseCacheStatusDTO)
+def get_vulners_cache_status():
+    """Размер кэша ответов уязвимостей процесса и счетчики попаданий и промахов"""
+
+    return AsyncScannerService.get_response_cache_status()
+
+@scanner_router.get(path='/db/pool', response_model=DBPoolStatusDTO)
+def get_db_pool_status(scanner_service: ScannerService = Depends()):
+    """Состояние пула соединений с сервисной базой данных процесса"""
+
+    return scanner_service.get_db_pool_status()
+
+@scanner_router.post(path='/match', response_class=StreamingResponse)
+async def match_components(request: Request, scanner_service: ScannerService = Depends()):
+    """
+    Поиск затронутого ПО по документу CycloneDX или списку компонентов [{"name": ..., "version": ...}].
+    Тело запроса разбирается потоково, результат отдается построчно в формате NDJSON.
+    """
+
+    try:
+        components = [component async for component in iter_stream_components(StreamReader(request.stream()))]
+    except (ijson.JSONError, ValidationError) as err:
+        raise HTTPException(status_code=422, detail=f'Некорректный документ с компонентами: {err}')
+
+    return StreamingResponse(scanner_service.iter_matches(components), media_type='application/x-ndjson')
 
 
 # @scanner_router.put(path='/confs/name/{name}', response_model=ScanConfigSchema)
@@ -123,9 +262,25 @@ def get_vulners(page: int = 1, page_size: int = 20, scanner_service: ScannerServ
 #     return scanner_service.run_scanner(scan_config=scan_conf_schema)
 
 
-@scanner_router.post(path='/run/{scan_config_id}', response_model=AddItemResponseDTO)
+@scanner_router.post(path='/run/{scan_config_id}', response_model=ScanJobGetDTO, status_code=202)
 def run_scanner_by_id(
         scan_config_id: int,
-        scanner_service: ScannerService = Depends(),
+        scan_job_service: ScanJobService = Depends(),
 ):
-    return scanner_service.run_scanner(scan_config_id=scan_config_id)
+    try:
+        return scan_job_service.submit_scan(scan_config_id=scan_config_id)
+    except ScanJobQueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail='Очередь заданий сканирования заполнена. Пожалуйста, попробуйте еще раз позже.',
+            headers={'Retry-After': '60'},
+        )
+
+
+@scanner_router.get(path='/jobs/{job_id}', response_model=ScanJobGetDTO)
+def get_scan_job(job_id: int, scan_job_service: ScanJobService = Depends()):
+    scan_job = scan_job_service.get_job(job_id)
+    if scan_job is None:
+        raise HTTPException(status_code=404, detail=f'Задание сканирования {job_id} не найдено')
+
+    return scan_job
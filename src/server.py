@@ -0,0 +1,140 @@
+"""
+Модуль запуска веб-сервера в режимах production и dev
+"""
+
+import gc
+import logging
+
+import uvicorn
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+from configs.settings import (
+    SERVER_MODE,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_LOG_LEVEL,
+    SERVER_WORKERS,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_PRELOAD,
+)
+
+
+APP_PATH = 'main:app'
+DEV_MODE = 'dev'
+PRODUCTION_MODE = 'production'
+
+
+def preload_shared_state() -> None:
+    """
+    Функция загрузки общих данных только для чтения до запуска рабочих процессов.
+    Соединения с базой закрываются, чтобы процессы не унаследовали сокеты родителя.
+    """
+
+    from dbconnector.servicedb.session import dispose_engine
+    from matcher.snapshot import vulner_matcher
+
+    try:
+        vulner_matcher.load()
+    except Exception as err:
+        logging.error(f'Affects snapshot was not preloaded: {err}')
+
+    dispose_engine()
+    # Загруженные объекты не обходятся сборщиком мусора, и страницы памяти дольше остаются общими после fork.
+    gc.freeze()
+
+
+def fail_interrupted_scan_jobs() -> None:
+    """
+    Функция отметки ошибкой заданий сканирования, прерванных прошлой остановкой сервиса.
+    Выполняется до запуска рабочих процессов, соединения с базой закрываются.
+    """
+
+    from dbconnector.servicedb.session import dispose_engine
+    from services import scan_jobs
+
+    scan_jobs.fail_interrupted_scan_jobs()
+    dispose_engine()
+
+
+def run_dev_server() -> None:
+    """Функция запуска одного процесса с перезагрузкой при изменении кода"""
+
+    uvicorn.run(
+        app=APP_PATH,
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        reload=True,
+        log_level=SERVER_LOG_LEVEL,
+        workers=1,
+    )
+
+
+def run_production_server() -> None:
+    """Функция запуска нескольких рабочих процессов uvicorn на uvloop и httptools"""
+
+    uvicorn.run(
+        app=APP_PATH,
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        reload=False,
+        log_level=SERVER_LOG_LEVEL,
+        workers=SERVER_WORKERS,
+        loop='uvloop',
+        http='httptools',
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT,
+    )
+
+
+def run_preloaded_server() -> None:
+    """Функция запуска рабочих процессов gunicorn с загрузкой приложения и снимка до fork"""
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f'{SERVER_HOST}:{SERVER_PORT}',
+                'workers': SERVER_WORKERS,
+                'worker_class': 'uvicorn.workers.UvicornWorker',
+                'preload_app': True,
+                'graceful_timeout': SERVER_GRACEFUL_TIMEOUT,
+                'loglevel': SERVER_LOG_LEVEL,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+
+            preload_shared_state()
+            return app
+
+    PreloadedApplication().run()
+
+
+def run_server(mode: str = SERVER_MODE) -> None:
+    """
+    Функция запуска веб-сервера
+
+    :param mode: Режим запуска: production или dev
+    """
+
+    # Очереди заданий в памяти процессов, поэтому после перезапуска незавершенные задания не продолжатся.
+    fail_interrupted_scan_jobs()
+
+    if mode == DEV_MODE:
+        run_dev_server()
+        return
+
+    if mode != PRODUCTION_MODE:
+        raise ValueError(f'Unknown server mode {mode}')
+
+    if SERVER_PRELOAD and BaseApplication is None:
+        logging.warning('gunicorn is not installed, workers are started without preloading')
+    elif SERVER_PRELOAD:
+        run_preloaded_server()
+        return
+
+    run_production_server()
@@ -0,0 +1,146 @@
+"""
+Модуль асинхронного сервиса чтения конфигураций, отчетов и уязвимостей
+"""
+
+from typing import Annotated
+
+import orjson
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dbconnector.servicedb.async_servicedb import AsyncServiceDB
+from dbconnector.servicedb.session import get_async_db_session
+from services.report_snapshots import make_report_snapshot
+from services.response_cache import CachedResponse, vulners_response_cache
+from models.scanner_models import (
+    ScanConfigGetDTO,
+    ProjectConfigGetDTO,
+    ReportGetDTO,
+    ReportSnapshotDTO,
+    VulnerGetDTO,
+    VulnersBasicsGetDTO,
+    VulnersQueryDTO,
+    VulnersSearchQueryDTO,
+    VulnersSearchDTO,
+    PackageQueryDTO,
+    PackageVulnersDTO,
+    ResponseCacheStatusDTO,
+)
+
+
+class AsyncScannerService:
+    """
+    Класс асинхронного чтения данных сервиса сканера.
+    Используется маршрутами чтения, сканирование и запись выполняются синхронным ScannerService.
+    """
+
+    def __init__(self, session: Annotated[AsyncSession, Depends(get_async_db_session)]) -> None:
+        """
+        Инициализация
+
+        :param session: Асинхронная сессия запроса
+        """
+
+        self.service_db = AsyncServiceDB(session)
+
+    async def get_config(self, config_id: int) -> ScanConfigGetDTO:
+        return await self.service_db.get_scan_config(config_id)
+
+    async def get_project_config(self, config_id: int) -> ProjectConfigGetDTO:
+        return await self.service_db.get_project_config(config_id)
+
+    async def get_all_configs(self) -> list[ScanConfigGetDTO]:
+        return await self.service_db.get_all_scan_configs()
+
+    async def get_reports(self) -> list[ReportGetDTO]:
+        return await self.service_db.get_all_reports()
+
+    async def get_report_snapshot(self, report_id: int) -> ReportSnapshotDTO:
+        """
+        Метод получения снимка отчета.
+        Снимок старого отчета или снимок прежнего поколения базы уязвимостей строится при чтении.
+
+        :param report_id: Идентификатор отчета
+        :return: Снимок отчета
+        """
+
+        report_snapshot = await self.service_db.get_report_snapshot(report_id)
+        if report_snapshot is not None:
+            return report_snapshot
+
+        # Поколение читается до отчета, как в ScannerService.build_report_snapshot.
+        generation = await self.service_db.get_vulner_db_generation()
+        report_snapshot = make_report_snapshot(await self.service_db.get_report(report_id), generation)
+        await self.service_db.save_report_snapshot(report_snapshot)
+        return report_snapshot
+
+    async def get_vulner_data(self, vulner_id: str) -> VulnerGetDTO:
+        return await self.service_db.get_vulner_data(vulner_id)
+
+    async def get_vulner_response(self, vulner_id: str) -> CachedResponse:
+        """
+        Метод получения сериализованной карточки уязвимости из кэша текущего поколения базы уязвимостей
+
+        :param vulner_id: Глобальный идентификатор уязвимости
+        :return: Тело ответа с ETag
+        """
+
+        key = ('vulner', vulner_id)
+        generation = await self.service_db.get_vulner_db_generation()
+        cached_response = vulners_response_cache.get(generation, key)
+        if cached_response is None:
+            vulner_data = await self.service_db.get_vulner_data(vulner_id)
+            cached_response = vulners_response_cache.set(generation, key, orjson.dumps(vulner_data.model_dump()))
+
+        return cached_response
+
+    async def get_vulners_response(
+            self,
+            page: int = 1,
+            page_size: int = 20,
+            cursor: str | None = None,
+            vulners_query: VulnersQueryDTO | None = None,
+    ) -> CachedResponse:
+        """
+        Метод получения сериализованной страницы уязвимостей из кэша текущего поколения базы уязвимостей
+
+        :param page: Номер страницы, не используется при переданном курсоре
+        :param page_size: Размер страницы
+        :param cursor: Курсор следующей страницы из предыдущего ответа
+        :param vulners_query: Сортировка и фильтры
+        :return: Тело ответа с ETag
+        """
+
+        vulners_query = vulners_query or VulnersQueryDTO()
+        key = ('vulners', page, page_size, cursor, vulners_query.model_dump_json())
+        generation = await self.service_db.get_vulner_db_generation()
+        cached_response = vulners_response_cache.get(generation, key)
+        if cached_response is None:
+            vulners_data = await self.service_db.get_vulners(page, page_size, cursor, vulners_query)
+            cached_response = vulners_response_cache.set(generation, key, orjson.dumps(vulners_data.model_dump()))
+
+        return cached_response
+
+    @staticmethod
+    def get_response_cache_status() -> ResponseCacheStatusDTO:
+        return vulners_response_cache.get_status()
+
+    async def get_vulners(
+            self,
+            page: int = 1,
+            page_size: int = 20,
+            cursor: str | None = None,
+            vulners_query: VulnersQueryDTO | None = None,
+    ) -> VulnersBasicsGetDTO:
+        return await self.service_db.get_vulners(page, page_size, cursor, vulners_query)
+
+    async def search_vulners(
+            self,
+            search_query: VulnersSearchQueryDTO,
+            page: int = 1,
+            page_size: int = 20,
+    ) -> VulnersSearchDTO:
+        return await self.service_db.search_vulners(search_query, page, page_size)
+
+    async def find_package_vulners(self, packages: list[PackageQueryDTO]) -> list[PackageVulnersDTO]:
+        return await self.service_db.find_package_vulners(packages)
@@ -0,0 +1,44 @@
+"""
+Модуль общих пулов исполнителей сервиса
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+from configs.settings import SCAN_SBOM_PROCESSES
+
+
+_sbom_process_pool: ProcessPoolExecutor | None = None
+_sbom_process_pool_lock = Lock()
+
+
+def get_sbom_process_pool() -> ProcessPoolExecutor:
+    """
+    Функция получения общего пула процессов генерации SBOM.
+    Пул один на процесс сервиса, поэтому одновременные сканирования делят SCAN_SBOM_PROCESSES процессов.
+
+    :return: Пул процессов
+    """
+
+    global _sbom_process_pool
+
+    with _sbom_process_pool_lock:
+        if _sbom_process_pool is None:
+            _sbom_process_pool = ProcessPoolExecutor(
+                max_workers=SCAN_SBOM_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+
+    return _sbom_process_pool
+
+
+def shutdown_executors() -> None:
+    """Функция остановки общих пулов исполнителей"""
+
+    global _sbom_process_pool
+
+    with _sbom_process_pool_lock:
+        if _sbom_process_pool is not None:
+            _sbom_process_pool.shutdown(wait=True, cancel_futures=True)
+            _sbom_process_pool = None
@@ -0,0 +1,140 @@
+"""
+Модуль сериализации и сжатия снимков отчетов
+"""
+
+import gzip
+import logging
+
+import orjson
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from configs.settings import REPORT_SNAPSHOT_ENCODING
+from models.scanner_models import ReportFullDTO, ReportSnapshotDTO
+
+
+IDENTITY_ENCODING = 'identity'
+GZIP_ENCODING = 'gzip'
+ZSTD_ENCODING = 'zstd'
+
+
+def get_snapshot_encoding(encoding: str = REPORT_SNAPSHOT_ENCODING) -> str:
+    """
+    Функция получения доступного способа сжатия снимков
+
+    :param encoding: Способ сжатия из настроек
+    :return: Способ сжатия, который можно использовать
+    """
+
+    if encoding == ZSTD_ENCODING and zstandard is None:
+        logging.warning('zstandard is not installed, report snapshots are compressed with gzip')
+        return GZIP_ENCODING
+
+    if encoding not in (IDENTITY_ENCODING, GZIP_ENCODING, ZSTD_ENCODING):
+        logging.warning(f'Unknown report snapshot encoding {encoding}, snapshots are not compressed')
+        return IDENTITY_ENCODING
+
+    return encoding
+
+
+def encode_content(content: bytes, encoding: str) -> bytes:
+    """
+    Функция сжатия содержимого
+
+    :param content: Исходное содержимое
+    :param encoding: Способ сжатия
+    :return: Сжатое содержимое
+    """
+
+    if encoding == GZIP_ENCODING:
+        return gzip.compress(content, compresslevel=6)
+
+    if encoding == ZSTD_ENCODING:
+        return zstandard.ZstdCompressor().compress(content)
+
+    return content
+
+
+def decode_content(content: bytes, encoding: str) -> bytes:
+    """
+    Функция распаковки содержимого
+
+    :param content: Сжатое содержимое
+    :param encoding: Способ сжатия
+    :return: Исходное содержимое
+    """
+
+    if encoding == GZIP_ENCODING:
+        return gzip.decompress(content)
+
+    if encoding == ZSTD_ENCODING:
+        return zstandard.ZstdDecompressor().decompress(content)
+
+    return content
+
+
+def make_report_snapshot(report: ReportFullDTO, generation: int, encoding: str | None = None) -> ReportSnapshotDTO:
+    """
+    Функция сериализации отчета в компактный JSON
+
+    :param report: Полный отчет
+    :param generation: Поколение базы уязвимостей, прочитанное до чтения отчета
+    :param encoding: Способ сжатия, по умолчанию из настроек
+    :return: Снимок отчета
+    """
+
+    encoding = encoding or get_snapshot_encoding()
+    return ReportSnapshotDTO(
+        report_id=report.id,
+        encoding=encoding,
+        content=encode_content(orjson.dumps(report.model_dump()), encoding),
+        vulner_db_generation=generation,
+    )
+
+
+def is_encoding_accepted(accept_encoding: str, encoding: str) -> bool:
+    """
+    Функция проверки, принимает ли клиент содержимое в указанном сжатии
+
+    :param accept_encoding: Значение заголовка Accept-Encoding
+    :param encoding: Способ сжатия
+    :return: Признак, что содержимое можно отдать без распаковки
+    """
+
+    if encoding == IDENTITY_ENCODING:
+        return True
+
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        if name.strip().lower() not in (encoding, '*'):
+            continue
+
+        quality = params.strip().removeprefix('q=')
+        try:
+            return not params or float(quality) > 0
+        except ValueError:
+            return False
+
+    return False
+
+
+def get_snapshot_body(report_snapshot: ReportSnapshotDTO, accept_encoding: str) -> tuple[bytes, str | None]:
+    """
+    Функция получения тела ответа из снимка.
+    Сжатое содержимое отдается как есть, если клиент принимает это сжатие, иначе распаковывается.
+
+    :param report_snapshot: Снимок отчета
+    :param accept_encoding: Значение заголовка Accept-Encoding
+    :return: Тело ответа и значение заголовка Content-Encoding
+    """
+
+    if report_snapshot.encoding == IDENTITY_ENCODING:
+        return report_snapshot.content, None
+
+    if is_encoding_accepted(accept_encoding, report_snapshot.encoding):
+        return report_snapshot.content, report_snapshot.encoding
+
+    return decode_content(report_snapshot.content, report_snapshot.encoding), None
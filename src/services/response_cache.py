@@ -0,0 +1,166 @@
+"""
+Модуль кэша сериализованных ответов с ETag
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Hashable
+
+from fastapi.responses import Response
+
+from configs.settings import VULNERS_RESPONSE_CACHE_SIZE, VULNERS_RESPONSE_CACHE_TTL
+from models.scanner_models import ResponseCacheStatusDTO
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    content: bytes
+    etag: str
+    expires_at: float
+
+
+def make_etag(content: bytes) -> str:
+    """
+    Функция получения сильного ETag по содержимому ответа
+
+    :param content: Тело ответа
+    :return: Значение заголовка ETag
+    """
+
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def is_etag_matched(etag: str, if_none_match: str | None) -> bool:
+    """
+    Функция проверки условия If-None-Match, ответ 304 отдается при совпадении
+
+    :param etag: ETag текущего ответа
+    :param if_none_match: Значение заголовка If-None-Match
+    :return: Признак, что у клиента актуальная версия ответа
+    """
+
+    if not if_none_match:
+        return False
+
+    for item in if_none_match.split(','):
+        item = item.strip()
+        # Для If-None-Match теги сравниваются без учета признака слабого тега.
+        if item == '*' or item.removeprefix('W/') == etag:
+            return True
+
+    return False
+
+
+def make_cached_response(cached_response: CachedResponse, if_none_match: str | None) -> Response:
+    """
+    Функция получения ответа из кэша: 304 без тела, если у клиента та же версия
+
+    :param cached_response: Ответ из кэша
+    :param if_none_match: Значение заголовка If-None-Match
+    :return: Ответ
+    """
+
+    # Клиент должен проверять актуальность ответа при каждом запросе, данные меняются при импорте.
+    headers = {'ETag': cached_response.etag, 'Cache-Control': 'no-cache'}
+    if is_etag_matched(cached_response.etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=cached_response.content, media_type='application/json', headers=headers)
+
+
+class ResponseCache:
+    """
+    Класс LRU-кэша сериализованных ответов с ограниченным временем жизни.
+    Ответы хранятся в пределах поколения базы уязвимостей и сбрасываются при его смене.
+    """
+
+    def __init__(self, max_size: int = VULNERS_RESPONSE_CACHE_SIZE, ttl: float = VULNERS_RESPONSE_CACHE_TTL) -> None:
+        """
+        Инициализация класса
+
+        :param max_size: Максимальное количество ответов в кэше
+        :param ttl: Время жизни (в секундах) ответа в кэше
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._generation: int | None = None
+        self._responses: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, generation: int, key: Hashable) -> CachedResponse | None:
+        """
+        Метод получения ответа
+
+        :param generation: Текущее поколение базы уязвимостей
+        :param key: Ключ ответа
+        :return: Ответ или None, если его нет в кэше или срок его жизни истек
+        """
+
+        with self._lock:
+            if generation != self._generation:
+                self._generation = generation
+                self._responses.clear()
+
+            cached_response = self._responses.get(key)
+            if cached_response is None or cached_response.expires_at <= time.monotonic():
+                self.misses += 1
+                return None
+
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return cached_response
+
+    def set(self, generation: int, key: Hashable, content: bytes) -> CachedResponse:
+        """
+        Метод сохранения ответа
+
+        :param generation: Поколение базы уязвимостей, по данным которого построен ответ
+        :param key: Ключ ответа
+        :param content: Тело ответа
+        :return: Сохраненный ответ с ETag
+        """
+
+        cached_response = CachedResponse(content=content, etag=make_etag(content), expires_at=time.monotonic() + self.ttl)
+        with self._lock:
+            # Ответ по данным прежнего поколения не сохраняется.
+            if generation != self._generation:
+                return cached_response
+
+            self._responses[key] = cached_response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+        return cached_response
+
+    def get_status(self) -> ResponseCacheStatusDTO:
+        """
+        Метод получения состояния кэша
+
+        :return: Размер кэша и счетчики попаданий и промахов
+        """
+
+        with self._lock:
+            return ResponseCacheStatusDTO(
+                generation=self._generation,
+                size=len(self._responses),
+                max_size=self.max_size,
+                ttl=self.ttl,
+                hits=self.hits,
+                misses=self.misses,
+            )
+
+    def clear(self) -> None:
+        """Метод очистки кэша"""
+
+        with self._lock:
+            self._responses.clear()
+
+
+vulners_response_cache = ResponseCache()
@@ -0,0 +1,273 @@
+"""
+Модуль фонового выполнения заданий сканирования
+"""
+
+import logging
+import time
+from datetime import datetime
+from queue import Queue, Full, Empty
+from threading import Thread, Event, Lock
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from configs.settings import SCAN_JOB_WORKERS, SCAN_JOB_QUEUE_SIZE, SCAN_JOB_STOP_TIMEOUT
+from dbconnector.servicedb.models import TIMESTAMP_FORMAT
+from dbconnector.servicedb.servicedb import ServiceDB
+from dbconnector.servicedb.session import get_db_session
+from models.scanner_models import ScanJobGetDTO, ScanJobStatus
+from services.scan_progress import ScanProgress
+from services.scanner_service import ScannerService
+
+
+# Причины ошибки заданий, прерванных остановкой сервиса.
+STOPPED_BEFORE_START_ERROR = 'Service was stopped before the scan job started'
+STOPPED_DURING_SCAN_ERROR = 'Service was stopped during the scan job'
+INTERRUPTED_ERROR = 'Scan job was interrupted by a service restart'
+
+
+class ScanJobQueueFullError(Exception):
+    """Очередь заданий сканирования заполнена"""
+
+
+class ScanJobProgress(ScanProgress):
+    """Класс отслеживания хода сканирования с сохранением в задание"""
+
+    def __init__(self, job_id: int) -> None:
+        """
+        Инициализация
+
+        :param job_id: Идентификатор задания сканирования
+        """
+
+        super().__init__()
+        self.job_id = job_id
+
+    def on_change(self) -> None:
+        """Метод сохранения хода сканирования в задание"""
+
+        with ServiceDB() as service_db:
+            service_db.update_scan_job(self.job_id, **self.get_state())
+
+
+class ScanJobQueue:
+    """
+    Класс ограниченной очереди заданий сканирования с пулом фоновых потоков.
+    Очередь своя у каждого рабочего процесса сервиса: ограничение размера действует в пределах процесса.
+    """
+
+    def __init__(self, workers_count: int = SCAN_JOB_WORKERS, queue_size: int = SCAN_JOB_QUEUE_SIZE) -> None:
+        """
+        Инициализация
+
+        :param workers_count: Количество фоновых потоков
+        :param queue_size: Максимальное количество ожидающих заданий
+        """
+
+        self.workers_count = workers_count
+        self._queue: Queue[tuple[int, int]] = Queue(maxsize=queue_size)
+        self._stop_event = Event()
+        self._workers: list[Thread] = []
+        self._running_job_ids: set[int] = set()
+        self._running_lock = Lock()
+
+    @property
+    def depth(self) -> int:
+        """Количество ожидающих заданий"""
+
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Метод запуска фоновых потоков"""
+
+        self._stop_event.clear()
+        for number in range(self.workers_count - len(self._workers)):
+            worker = Thread(target=self._work, name=f'scan-job-worker-{number}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: float = SCAN_JOB_STOP_TIMEOUT) -> None:
+        """
+        Метод остановки фоновых потоков.
+        Текущие задания ожидаются не дольше timeout, ожидающие и незавершенные задания отмечаются ошибкой:
+        фоновые потоки не задерживают завершение процесса и прерываются вместе с ним.
+
+        :param timeout: Общее время ожидания завершения потоков
+        """
+
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(max(deadline - time.monotonic(), 0))
+        self._workers = []
+
+        queued_job_ids = []
+        while True:
+            try:
+                job_id, _ = self._queue.get_nowait()
+            except Empty:
+                break
+            queued_job_ids.append(job_id)
+            self._queue.task_done()
+
+        with self._running_lock:
+            running_job_ids = list(self._running_job_ids)
+
+        if not queued_job_ids and not running_job_ids:
+            return
+
+        logging.warning(
+            f'Scan job queue was stopped with {len(queued_job_ids)} queued and {len(running_job_ids)} running jobs'
+        )
+        try:
+            with ServiceDB() as service_db:
+                if queued_job_ids:
+                    service_db.fail_scan_jobs(STOPPED_BEFORE_START_ERROR, queued_job_ids)
+                if running_job_ids:
+                    service_db.fail_scan_jobs(STOPPED_DURING_SCAN_ERROR, running_job_ids)
+        except Exception as err:
+            # Задания будут отмечены при следующем запуске сервиса.
+            logging.error(f'Stopped scan jobs were not marked as failed: {err}')
+
+    def submit(self, scan_config_id: int) -> ScanJobGetDTO:
+        """
+        Метод постановки задания сканирования в очередь
+
+        :param scan_config_id: Идентификатор конфигурации сканирования
+        :return: Созданное задание
+        """
+
+        if self._queue.full():
+            raise ScanJobQueueFullError(f'Scan job queue is full ({self._queue.maxsize} jobs)')
+
+        with ServiceDB() as service_db:
+            scan_job = service_db.add_scan_job(scan_config_id)
+
+            try:
+                self._queue.put_nowait((scan_job.id, scan_config_id))
+            except Full:
+                service_db.update_scan_job(
+                    scan_job.id,
+                    status=ScanJobStatus.failed.value,
+                    error='Scan job queue is full',
+                    finished_at=datetime.now().strftime(TIMESTAMP_FORMAT),
+                )
+                raise ScanJobQueueFullError(f'Scan job queue is full ({self._queue.maxsize} jobs)')
+
+        return scan_job
+
+    def _work(self) -> None:
+        """Метод цикла фонового потока"""
+
+        while not self._stop_event.is_set():
+            try:
+                job_id, scan_config_id = self._queue.get(timeout=1)
+            except Empty:
+                continue
+
+            try:
+                self._run_job(job_id, scan_config_id)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job_id: int, scan_config_id: int) -> None:
+        """
+        Метод выполнения задания сканирования
+
+        :param job_id: Идентификатор задания
+        :param scan_config_id: Идентификатор конфигурации сканирования
+        """
+
+        with self._running_lock:
+            self._running_job_ids.add(job_id)
+
+        try:
+            self._scan(job_id, scan_config_id)
+        finally:
+            with self._running_lock:
+                self._running_job_ids.discard(job_id)
+
+    @staticmethod
+    def _scan(job_id: int, scan_config_id: int) -> None:
+        """
+        Метод сканирования с сохранением состояния и результата в задание
+
+        :param job_id: Идентификатор задания
+        :param scan_config_id: Идентификатор конфигурации сканирования
+        """
+
+        with ServiceDB() as service_db:
+            service_db.update_scan_job(
+                job_id,
+                status=ScanJobStatus.running.value,
+                started_at=datetime.now().strftime(TIMESTAMP_FORMAT),
+            )
+
+        try:
+            report = ScannerService().run_scanner(scan_config_id, progress=ScanJobProgress(job_id))
+        except Exception as err:
+            logging.exception(f'Scan job {job_id} failed')
+            values = dict(status=ScanJobStatus.failed.value, error=str(err))
+        else:
+            values = dict(status=ScanJobStatus.done.value, report_id=report.created_item_id)
+
+        with ServiceDB() as service_db:
+            service_db.update_scan_job(job_id, finished_at=datetime.now().strftime(TIMESTAMP_FORMAT), **values)
+
+
+def fail_interrupted_scan_jobs() -> None:
+    """
+    Функция отметки ошибкой заданий, которые остались в ожидании или выполнении после прошлого запуска сервиса.
+    Вызывается до запуска рабочих процессов, пока ни один процесс не выполняет задания.
+    """
+
+    try:
+        with ServiceDB() as service_db:
+            failed_count = service_db.fail_scan_jobs(INTERRUPTED_ERROR)
+    except Exception as err:
+        logging.error(f'Interrupted scan jobs were not marked as failed: {err}')
+        return
+
+    if failed_count:
+        logging.warning(f'{failed_count} interrupted scan jobs were marked as failed')
+
+
+scan_job_queue = ScanJobQueue()
+
+
+class ScanJobService:
+    """Класс работы с заданиями сканирования"""
+
+    def __init__(self, session: Annotated[Session | None, Depends(get_db_session)] = None) -> None:
+        """
+        Инициализация
+
+        :param session: Сессия запроса, без нее методы открывают собственную сессию
+        """
+
+        self.session = session
+
+    @staticmethod
+    def submit_scan(scan_config_id: int) -> ScanJobGetDTO:
+        """
+        Метод постановки сканирования в очередь
+
+        :param scan_config_id: Идентификатор конфигурации сканирования
+        :return: Созданное задание
+        """
+
+        return scan_job_queue.submit(scan_config_id)
+
+    def get_job(self, job_id: int) -> ScanJobGetDTO | None:
+        """
+        Метод получения задания сканирования
+
+        :param job_id: Идентификатор задания
+        :return: Задание с состоянием, этапами и идентификатором отчета или None, если задания нет
+        """
+
+        with ServiceDB(session=self.session) as service_db:
+            scan_job = service_db.get_scan_job(job_id)
+
+        return scan_job
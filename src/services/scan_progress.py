@@ -0,0 +1,82 @@
+"""
+Модуль отслеживания хода сканирования
+"""
+
+import time
+from threading import Lock
+
+
+class ScanProgress:
+    """Класс отслеживания этапов сканирования и обработанных проектов"""
+
+    def __init__(self) -> None:
+        """Инициализация"""
+
+        self.stage: str | None = None
+        self.stages_durations: dict[str, float] = {}
+        self.projects_count = 0
+        self.projects_done = 0
+        self._stage_started_at = 0.0
+        self._lock = Lock()
+
+    def on_change(self) -> None:
+        """Метод, вызываемый после каждого изменения хода сканирования"""
+
+    def start_stage(self, stage: str) -> None:
+        """
+        Метод начала нового этапа сканирования, предыдущий этап завершается
+
+        :param stage: Название этапа
+        """
+
+        with self._lock:
+            self._finish_stage()
+            self.stage = stage
+            self._stage_started_at = time.perf_counter()
+        self.on_change()
+
+    def finish(self) -> None:
+        """Метод завершения последнего этапа сканирования"""
+
+        with self._lock:
+            self._finish_stage()
+        self.on_change()
+
+    def set_projects_count(self, projects_count: int) -> None:
+        """
+        Метод установки количества сканируемых проектов
+
+        :param projects_count: Количество проектов
+        """
+
+        with self._lock:
+            self.projects_count = projects_count
+        self.on_change()
+
+    def project_done(self) -> None:
+        """Метод учета завершенного проекта"""
+
+        with self._lock:
+            self.projects_done += 1
+        self.on_change()
+
+    def get_state(self) -> dict:
+        """
+        Метод получения согласованного состояния хода сканирования
+
+        :return: Текущий этап, длительности этапов и количество проектов
+        """
+
+        with self._lock:
+            return dict(
+                stage=self.stage,
+                stages_durations=dict(self.stages_durations),
+                projects_count=self.projects_count,
+                projects_done=self.projects_done,
+            )
+
+    def _finish_stage(self) -> None:
+        """Метод записи длительности текущего этапа"""
+
+        if self.stage is not None and self.stage not in self.stages_durations:
+            self.stages_durations[self.stage] = round(time.perf_counter() - self._stage_started_at, 3)
@@ -2,15 +2,35 @@
 Модуль сервиса Сканера
 """
 
+import hashlib
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
+from typing import Annotated, Iterable, Iterator
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
 
 from dpss.scanner import Scanner
 from dpss.models import ScanConfigSchema, ReportModelSchema, ProjectConfigSchema, SoftComponentSchema
 from dpss.dpss import DependencySecurityScanner
-from dpss.sbom import GeneratorSBOM, ParserSBOM
-
-from configs.settings import SERVICE_DB_PATH, DATA_DIR, VULNER_DB_PATH, VULNER_PACKAGES_DIR_PATH
+from dpss.sbom import GeneratorSBOM
+
+from configs.settings import (
+    SERVICE_DB_PATH,
+    DATA_DIR,
+    VULNER_DB_PATH,
+    VULNER_PACKAGES_DIR_PATH,
+    MATCH_BATCH_SIZE,
+    SCAN_IO_THREADS,
+)
 from dbconnector.servicedb.servicedb import ServiceDB
+from dbconnector.servicedb.session import get_db_session, get_pool_status
+from matcher.components import sbom_components_cache
+from matcher.snapshot import AffectsSnapshot, vulner_matcher
+from services.executors import get_sbom_process_pool
+from services.report_snapshots import make_report_snapshot
+from services.scan_progress import ScanProgress
 from schemas.pydantic.scanner_schemas import CreateScanConfigSchema, UpdateScanConfigSchema
 from models.scanner_models import (
     ScanConfigGetDTO,
@@ -25,18 +45,40 @@ from models.scanner_models import (
     ReportAddDTO,
     AffectedProjectDTO,
     VulnerBasicGetDTO,
+    MatcherStatusDTO,
+    DBPoolStatusDTO,
+    ComponentDTO,
+    MatchedAffectDTO,
+    ScannedProjectDTO,
+    ProjectScanStateDTO,
+    ReportSnapshotDTO,
+    VulnersQueryDTO,
+    VulnersSearchQueryDTO,
+    VulnersSearchDTO,
+    PackageQueryDTO,
+    PackageVulnersDTO,
 )
 
+# Файл SBOM в каталоге проекта, не учитывается в хэше требований.
+SBOM_FILE_NAME = 'sbom.json'
+HASH_CHUNK_SIZE = 1024 * 1024
+
 class ScannerService:
     """Класс работы сервиса сканера"""
 
-    def __init__(self) -> None:
-        """Инициализация"""
+    scan_data_dir = Path('/home/motya/malife/projects/depss-api/data')
+
+    def __init__(self, session: Annotated[Session | None, Depends(get_db_session)] = None) -> None:
+        """
+        Инициализация
+
+        :param session: Сессия запроса, без нее каждый метод открывает собственную сессию
+        """
 
         self.service_db_path = SERVICE_DB_PATH
+        self.session = session
 
-    @staticmethod
-    def get_config(config_id: int) -> ScanConfigGetDTO:
+    def get_config(self, config_id: int) -> ScanConfigGetDTO:
         """
         Метод получения конфигурации сканирования
 
@@ -44,13 +86,12 @@ class ScannerService:
         :return: Конфигурация скнирования
         """
 
-        with ServiceDB() as service_db:
+        with ServiceDB(session=self.session) as service_db:
             scan_config = service_db.get_scan_config(config_id)
 
         return scan_config
 
-    @staticmethod
-    def get_project_config(config_id: int) -> ProjectConfigGetDTO:
+    def get_project_config(self, config_id: int) -> ProjectConfigGetDTO:
         """
         Метод получения конфигурации сканирования
 
@@ -58,26 +99,24 @@ class ScannerService:
         :return: Конфигурация скнирования
         """
 
-        with ServiceDB() as service_db:
+        with ServiceDB(session=self.session) as service_db:
             scan_config = service_db.get_project_config(config_id)
 
         return scan_config
 
-    @staticmethod
-    def get_all_configs() -> list[ScanConfigGetDTO]:
+    def get_all_configs(self) -> list[ScanConfigGetDTO]:
         """
         Метод получения всех конфигов сканирования
 
         :return: Список найденных конфигураций
         """
 
-        with ServiceDB() as service_db:
+        with ServiceDB(session=self.session) as service_db:
             scan_configs = service_db.get_all_scan_configs()
 
         return scan_configs
 
-    @staticmethod
-    def add_config(create_config_schema: ScanConfigAddDTO) -> AddItemResponseDTO:
+    def add_config(self, create_config_schema: ScanConfigAddDTO) -> AddItemResponseDTO:
         """
         Метод добавления новой конфигурации
 
@@ -85,13 +124,12 @@ class ScannerService:
         :return: Созданная конфигурация
         """
 
-        with ServiceDB() as service_db:
+        with ServiceDB(session=self.session) as service_db:
             response = service_db.add_scan_config(create_config_schema)
 
         return response
 
-    @staticmethod
-    def add_proj_config(create_config_schema: ProjectConfigAddDTO) -> AddItemResponseDTO:
+    def add_proj_config(self, create_config_schema: ProjectConfigAddDTO) -> AddItemResponseDTO:
         """
         Метод добавления новой конфигурации
 
@@ -99,7 +137,7 @@ class ScannerService:
         :return: Созданная конфигурация
         """
 
-        with ServiceDB() as service_db:
+        with ServiceDB(session=self.session) as service_db:
             response = service_db.add_scan_project_config(create_config_schema)
 
         return response
@@ -115,33 +153,38 @@ class ScannerService:
 
         is_id = True if isinstance(config_id, int) else False
 
-        with ServiceDB(self.service_db_path) as service_db:
+        with ServiceDB(session=self.session) as service_db:
             scan_config = service_db.update_scan_config(config_id, update_config_schema, is_id)
 
         return scan_config
 
-    @staticmethod
-    def delete_config(config_id: int) -> int:
+    def delete_config(self, config_id: int) -> int:
         """
         Метод удаления конфигурации
 
         :param config_id: Идентификатор конфига
         """
 
-        with ServiceDB() as service_db:
+        with ServiceDB(session=self.session) as service_db:
             deleted_id = service_db.delete_scan_config(config_id)
 
         return deleted_id
 
-    def run_scanner(self, scan_config_id: int) -> AddItemResponseDTO:
+    def run_scanner(self, scan_config_id: int, progress: ScanProgress | None = None) -> AddItemResponseDTO:
         """
         Метод запуска сканирования зависимостей
 
         :param scan_config_id: Идентификатор конфигурации сканирования
+        :param progress: Объект отслеживания хода сканирования
         :return: Отчет по результатам сканирования
         """
 
-        scan_config = self.get_config(config_id=scan_config_id)
+        progress = progress or ScanProgress()
+        # Соединение не удерживается на время сбора требований и генерации SBOM.
+        with ServiceDB(session=self.session) as service_db:
+            scan_config = service_db.get_scan_config(scan_config_id)
+            scan_states = service_db.get_project_scan_states([project.id for project in scan_config.projects])
+        progress.set_projects_count(len(scan_config.projects))
 
         scan_conf_schema = ScanConfigSchema(
             host=scan_config.host,
@@ -163,39 +206,150 @@ class ScannerService:
             report_type='',
         )
 
-        result_projects = []
-        with ServiceDB() as service_db:
-            scanner = Scanner(data_dir='/home/motya/malife/projects/depss-api/data', scan_config=scan_conf_schema)
-            scanner.save_project_requirements()
-
-            local_project_dirs = []
-            for project in scan_config.projects:
-                # local_project_dirs.append(Path('/home/motya/malife/projects/depss-api/data') / project.type / project.name)
-                local_project_dir = Path('/home/motya/malife/projects/depss-api/data') / project.type / project.name
-            # for local_project_dir in local_project_dirs:
-                self.generate_sbom(local_project_dir)
-                components = self.get_components_from_sbom(local_project_dir)
-                vulnerable_software = service_db.find_vulnerable_software(components)
-                projects = [
-                    AffectedProjectDTO(
-                        affected_id=affect_id,
-                        project_config_id=project.id
-                    ) for affect_id in vulnerable_software
-                ]
-                result_projects.extend(projects)
-
-            report_data = ReportAddDTO(
-                scan_config_id=scan_config_id,
-                projects=result_projects,
-            )
+        progress.start_stage('collect')
+        scanner = Scanner(data_dir=str(self.scan_data_dir), scan_config=scan_conf_schema)
+        scanner.save_project_requirements()
+
+        progress.start_stage('scan')
+        # Все проекты сканирования сопоставляются с одним снимком, чтобы поколение базы было общим.
+        snapshot = vulner_matcher.get_snapshot()
+
+        sbom_pool = get_sbom_process_pool()
+        with ThreadPoolExecutor(max_workers=SCAN_IO_THREADS) as io_pool:
+            futures = [
+                io_pool.submit(
+                    self.scan_project, project, sbom_pool, progress, snapshot, scan_states.get(project.id),
+                )
+                for project in scan_config.projects
+            ]
+            # Результаты собираются в порядке проектов конфигурации, а не в порядке завершения.
+            scan_results = [future.result() for future in futures]
+
+        progress.start_stage('report')
+        report_data = ReportAddDTO(
+            scan_config_id=scan_config_id,
+            projects=[affected for affected_projects, _ in scan_results for affected in affected_projects],
+            scanned_projects=[
+                ScannedProjectDTO(project_config_id=project.id, is_reused=is_reused)
+                for project, (_, is_reused) in zip(scan_config.projects, scan_results)
+            ],
+        )
+        with ServiceDB(session=self.session) as service_db:
             report_id = service_db.save_report(report_data)
+
+        try:
+            self.build_report_snapshot(report_id)
+        except Exception as err:
+            # Снимок будет построен при первом чтении отчета.
+            logging.error(f'Snapshot of report {report_id} was not built: {err}')
+
+        progress.finish()
         return AddItemResponseDTO(created_item_id=report_id)
 
+    def scan_project(
+            self,
+            project: ProjectConfigGetDTO,
+            sbom_pool: Executor,
+            progress: ScanProgress,
+            snapshot: AffectsSnapshot,
+            scan_state: ProjectScanStateDTO | None = None,
+    ) -> tuple[list[AffectedProjectDTO], bool]:
+        """
+        Метод сканирования одного проекта: генерация SBOM, разбор компонентов и поиск уязвимостей.
+        Если требования проекта или состав SBOM не изменились с прошлого сканирования
+        на том же поколении базы уязвимостей, используется сохраненный результат.
+
+        :param project: Конфигурация проекта
+        :param sbom_pool: Пул процессов для генерации SBOM
+        :param progress: Объект отслеживания хода сканирования
+        :param snapshot: Снимок затронутого ПО
+        :param scan_state: Состояние прошлого сканирования проекта
+        :return: Затронутое ПО проекта и признак повторного использования результата
+        """
+
+        local_project_dir = self.scan_data_dir / project.type / project.name
+        requirements_hash = self.get_requirements_hash(local_project_dir)
+        is_same_generation = scan_state is not None and scan_state.vulner_db_generation == snapshot.generation
+
+        if is_same_generation and scan_state.requirements_hash == requirements_hash:
+            is_reused = True
+            sbom_hash = scan_state.sbom_hash
+            affected_ids = scan_state.affected_ids
+        else:
+            sbom_pool.submit(self.generate_sbom, local_project_dir).result()
+            components = self.get_components_from_sbom(local_project_dir)
+            sbom_hash = self.get_components_hash(components)
+
+            is_reused = is_same_generation and scan_state.sbom_hash == sbom_hash
+            affected_ids = scan_state.affected_ids if is_reused else snapshot.engine.match(components)
+
+        if not is_reused or scan_state.requirements_hash != requirements_hash:
+            # Метод выполняется в потоке пула, поэтому использует собственную сессию.
+            with ServiceDB() as service_db:
+                service_db.save_project_scan_state(
+                    ProjectScanStateDTO(
+                        project_config_id=project.id,
+                        requirements_hash=requirements_hash,
+                        sbom_hash=sbom_hash,
+                        vulner_db_generation=snapshot.generation,
+                        affected_ids=affected_ids,
+                    )
+                )
+
+        progress.project_done()
+
+        affected_projects = [
+            AffectedProjectDTO(
+                affected_id=affect_id,
+                project_config_id=project.id
+            ) for affect_id in affected_ids
+        ]
+        return affected_projects, is_reused
+
+    @staticmethod
+    def get_requirements_hash(local_project_dir: Path) -> str:
+        """
+        Метод вычисления хэша содержимого собранных файлов требований проекта
+
+        :param local_project_dir: Локальный каталог проекта
+        :return: Хэш SHA-256 путей и содержимого файлов, кроме SBOM
+        """
+
+        requirements_hash = hashlib.sha256()
+        for file_path in sorted(local_project_dir.rglob('*')):
+            if not file_path.is_file() or file_path.name == SBOM_FILE_NAME:
+                continue
+
+            requirements_hash.update(file_path.relative_to(local_project_dir).as_posix().encode() + b'\0')
+            with file_path.open('rb') as file:
+                while chunk := file.read(HASH_CHUNK_SIZE):
+                    requirements_hash.update(chunk)
+            requirements_hash.update(b'\0')
+
+        return requirements_hash.hexdigest()
+
     @staticmethod
-    def get_components_from_sbom(local_project_dir: Path) -> list[SoftComponentSchema]:
+    def get_components_hash(components: Iterable[ComponentDTO]) -> str:
+        """
+        Метод вычисления хэша состава SBOM.
+        Учитываются только имена и версии компонентов, от которых зависит поиск уязвимостей,
+        поэтому метка времени и серийный номер SBOM на хэш не влияют.
+
+        :param components: Компоненты ПО
+        :return: Хэш SHA-256 отсортированного списка компонентов
+        """
+
+        components_hash = hashlib.sha256()
+        for name, version in sorted({(component.name, str(component.version)) for component in components}):
+            components_hash.update(f'{name}\0{version}\n'.encode())
+
+        return components_hash.hexdigest()
+
+    @staticmethod
+    def get_components_from_sbom(local_project_dir: Path) -> list[ComponentDTO]:
         """Метода парсинга SBOM данных"""
 
-        return ParserSBOM(local_project_dir / 'sbom.json').get_components()
+        return sbom_components_cache.get_components(local_project_dir / SBOM_FILE_NAME)
 
 
     @staticmethod
@@ -266,36 +420,156 @@ class ScannerService:
     #     return scan_config
 
 
-    @staticmethod
-    def get_report_by_id(report_id: int) -> ReportFullDTO:
+    def get_report_by_id(self, report_id: int) -> ReportFullDTO:
         """
         Метод получения отчета сканирования
 
         :param report_id: Идентификатор отчета
         :return: Отчет с результатами сканирования
         """
-        with ServiceDB() as service_db:
+        with ServiceDB(session=self.session) as service_db:
             report = service_db.get_report(report_id)
 
         return report
 
+    def build_report_snapshot(self, report_id: int) -> ReportSnapshotDTO:
+        """
+        Метод построения и сохранения сериализованного снимка отчета
+
+        :param report_id: Идентификатор отчета
+        :return: Снимок отчета
+        """
+
+        with ServiceDB(session=self.session) as service_db:
+            # Поколение читается до отчета: если синхронизация завершится между чтениями,
+            # снимок получит прежнее поколение и будет перестроен при следующем чтении.
+            generation = service_db.get_vulner_db_generation()
+            report_snapshot = make_report_snapshot(service_db.get_report(report_id), generation)
+            service_db.save_report_snapshot(report_snapshot)
+
+        return report_snapshot
+
+    def get_report_snapshot(self, report_id: int) -> ReportSnapshotDTO:
+        """
+        Метод получения снимка отчета.
+        Снимок старого отчета или снимок прежнего поколения базы уязвимостей строится при чтении.
+
+        :param report_id: Идентификатор отчета
+        :return: Снимок отчета
+        """
+
+        with ServiceDB(session=self.session) as service_db:
+            report_snapshot = service_db.get_report_snapshot(report_id)
+
+        return report_snapshot or self.build_report_snapshot(report_id)
+
+    def is_report_exists(self, report_id: int) -> bool:
+        with ServiceDB(session=self.session) as service_db:
+            return service_db.is_report_exists(report_id)
+
     @staticmethod
-    def get_reports() -> list[ReportGetDTO]:
+    def iter_report_findings(report_id: int) -> Iterator[bytes]:
+        """
+        Метод потоковой выгрузки найденного затронутого ПО отчета в формате NDJSON
+
+        :param report_id: Идентификатор отчета
+        :return: Части NDJSON, по строке на каждое найденное затронутое ПО проекта
+        """
+
+        # Тело ответа отдается после закрытия сессии запроса, поэтому выгрузка открывает собственную сессию.
         with ServiceDB() as service_db:
+            for findings in service_db.iter_report_findings(report_id):
+                yield b''.join(finding.model_dump_json().encode() + b'\n' for finding in findings)
+
+    def get_reports(self) -> list[ReportGetDTO]:
+        with ServiceDB(session=self.session) as service_db:
             reports = service_db.get_all_reports()
 
         return reports
 
-    @staticmethod
-    def get_vulner_data(vulner_id: str) -> VulnerGetDTO:
-        with ServiceDB() as service_db:
+    def get_vulner_data(self, vulner_id: str) -> VulnerGetDTO:
+        with ServiceDB(session=self.session) as service_db:
             vulner_data = service_db.get_vulner_data(vulner_id)
 
         return vulner_data
 
+    def get_vulners(self, 
+            page: int = 1,
+            page_size: int = 20,
+            cursor: str | None = None,
+            vulners_query: VulnersQueryDTO | None = None,
+    ) -> VulnersBasicsGetDTO:
+        with ServiceDB(session=self.session) as service_db:
+            vulners_data = service_db.get_vulners(page, page_size, cursor, vulners_query)
+
+        return vulners_data
+
+    def search_vulners(self, search_query: VulnersSearchQueryDTO, page: int = 1, page_size: int = 20) -> VulnersSearchDTO:
+        with ServiceDB(session=self.session) as service_db:
+            search_result = service_db.search_vulners(search_query, page, page_size)
+
+        return search_result
+
+    def find_package_vulners(self, packages: list[PackageQueryDTO]) -> list[PackageVulnersDTO]:
+        """
+        Метод проверки версий пакетов на наличие уязвимостей
+
+        :param packages: Пакеты с экосистемой и версией
+        :return: Уязвимости каждого пакета
+        """
+
+        with ServiceDB(session=self.session) as service_db:
+            packages_vulners = service_db.find_package_vulners(packages)
+
+        return packages_vulners
+
+    @staticmethod
+    def get_matcher_status() -> MatcherStatusDTO:
+        return vulner_matcher.get_status()
+
+    @staticmethod
+    def get_db_pool_status() -> DBPoolStatusDTO:
+        return get_pool_status()
+
     @staticmethod
-    def get_vulners(page: int = 1, page_size: int = 20) -> VulnersBasicsGetDTO:
+    def match_components(components: list[ComponentDTO]) -> list[MatchedAffectDTO]:
+        """
+        Метод поиска затронутого ПО среди переданных компонентов без сбора зависимостей с хоста
+
+        :param components: Компоненты ПО
+        :return: Найденное затронутое ПО с уязвимостями
+        """
+
+        index = vulner_matcher.get_snapshot().index
+        matches = [
+            (component, interval)
+            for component in components
+            for interval in index.match_component(component.name, component.version)
+        ]
+
         with ServiceDB() as service_db:
-            vulners_data = service_db.get_vulners(page, page_size)
+            affects_vulners = service_db.get_affects_vulners({interval.affect_id for _, interval in matches})
 
-        return vulners_data
+        result = []
+        for component, interval in matches:
+            # Запись могла быть удалена после построения снимка.
+            if interval.affect_id not in affects_vulners:
+                continue
+
+            affected, vulner = affects_vulners[interval.affect_id]
+            result.append(MatchedAffectDTO(component=component, affected=affected, vulner=vulner))
+
+        return result
+
+    def iter_matches(self, components: list[ComponentDTO]) -> Iterator[bytes]:
+        """
+        Метод поиска затронутого ПО частями, результат отдается в формате NDJSON
+
+        :param components: Компоненты ПО
+        :return: Строки NDJSON с найденным затронутым ПО
+        """
+
+        for batch_start in range(0, len(components), MATCH_BATCH_SIZE):
+            batch = components[batch_start:batch_start + MATCH_BATCH_SIZE]
+            for matched in self.match_components(batch):
+                yield matched.model_dump_json().encode() + b'\n'